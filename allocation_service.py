@@ -0,0 +1,196 @@
+"""
+First-expiry-first-out (FEFO) allocation for hospital-to-hospital transfers
+Replaces the single-row LIMIT 1 decrement in the transfer approval triggers:
+units are taken from the supplier's soonest-expiring lots, split across as
+many lots as needed, and land at the requester as lots with the same expiry.
+The supplier is the hospital the request was sent to (to_hospital); the
+requester (from_hospital) receives the blood.
+"""
+
+from dataclasses import dataclass, field, asdict
+
+# Lots are locked in batches of this size while walking the FEFO order, so a
+# small request against thousands of lots only locks the lots it can use.
+LOCK_BATCH_SIZE = 64
+
+# Column names and predicates differ between the two schemas
+LOT_SCHEMAS = {
+    'blood_bank_db': {
+        'from_column': 'from_hospital',
+        'to_column': 'to_hospital',
+        'expiry_column': 'expires_on',
+        'available': "units_available > 0",
+        'depleted_status': None,
+        'approve_sql': "UPDATE transfer_requests SET status = 'Approved' WHERE request_id = %s",
+        'receive_sql': """
+            INSERT INTO hospital_inventory (hospital_id, blood_group, units_available, expires_on)
+            VALUES {values}
+            ON DUPLICATE KEY UPDATE units_available = units_available + VALUES(units_available)
+        """
+    },
+    'blood_network_db': {
+        'from_column': 'from_hospital_id',
+        'to_column': 'to_hospital_id',
+        'expiry_column': 'expiry_date',
+        'available': "status = 'Available' AND units_available > 0",
+        'depleted_status': 'Transferred',
+        'approve_sql': """
+            UPDATE transfer_requests SET status = 'Approved', resolved_on = CURRENT_TIMESTAMP
+            WHERE request_id = %s
+        """,
+        'receive_sql': """
+            INSERT INTO hospital_inventory (hospital_id, blood_group, units_available, expiry_date)
+            VALUES {values}
+            ON DUPLICATE KEY UPDATE units_available = units_available + VALUES(units_available)
+        """
+    }
+}
+
+
+class AllocationError(Exception):
+    """The transfer request cannot be approved"""
+
+
+class InsufficientStock(AllocationError):
+    def __init__(self, blood_group, units_needed, units_available):
+        super().__init__(f"Only {units_available} of {units_needed} units of {blood_group} available")
+        self.units_needed = units_needed
+        self.units_available = units_available
+
+
+@dataclass
+class LotAllocation:
+    lot_id: int
+    expires_on: object
+    units: int
+    remaining: int
+
+
+@dataclass
+class AllocationPlan:
+    request_id: int
+    supplier_hospital: int
+    receiving_hospital: int
+    blood_group: str
+    units_requested: int
+    allocations: list = field(default_factory=list)
+
+    @property
+    def units_allocated(self):
+        return sum(a.units for a in self.allocations)
+
+    def to_dict(self):
+        plan = asdict(self)
+        plan['units_allocated'] = self.units_allocated
+        for allocation in plan['allocations']:
+            allocation['expires_on'] = str(allocation['expires_on'])
+        return plan
+
+
+def plan_fefo(lots, units_needed):
+    """Split units_needed across lots already sorted by expiry.
+
+    lots is an iterable of (lot_id, units_available, expires_on); returns the
+    LotAllocation list, which covers fewer units when stock runs out.
+    """
+    allocations = []
+    remaining_need = units_needed
+    for lot_id, units_available, expires_on in lots:
+        if remaining_need <= 0:
+            break
+        take = min(units_available, remaining_need)
+        allocations.append(LotAllocation(lot_id, expires_on, take, units_available - take))
+        remaining_need -= take
+    return allocations
+
+
+def _lock_fefo_lots(cursor, schema, hospital_id, blood_group, units_needed):
+    """Lock the supplier's usable lots in FEFO order until units_needed is covered"""
+    expiry = schema['expiry_column']
+    lots, covered, last_key = [], 0, None
+    while covered < units_needed:
+        params = [hospital_id, blood_group]
+        after = ""
+        if last_key is not None:
+            after = f"AND ({expiry}, h_bag_id) > (%s, %s)"
+            params.extend(last_key)
+        params.append(LOCK_BATCH_SIZE)
+        cursor.execute(f"""
+            SELECT h_bag_id, units_available, {expiry}
+            FROM hospital_inventory
+            WHERE hospital_id = %s AND blood_group = %s
+              AND {schema['available']} AND {expiry} >= CURDATE() {after}
+            ORDER BY {expiry}, h_bag_id
+            LIMIT %s
+            FOR UPDATE
+        """, params)
+        batch = [tuple(row.values()) if isinstance(row, dict) else tuple(row) for row in cursor.fetchall()]
+        lots.extend(batch)
+        covered += sum(units for _, units, _ in batch)
+        if len(batch) < LOCK_BATCH_SIZE:
+            break
+        last_key = (batch[-1][2], batch[-1][0])
+    return lots
+
+
+def _apply(cursor, schema, plan):
+    allocations = plan.allocations
+
+    # Decrement every source lot in one statement
+    cases = ' '.join(['WHEN %s THEN %s'] * len(allocations))
+    params = []
+    for a in allocations:
+        params.extend((a.lot_id, a.units))
+    ids = [a.lot_id for a in allocations]
+    set_status = ""
+    if schema['depleted_status']:
+        set_status = (f", status = IF(units_available = 0, '{schema['depleted_status']}', status)")
+    cursor.execute(f"""
+        UPDATE hospital_inventory
+        SET units_available = units_available - CASE h_bag_id {cases} END{set_status}
+        WHERE h_bag_id IN ({', '.join(['%s'] * len(ids))})
+    """, params + ids)
+
+    # Receiving lots keep the expiry of the lots they came from
+    received = {}
+    for a in allocations:
+        received[a.expires_on] = received.get(a.expires_on, 0) + a.units
+    values = ', '.join(['(%s, %s, %s, %s)'] * len(received))
+    params = []
+    for expires_on, units in sorted(received.items()):
+        params.extend((plan.receiving_hospital, plan.blood_group, units, expires_on))
+    cursor.execute(schema['receive_sql'].format(values=values), params)
+
+    cursor.execute(schema['approve_sql'], (plan.request_id,))
+
+
+def allocate_transfer(cursor, request_id, approver_hospital=None, database='blood_bank_db'):
+    """Approve a Pending transfer request by FEFO allocation; returns the AllocationPlan.
+
+    Must run inside the caller's transaction: the request row and the chosen
+    lots are locked FOR UPDATE, and nothing is written unless the full
+    quantity can be supplied (InsufficientStock otherwise).
+    """
+    schema = LOT_SCHEMAS[database]
+    cursor.execute(f"""
+        SELECT {schema['from_column']}, {schema['to_column']}, blood_group, units_needed, status
+        FROM transfer_requests WHERE request_id = %s
+        FOR UPDATE
+    """, (request_id,))
+    row = cursor.fetchone()
+    if row is None:
+        raise AllocationError(f"Transfer request {request_id} not found")
+    requester, supplier, blood_group, units_needed, status = row.values() if isinstance(row, dict) else row
+    if status != 'Pending':
+        raise AllocationError(f"Transfer request {request_id} is already {status}")
+    if approver_hospital is not None and approver_hospital != supplier:
+        raise AllocationError(f"Transfer request {request_id} was not sent to this hospital")
+
+    lots = _lock_fefo_lots(cursor, schema, supplier, blood_group, units_needed)
+    plan = AllocationPlan(request_id, supplier, requester, blood_group, units_needed,
+                          plan_fefo(lots, units_needed))
+    if plan.units_allocated < units_needed:
+        raise InsufficientStock(blood_group, units_needed, plan.units_allocated)
+
+    _apply(cursor, schema, plan)
+    return plan
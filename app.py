@@ -1,8 +1,27 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, abort
 import mysql.connector
+from db import ConnectionPool, init_app, get_cursor, transaction
+from dashboard_service import fetch_dashboard
+from transfer_service import broadcast_transfer_request
+from inventory_service import add_lot_units
+from allocation_service import allocate_transfer, AllocationError
+from emergency_service import fulfil_emergency_requests
+from cache import TTLCache
+from http_cache import TableVersions, conditional_json
+from pagination import fetch_page, wants_json
+from log_store import LogFilters, LOG_SCHEMAS
+from export_service import export_query, export_response, export_filename, parse_extension
+from query_stats import QueryMonitor, DEFAULT_SLOW_MS, ORDER_KEYS
+from compatibility_service import search_compatible, BLOOD_GROUPS
+from network_matrix import NetworkMatrix, HAVE_NUMPY
+from rebalance_planner import plan_for_database, load_city_distances, SAFETY_STOCK
+from expiry_scheduler import ExpiryScheduler
+from demand_forecast import load_forecasts, days_of_cover, is_low_stock
+from donor_service import normalize_phone, register_donor, is_duplicate_phone
 from datetime import datetime, timedelta
 import os
 from functools import wraps
+from werkzeug.serving import is_running_from_reloader
 
 app = Flask(__name__)
 app.secret_key = 'blood_bank_secret_key'
@@ -16,6 +35,20 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# blood_bank_db has no admin accounts; hospital logins listed in ADMIN_EMAILS
+# (comma-separated) act as network admins
+ADMIN_EMAILS = {email.strip().lower() for email in os.environ.get('ADMIN_EMAILS', '').split(',') if email.strip()}
+
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            return redirect(url_for('login'))
+        if not session.get('is_admin'):
+            abort(403)
+        return f(*args, **kwargs)
+    return decorated_function
+
 # Database Configuration
 DB_CONFIG = {
     'host': 'localhost',
@@ -24,8 +57,89 @@ DB_CONFIG = {
     'database': 'blood_bank_db'
 }
 
-def get_db_connection():
-    return mysql.connector.connect(**DB_CONFIG)
+# Connection Pool
+POOL_CONFIG = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'timeout': 10,
+    'max_lifetime': 1800
+}
+
+db_pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+
+# One connection per request, borrowed on first use and released on teardown
+init_app(app, db_pool)
+
+# Statement timings behind Server-Timing headers, the slow-query log and /admin/perf
+query_monitor = QueryMonitor(slow_ms=float(os.environ.get('SLOW_QUERY_MS', DEFAULT_SLOW_MS)))
+
+query_monitor.init_app(app, db_pool)
+
+# city_a,city_b,km table for the rebalancing planner; unknown pairs use a flat distance
+city_distances = load_city_distances(os.environ.get('CITY_DISTANCES_CSV'))
+
+# Lot expiry normally runs as its own process (python expiry_scheduler.py, or
+# --once from cron). EXPIRY_SCHEDULER=embedded runs it in a daemon thread of
+# this process instead; under `python app.py` only the reloader's serving
+# process starts it.
+if os.environ.get('EXPIRY_SCHEDULER') == 'embedded' and (__name__ != '__main__' or is_running_from_reloader()):
+    ExpiryScheduler('blood_bank_db', db_config=DB_CONFIG).start()
+
+# Table versions behind API ETags; also key the reference cache so a hospital
+# registered through any worker invalidates every worker's entries
+table_versions = TableVersions('blood_bank_db', ttl=2)
+
+# Reference data cache (cities, hospitals by city); cleared when a hospital registers
+reference_cache = TTLCache(maxsize=256, ttl=600)
+
+# Stored demand forecasts per hospital; demand_forecast.py bumps their version on every refit
+forecast_cache = TTLCache(maxsize=4096, ttl=3600)
+
+def get_forecasts(hospital_id):
+    """blood_group -> forecast daily units, cached until new forecasts are stored"""
+    version = table_versions.current('demand_forecasts')
+    return forecast_cache.get_or_load(('forecasts', hospital_id, version),
+                                      lambda: load_forecasts(get_cursor(), hospital_id))
+
+# Hospitals x blood groups matrix for network-wide views (needs numpy)
+network_matrix = NetworkMatrix('blood_bank_db') if HAVE_NUMPY else None
+
+def current_network_matrix():
+    """The network matrix, refreshed if inventory or hospitals changed"""
+    network_matrix.refresh(get_cursor(), table_versions.current('hospitals', 'inventory_summary'))
+    return network_matrix
+
+def get_network_inventory():
+    """hospital_id -> [(blood_group, units)] for every group in stock"""
+    if network_matrix is not None:
+        return current_network_matrix().inventory_by_hospital()
+    cursor = get_cursor()
+    cursor.execute("""
+        SELECT hospital_id, blood_group, total_units
+        FROM inventory_summary
+        WHERE total_units > 0
+        ORDER BY hospital_id, blood_group
+    """)
+    inventory = {}
+    for hospital_id, blood_group, units in cursor.fetchall():
+        inventory.setdefault(hospital_id, []).append((blood_group, units))
+    return inventory
+
+def get_cities():
+    def load():
+        cursor = get_cursor(dictionary=True)
+        cursor.execute("SELECT DISTINCT city FROM hospitals ORDER BY city")
+        return cursor.fetchall()
+    version = table_versions.current('hospitals')
+    return reference_cache.get_or_load(('cities', version), load)
+
+def get_hospitals_in_city(city, version=None):
+    def load():
+        cursor = get_cursor(dictionary=True)
+        cursor.execute("SELECT hospital_id, name FROM hospitals WHERE city = %s", (city,))
+        return cursor.fetchall()
+    version = version or table_versions.current('hospitals')
+    return reference_cache.get_or_load(('hospitals', city, version), load)
 
 # Authentication Routes
 @app.route('/login', methods=['GET', 'POST'])
@@ -40,8 +154,7 @@ def login():
             email = request.form['email']
             password = request.form['password']
             
-            conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
+            cursor = get_cursor(dictionary=True)
             cursor.execute("SELECT * FROM hospitals WHERE email = %s AND password = %s", (email, password))
             user = cursor.fetchone()
             
@@ -49,13 +162,10 @@ def login():
                 session['user_id'] = user['hospital_id']
                 session['user_type'] = 'hospital'
                 session['user_name'] = user['name']
+                session['is_admin'] = user['email'].lower() in ADMIN_EMAILS
                 flash('Login successful!', 'success')
-                cursor.close()
-                conn.close()
                 return redirect(url_for('dashboard'))
             
-            cursor.close()
-            conn.close()
             flash('Invalid hospital credentials!', 'error')
     
     return render_template('login_premium_unified.html')
@@ -78,62 +188,43 @@ def donor_portal():
         blood_group = request.form['blood_group']
         hospital_id = request.form['hospital_id']
         preferred_time = request.form['preferred_time']
+        phone_key = normalize_phone(phone)
+        if phone_key is None:
+            flash('Please enter a valid phone number.', 'error')
+            return redirect(url_for('donor_portal'))
         
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Check if donor exists
-        cursor.execute("SELECT donor_id FROM donors WHERE phone = %s", (phone,))
-        existing_donor = cursor.fetchone()
-        
-        if existing_donor:
-            donor_id = existing_donor['donor_id']
-        else:
-            # Insert new donor
-            cursor.execute("""
-                INSERT INTO donors (name, age, gender, blood_group, phone, city, goodwill_score) 
-                VALUES (%s, %s, %s, %s, %s, %s, 0)
-            """, (name, age, gender, blood_group, phone, city))
-            donor_id = cursor.lastrowid
+        # Donor upsert, rare donor flag and appointment commit together
+        with transaction() as cursor:
+            # Point read on the unique phone_key; a concurrent first booking
+            # for the same number resolves to the same donor
+            donor_id, existing_donor = register_donor(cursor, phone_key, """
+                INSERT INTO donors (name, age, gender, blood_group, phone, phone_key, city, goodwill_score) 
+                VALUES (%s, %s, %s, %s, %s, %s, %s, 0)
+            """, (name, age, gender, blood_group, phone, phone_key, city))
             
             # Check for rare blood type
-            if blood_group in ['AB-', 'B-', 'O-']:
+            if existing_donor is None and blood_group in ['AB-', 'B-', 'O-']:
                 cursor.execute("""
                     INSERT INTO rare_donors (donor_id, reason) 
                     VALUES (%s, 'Rare blood type')
                 """, (donor_id,))
-        
-        # Create appointment
-        cursor.execute("""
-            INSERT INTO donation_appointments (donor_id, hospital_id, preferred_time) 
-            VALUES (%s, %s, %s)
-        """, (donor_id, hospital_id, preferred_time))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
+            
+            # Create appointment
+            cursor.execute("""
+                INSERT INTO donation_appointments (donor_id, hospital_id, preferred_time) 
+                VALUES (%s, %s, %s)
+            """, (donor_id, hospital_id, preferred_time))
         
         return redirect(url_for('donation_success', name=name, hospital_id=hospital_id, time=preferred_time))
     
     # GET request - show form
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT DISTINCT city FROM hospitals ORDER BY city")
-    cities = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    
-    return render_template('donor_portal_unified.html', cities=cities)
+    return render_template('donor_portal_unified.html', cities=get_cities())
 
 @app.route('/get_hospitals/<city>')
 def get_hospitals(city):
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT hospital_id, name FROM hospitals WHERE city = %s", (city,))
-    hospitals = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return jsonify(hospitals)
+    return conditional_json(table_versions, ('hospitals',), f'hospitals:{city}',
+                            lambda versions: get_hospitals_in_city(city, versions),
+                            cache_control='public, max-age=60')
 
 # Hospital Inventory Management
 @app.route('/hospital/inventory', methods=['GET', 'POST'])
@@ -149,52 +240,39 @@ def hospital_inventory():
         units = int(request.form['units'])
         expires_on = request.form['expires_on']
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if entry exists
-        cursor.execute("""
-            SELECT h_bag_id FROM hospital_inventory 
-            WHERE hospital_id = %s AND blood_group = %s AND expires_on = %s
-        """, (hospital_id, blood_group, expires_on))
+        with transaction() as cursor:
+            add_lot_units(cursor, hospital_id, blood_group, units, expires_on)
         
-        existing = cursor.fetchone()
-        if existing:
-            cursor.execute("""
-                UPDATE hospital_inventory 
-                SET units_available = units_available + %s
-                WHERE h_bag_id = %s
-            """, (units, existing[0]))
-        else:
-            cursor.execute("""
-                INSERT INTO hospital_inventory (hospital_id, blood_group, units_available, expires_on)
-                VALUES (%s, %s, %s, %s)
-            """, (hospital_id, blood_group, units, expires_on))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
         flash('Inventory updated successfully!', 'success')
         return redirect(url_for('hospital_inventory'))
     
     # GET request
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    cursor = get_cursor(dictionary=True)
     cursor.execute("""
         SELECT *, 
                created_at as last_updated,
-               CASE 
-                   WHEN expires_on <= DATE_ADD(CURDATE(), INTERVAL 7 DAY) THEN 'expiring'
-                   WHEN units_available < 5 THEN 'low'
-                   ELSE 'healthy'
-               END as status
+               expires_on <= DATE_ADD(CURDATE(), INTERVAL 7 DAY) as expiring
         FROM hospital_inventory 
         WHERE hospital_id = %s AND units_available > 0
         ORDER BY blood_group, expires_on
     """, (hospital_id,))
     inventory = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    
+    # Low stock is judged on days of forecast demand covered by the whole group
+    forecasts = get_forecasts(hospital_id)
+    group_units = {}
+    for item in inventory:
+        group_units[item['blood_group']] = group_units.get(item['blood_group'], 0) + item['units_available']
+    for item in inventory:
+        daily_units = forecasts.get(item['blood_group'])
+        units = group_units[item['blood_group']]
+        item['days_of_cover'] = days_of_cover(units, daily_units)
+        if item['expiring']:
+            item['status'] = 'expiring'
+        elif is_low_stock(units, daily_units, item['units_available']):
+            item['status'] = 'low'
+        else:
+            item['status'] = 'healthy'
     
     return render_template('hospital_inventory_premium.html', inventory=inventory)
 
@@ -205,45 +283,34 @@ def hospital_appointments():
         return redirect(url_for('login'))
     
     hospital_id = session.get('user_id')
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    cursor = get_cursor(dictionary=True)
     
-    cursor.execute("""
+    page = fetch_page(cursor, """
         SELECT da.*, d.name, d.blood_group, d.phone, d.city,
                CASE WHEN rd.donor_id IS NOT NULL THEN 1 ELSE 0 END as is_rare_donor
         FROM donation_appointments da
         JOIN donors d ON da.donor_id = d.donor_id
         LEFT JOIN rare_donors rd ON d.donor_id = rd.donor_id
-        WHERE da.hospital_id = %s
-        ORDER BY da.preferred_time DESC
-    """, (hospital_id,))
-    appointments = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    """, keys=[('da.preferred_time', 'preferred_time'), ('da.appointment_id', 'appointment_id')],
+        where="da.hospital_id = %s", params=(hospital_id,))
     
-    return render_template('hospital_appointments_premium.html', appointments=appointments)
+    if wants_json():
+        return jsonify(page.to_dict())
+    return render_template('hospital_appointments_premium.html', appointments=page.items, page=page)
 
 @app.route('/approve_appointment/<int:appointment_id>')
 @login_required
 def approve_appointment(appointment_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE donation_appointments SET status = 'Approved' WHERE appointment_id = %s", (appointment_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute("UPDATE donation_appointments SET status = 'Approved' WHERE appointment_id = %s", (appointment_id,))
     flash('Appointment approved!', 'success')
     return redirect(url_for('hospital_appointments'))
 
 @app.route('/reject_appointment/<int:appointment_id>')
 @login_required
 def reject_appointment(appointment_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE donation_appointments SET status = 'Rejected' WHERE appointment_id = %s", (appointment_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute("UPDATE donation_appointments SET status = 'Rejected' WHERE appointment_id = %s", (appointment_id,))
     flash('Appointment rejected!', 'warning')
     return redirect(url_for('hospital_appointments'))
 
@@ -253,12 +320,9 @@ def donation_success():
     hospital_id = request.args.get('hospital_id')
     time = request.args.get('time')
     
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    cursor = get_cursor(dictionary=True)
     cursor.execute("SELECT name FROM hospitals WHERE hospital_id = %s", (hospital_id,))
     hospital = cursor.fetchone()
-    cursor.close()
-    conn.close()
     
     return render_template('donation_success_premium.html', 
                          donor_name=name, 
@@ -280,57 +344,42 @@ def hospital_transfers():
         units_needed = int(request.form['units_needed'])
         request_type = request.form['request_type']
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        if request_type == 'all':
-            # Send request to all hospitals (current hospital is sender)
-            cursor.execute("SELECT hospital_id FROM hospitals WHERE hospital_id != %s", (hospital_id,))
-            all_hospitals = cursor.fetchall()
-            
-            for hospital in all_hospitals:
+        with transaction() as cursor:
+            if request_type == 'all':
+                # Send request to all hospitals (current hospital is sender) in one batched insert
+                created = broadcast_transfer_request(cursor, hospital_id, blood_group, units_needed)
+                flash(f'Transfer request sent to {len(created)} hospitals!', 'success')
+            else:
+                # Send to selected hospital (current hospital is sender)
+                to_hospital = int(request.form['from_hospital'])
                 cursor.execute("""
                     INSERT INTO transfer_requests (from_hospital, to_hospital, blood_group, units_needed)
                     VALUES (%s, %s, %s, %s)
-                """, (hospital_id, hospital['hospital_id'], blood_group, units_needed))
-            
-            flash(f'Transfer request sent to {len(all_hospitals)} hospitals!', 'success')
-        else:
-            # Send to selected hospital (current hospital is sender)
-            to_hospital = int(request.form['from_hospital'])
-            cursor.execute("""
-                INSERT INTO transfer_requests (from_hospital, to_hospital, blood_group, units_needed)
-                VALUES (%s, %s, %s, %s)
-            """, (hospital_id, to_hospital, blood_group, units_needed))
-            flash('Transfer request sent!', 'success')
+                """, (hospital_id, to_hospital, blood_group, units_needed))
+                flash('Transfer request sent!', 'success')
         
-        conn.commit()
-        cursor.close()
-        conn.close()
         return redirect(url_for('hospital_transfers'))
     
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    cursor = get_cursor(dictionary=True)
     
-    # Get incoming requests
-    cursor.execute("""
+    transfer_keys = [('tr.created_at', 'created_at'), ('tr.request_id', 'request_id')]
+    
+    # Get incoming requests (paged with ?in_after= / ?in_before=)
+    incoming_page = fetch_page(cursor, """
         SELECT tr.*, h.name as from_hospital_name
         FROM transfer_requests tr
         JOIN hospitals h ON tr.from_hospital = h.hospital_id
-        WHERE tr.to_hospital = %s
-        ORDER BY tr.created_at DESC
-    """, (hospital_id,))
-    incoming_requests = cursor.fetchall()
+    """, keys=transfer_keys, where="tr.to_hospital = %s", params=(hospital_id,), prefix='in_')
     
-    # Get outgoing requests
-    cursor.execute("""
+    # Get outgoing requests (paged with ?out_after= / ?out_before=)
+    outgoing_page = fetch_page(cursor, """
         SELECT tr.*, h.name as to_hospital_name
         FROM transfer_requests tr
         JOIN hospitals h ON tr.to_hospital = h.hospital_id
-        WHERE tr.from_hospital = %s
-        ORDER BY tr.created_at DESC
-    """, (hospital_id,))
-    outgoing_requests = cursor.fetchall()
+    """, keys=transfer_keys, where="tr.from_hospital = %s", params=(hospital_id,), prefix='out_')
+    
+    if wants_json():
+        return jsonify({'incoming': incoming_page.to_dict(), 'outgoing': outgoing_page.to_dict()})
     
     # Get other hospitals for request form
     cursor.execute("""
@@ -338,36 +387,42 @@ def hospital_transfers():
     """, (hospital_id,))
     other_hospitals = cursor.fetchall()
     
-    cursor.close()
-    conn.close()
-    
     return render_template('hospital_transfers_premium.html', 
-                         incoming_requests=incoming_requests,
-                         outgoing_requests=outgoing_requests,
+                         incoming_requests=incoming_page.items,
+                         outgoing_requests=outgoing_page.items,
+                         incoming_page=incoming_page,
+                         outgoing_page=outgoing_page,
                          other_hospitals=other_hospitals,
                          selected_hospital_id=selected_hospital_id)
 
+@app.route('/hospital/transfers/export.<ext>')
+@login_required
+def export_hospital_transfers(ext):
+    if session.get('user_type') != 'hospital':
+        return redirect(url_for('login'))
+    export_format = parse_extension(ext)
+    if export_format is None:
+        return jsonify({'error': f'Unsupported export format: {ext}'}), 404
+    sql, params = export_query('blood_bank_db', 'transfers', hospital_id=session.get('user_id'))
+    return export_response(db_pool, sql, params, export_filename('transfers', export_format[0]), *export_format)
+
 @app.route('/approve_transfer/<int:request_id>')
 @login_required
 def approve_transfer(request_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE transfer_requests SET status = 'Approved' WHERE request_id = %s", (request_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
-    flash('Transfer approved!', 'success')
+    try:
+        with transaction() as cursor:
+            plan = allocate_transfer(cursor, request_id, approver_hospital=session.get('user_id'))
+        table_versions.invalidate()
+        flash(f'Transfer approved! {plan.units_allocated} units sent from {len(plan.allocations)} lot(s).', 'success')
+    except AllocationError as e:
+        flash(f'Cannot approve transfer: {e}', 'error')
     return redirect(url_for('hospital_transfers'))
 
 @app.route('/reject_transfer/<int:request_id>')
 @login_required
 def reject_transfer(request_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE transfer_requests SET status = 'Rejected' WHERE request_id = %s", (request_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute("UPDATE transfer_requests SET status = 'Rejected' WHERE request_id = %s", (request_id,))
     flash('Transfer rejected!', 'warning')
     return redirect(url_for('hospital_transfers'))
 
@@ -377,22 +432,18 @@ def hospital_network():
     if session.get('user_type') != 'hospital':
         return redirect(url_for('login'))
     
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    cursor = get_cursor(dictionary=True)
     
     cursor.execute("""
-        SELECT h.hospital_id, h.name, h.city, h.reliability_score,
-               GROUP_CONCAT(CONCAT(hi.blood_group, ':', hi.units_available) SEPARATOR ', ') as inventory
-        FROM hospitals h
-        LEFT JOIN hospital_inventory hi ON h.hospital_id = hi.hospital_id AND hi.units_available > 0
-        WHERE h.hospital_id != %s
-        GROUP BY h.hospital_id
-        ORDER BY h.city, h.name
+        SELECT hospital_id, name, city, reliability_score
+        FROM hospitals
+        WHERE hospital_id != %s
+        ORDER BY city, name
     """, (session.get('user_id'),))
     hospitals = cursor.fetchall()
-    
-    cursor.close()
-    conn.close()
+    inventory = get_network_inventory()
+    for hospital in hospitals:
+        hospital['inventory'] = inventory.get(hospital['hospital_id'], [])
     
     return render_template('hospital_network_premium.html', hospitals=hospitals)
 
@@ -406,21 +457,18 @@ def register():
         phone = request.form['phone']
         city = request.form['city']
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute("""
-                INSERT INTO hospitals (name, email, password, address, phone, city) 
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (name, email, password, address, phone, city))
-            conn.commit()
+            with transaction() as cursor:
+                cursor.execute("""
+                    INSERT INTO hospitals (name, email, password, address, phone, city) 
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """, (name, email, password, address, phone, city))
+            table_versions.invalidate()
+            reference_cache.invalidate()
             flash('Hospital registered successfully! Please login.', 'success')
             return redirect(url_for('login'))
         except mysql.connector.IntegrityError:
             flash('Email already exists!', 'error')
-        finally:
-            cursor.close()
-            conn.close()
     
     return render_template('register_premium.html')
 
@@ -438,94 +486,15 @@ def dashboard():
     if session.get('user_type') != 'hospital':
         return redirect(url_for('login'))
     
-    hospital_id = session.get('user_id')
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    
-    # Get inventory summary
-    cursor.execute("""
-        SELECT blood_group, SUM(units_available) as total_units,
-               SUM(CASE WHEN expires_on <= DATE_ADD(CURDATE(), INTERVAL 7 DAY) THEN units_available ELSE 0 END) as expiring_soon
-        FROM hospital_inventory 
-        WHERE hospital_id = %s AND units_available > 0
-        GROUP BY blood_group
-    """, (hospital_id,))
-    inventory_summary = cursor.fetchall()
-    
-    # Calculate Blood Urgency Index (BUI)
-    cursor.execute("""
-        SELECT tr.blood_group, 
-               SUM(tr.units_needed) as requested_units,
-               COALESCE(hi.total_units, 0) as available_units,
-               COALESCE(hi.expiring_soon, 0) as expiring_soon
-        FROM transfer_requests tr
-        LEFT JOIN (
-            SELECT blood_group, SUM(units_available) as total_units,
-                   SUM(CASE WHEN expires_on <= DATE_ADD(CURDATE(), INTERVAL 7 DAY) THEN units_available ELSE 0 END) as expiring_soon
-            FROM hospital_inventory WHERE hospital_id = %s GROUP BY blood_group
-        ) hi ON tr.blood_group = hi.blood_group
-        WHERE tr.to_hospital = %s AND tr.status = 'Pending'
-        GROUP BY tr.blood_group
-    """, (hospital_id, hospital_id))
-    bui_data = cursor.fetchall()
-    
-    # Get pending appointments
-    cursor.execute("""
-        SELECT COUNT(*) as pending_appointments
-        FROM donation_appointments 
-        WHERE hospital_id = %s AND status = 'Pending'
-    """, (hospital_id,))
-    pending_appointments = cursor.fetchone()['pending_appointments']
-    
-    # Get today's appointments
-    cursor.execute("""
-        SELECT COUNT(*) as today_appointments
-        FROM donation_appointments 
-        WHERE hospital_id = %s AND DATE(preferred_time) = CURDATE()
-    """, (hospital_id,))
-    today_appointments = cursor.fetchone()['today_appointments']
+    snapshot = fetch_dashboard(session.get('user_id'))
     
-    # Get transfer requests
-    cursor.execute("""
-        SELECT 
-            (SELECT COUNT(*) FROM transfer_requests WHERE to_hospital = %s AND status = 'Pending') as incoming_requests,
-            (SELECT COUNT(*) FROM transfer_requests WHERE from_hospital = %s AND status = 'Pending') as outgoing_requests
-    """, (hospital_id, hospital_id))
-    transfer_summary = cursor.fetchone()
-    
-    # Get rare donors in city
-    cursor.execute("""
-        SELECT city FROM hospitals WHERE hospital_id = %s
-    """, (hospital_id,))
-    hospital_result = cursor.fetchone()
-    hospital_city = hospital_result['city'] if hospital_result else 'Unknown'
-    
-    cursor.execute("""
-        SELECT d.name, d.blood_group, d.phone
-        FROM donors d
-        JOIN rare_donors rd ON d.donor_id = rd.donor_id
-        WHERE d.city = %s
-        ORDER BY d.name
-    """, (hospital_city,))
-    rare_donors = cursor.fetchall()
-    
-    cursor.close()
-    conn.close()
-    
-    return render_template('hospital_dashboard_premium.html', 
-                         inventory_summary=inventory_summary,
-                         bui_data=bui_data,
-                         pending_appointments=pending_appointments,
-                         today_appointments=today_appointments,
-                         transfer_summary=transfer_summary,
-                         rare_donors=rare_donors)
+    return render_template('hospital_dashboard_premium.html', **snapshot.template_context())
 
 # Original Dashboard Route (fallback)
 @app.route('/old_dashboard')
 @login_required
 def old_dashboard():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    cursor = get_cursor(dictionary=True)
     
     # Get blood group counts
     cursor.execute("""
@@ -548,9 +517,6 @@ def old_dashboard():
     cursor.execute("SELECT COUNT(*) as total FROM emergency_requests WHERE status = 'Pending'")
     pending_requests = cursor.fetchone()['total']
     
-    cursor.close()
-    conn.close()
-    
     return render_template('dashboard.html', 
                          blood_counts=blood_counts,
                          total_donors=total_donors,
@@ -561,13 +527,11 @@ def old_dashboard():
 @app.route('/donors')
 @login_required
 def donors():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM donors ORDER BY donor_id DESC")
-    donors_list = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return render_template('donors.html', donors=donors_list)
+    cursor = get_cursor(dictionary=True)
+    page = fetch_page(cursor, "SELECT * FROM donors", keys=[('donor_id', 'donor_id')])
+    if wants_json():
+        return jsonify(page.to_dict())
+    return render_template('donors.html', donors=page.items, page=page)
 
 @app.route('/add_donor', methods=['GET', 'POST'])
 @login_required
@@ -577,16 +541,23 @@ def add_donor():
         age = request.form['age']
         gender = request.form['gender']
         blood_group = request.form['blood_group']
+        phone = request.form.get('phone', '').strip() or None
+        phone_key = normalize_phone(phone)
+        if phone and phone_key is None:
+            flash('Please enter a valid phone number.', 'error')
+            return render_template('add_donor.html')
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO donors (name, age, gender, blood_group) 
-            VALUES (%s, %s, %s, %s)
-        """, (name, age, gender, blood_group))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        try:
+            with transaction() as cursor:
+                cursor.execute("""
+                    INSERT INTO donors (name, age, gender, blood_group, phone, phone_key) 
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    """, (name, age, gender, blood_group, phone, phone_key))
+        except mysql.connector.IntegrityError as e:
+            if not is_duplicate_phone(e):
+                raise
+            flash('A donor with this phone number is already registered.', 'error')
+            return render_template('add_donor.html')
         
         flash('Donor added successfully!', 'success')
         return redirect(url_for('donors'))
@@ -597,18 +568,24 @@ def add_donor():
 @app.route('/inventory')
 @login_required
 def inventory():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("""
+    cursor = get_cursor(dictionary=True)
+    page = fetch_page(cursor, """
         SELECT bi.*, d.name as donor_name 
         FROM blood_inventory bi 
         LEFT JOIN donors d ON bi.donor_id = d.donor_id 
-        ORDER BY bi.bag_id DESC
-    """)
-    inventory_list = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return render_template('inventory.html', inventory=inventory_list)
+    """, keys=[('bi.bag_id', 'bag_id')])
+    if wants_json():
+        return jsonify(page.to_dict())
+    return render_template('inventory.html', inventory=page.items, page=page)
+
+@app.route('/inventory/export.<ext>')
+@login_required
+def export_inventory(ext):
+    export_format = parse_extension(ext)
+    if export_format is None:
+        return jsonify({'error': f'Unsupported export format: {ext}'}), 404
+    sql, params = export_query('blood_bank_db', 'inventory')
+    return export_response(db_pool, sql, params, export_filename('inventory', export_format[0]), *export_format)
 
 @app.route('/add_blood', methods=['GET', 'POST'])
 @login_required
@@ -622,26 +599,19 @@ def add_blood():
         collected_date = datetime.strptime(collected_on, '%Y-%m-%d')
         expires_on = collected_date + timedelta(days=90)
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO blood_inventory (donor_id, blood_group, collected_on, expires_on) 
-            VALUES (%s, %s, %s, %s)
-        """, (donor_id, blood_group, collected_on, expires_on.date()))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with transaction() as cursor:
+            cursor.execute("""
+                INSERT INTO blood_inventory (donor_id, blood_group, collected_on, expires_on) 
+                VALUES (%s, %s, %s, %s)
+                """, (donor_id, blood_group, collected_on, expires_on.date()))
         
         flash('Blood bag added successfully!', 'success')
         return redirect(url_for('inventory'))
     
     # Get donors for dropdown
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    cursor = get_cursor(dictionary=True)
     cursor.execute("SELECT donor_id, name, blood_group FROM donors")
     donors_list = cursor.fetchall()
-    cursor.close()
-    conn.close()
     
     return render_template('add_blood.html', donors=donors_list)
 
@@ -649,8 +619,7 @@ def add_blood():
 @app.route('/emergency_requests')
 @login_required
 def emergency_requests():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    cursor = get_cursor(dictionary=True)
     cursor.execute("""
         SELECT er.*, h.name as hospital_name 
         FROM emergency_requests er 
@@ -665,8 +634,6 @@ def emergency_requests():
             er.requested_on DESC
     """)
     requests_list = cursor.fetchall()
-    cursor.close()
-    conn.close()
     return render_template('emergency_requests.html', requests=requests_list)
 
 @app.route('/add_emergency_request', methods=['GET', 'POST'])
@@ -680,15 +647,11 @@ def add_emergency_request():
         
         hospital_id = session.get('user_id')
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO emergency_requests (hospital_id, requester_name, blood_group, units_required, urgency) 
-            VALUES (%s, %s, %s, %s, %s)
-        """, (hospital_id, requester_name, blood_group, units_required, urgency))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with transaction() as cursor:
+            cursor.execute("""
+                INSERT INTO emergency_requests (hospital_id, requester_name, blood_group, units_required, urgency) 
+                VALUES (%s, %s, %s, %s, %s)
+                """, (hospital_id, requester_name, blood_group, units_required, urgency))
         
         flash('Emergency request submitted successfully!', 'success')
         return redirect(url_for('emergency_requests'))
@@ -698,25 +661,31 @@ def add_emergency_request():
 @app.route('/approve_request/<int:request_id>')
 @login_required
 def approve_request(request_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE emergency_requests SET status = 'Approved' WHERE request_id = %s", (request_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
-    
-    flash('Emergency request approved!', 'success')
+    with transaction() as cursor:
+        result = fulfil_emergency_requests(cursor, request_ids=[request_id])
+    
+    if result.approved:
+        flash('Emergency request approved!', 'success')
+    else:
+        flash('Not enough available blood bags to approve this request.', 'error')
+    return redirect(url_for('emergency_requests'))
+
+@app.route('/fulfil_emergency_requests', methods=['POST'])
+@login_required
+def fulfil_emergency_requests_batch():
+    # Serve every Pending request stock can cover, most urgent and oldest first
+    with transaction() as cursor:
+        result = fulfil_emergency_requests(cursor)
+    
+    flash(f'Approved {len(result.approved)} emergency request(s) using {result.bags_used} bag(s); '
+          f'{len(result.unfilled)} left pending.', 'success' if result.approved else 'info')
     return redirect(url_for('emergency_requests'))
 
 @app.route('/reject_request/<int:request_id>')
 @login_required
 def reject_request(request_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE emergency_requests SET status = 'Rejected' WHERE request_id = %s", (request_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute("UPDATE emergency_requests SET status = 'Rejected' WHERE request_id = %s", (request_id,))
     
     flash('Emergency request rejected!', 'warning')
     return redirect(url_for('emergency_requests'))
@@ -725,13 +694,103 @@ def reject_request(request_id):
 @app.route('/logs')
 @login_required
 def logs():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM inventory_logs ORDER BY log_id DESC LIMIT 100")
-    logs_list = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return render_template('logs.html', logs=logs_list)
+    cursor = get_cursor(dictionary=True)
+    filters = LogFilters.from_args(request.args, 'blood_bank_db')
+    where, params = filters.where('il')
+    page = fetch_page(cursor, "SELECT il.* FROM inventory_logs il",
+                      keys=[('il.created_at', 'created_at'), ('il.log_id', 'log_id')], where=where, params=params)
+    if wants_json():
+        return jsonify(page.to_dict())
+    return render_template('logs.html', logs=page.items, page=page, filters=filters.to_dict(),
+                           action_types=LOG_SCHEMAS['blood_bank_db']['action_types'])
+
+@app.route('/logs/export.<ext>')
+@login_required
+def export_logs(ext):
+    export_format = parse_extension(ext)
+    if export_format is None:
+        return jsonify({'error': f'Unsupported export format: {ext}'}), 404
+    where, params = LogFilters.from_args(request.args, 'blood_bank_db').where('il')
+    sql, params = export_query('blood_bank_db', 'logs', where=where, params=params)
+    return export_response(db_pool, sql, params, export_filename('inventory-logs', export_format[0]), *export_format)
+
+# Hospitals able to supply blood compatible with a recipient group
+@app.route('/api/compatible_search')
+@login_required
+def compatible_search():
+    blood_group = request.args.get('blood_group', '')
+    units = request.args.get('units', 1, type=int)
+    try:
+        candidates = search_compatible(get_cursor(), 'blood_bank_db', blood_group, units,
+                                       exclude_hospital=session.get('user_id'),
+                                       city=request.args.get('city') or None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'blood_group': blood_group, 'units': units,
+                    'candidates': [candidate.to_dict() for candidate in candidates]})
+
+# Network-wide stock from the in-memory matrix
+@app.route('/api/network_matrix')
+@login_required
+def network_stock():
+    if network_matrix is None:
+        return jsonify({'error': 'numpy is not installed'}), 503
+    blood_group = request.args.get('blood_group') or None
+    if blood_group is not None and blood_group not in BLOOD_GROUPS:
+        return jsonify({'error': f'Unknown blood group {blood_group}'}), 400
+    matrix = current_network_matrix()
+    return jsonify({
+        'totals': matrix.totals(),
+        'top_hospitals': matrix.top_hospitals(blood_group, request.args.get('k', 10, type=int),
+                                              exclude=session.get('user_id')),
+        'cities_below': matrix.cities_below(request.args.get('threshold', 10, type=int), blood_group),
+        'matrix': matrix.stats()
+    })
+
+# Connection pool statistics
+@app.route('/api/pool_stats')
+@login_required
+def pool_stats():
+    return jsonify(db_pool.stats())
+
+# Reference cache statistics
+@app.route('/api/cache_stats')
+@login_required
+def cache_stats():
+    return jsonify(reference_cache.stats())
+
+# Suggested transfers moving expiring stock to hospitals that are short
+@app.route('/admin/rebalance')
+@admin_required
+def admin_rebalance():
+    blood_group = request.args.get('blood_group') or None
+    if blood_group is not None and blood_group not in BLOOD_GROUPS:
+        abort(400)
+    safety_stock = max(request.args.get('safety_stock', SAFETY_STOCK, type=int), 0)
+    plan = plan_for_database(get_cursor(), 'blood_bank_db', city_distances, safety_stock,
+                             (blood_group,) if blood_group else BLOOD_GROUPS)
+    if wants_json():
+        return jsonify(plan.to_dict())
+    return render_template('admin/rebalance.html', base_template='base.html', plan=plan, blood_group=blood_group,
+                           safety_stock=safety_stock, blood_groups=BLOOD_GROUPS)
+
+# Top statements by database time (debug mode only)
+@app.route('/admin/perf', methods=['GET', 'POST'])
+@login_required
+def admin_perf():
+    if not app.debug:
+        abort(404)
+    if request.method == 'POST':
+        query_monitor.reset()
+        return redirect(url_for('admin_perf'))
+    order_by = request.args.get('sort', 'total_ms')
+    if order_by not in ORDER_KEYS:
+        order_by = 'total_ms'
+    statements = query_monitor.top(50, order_by)
+    if wants_json():
+        return jsonify({'stats': query_monitor.stats(), 'statements': statements})
+    return render_template('admin/perf.html', base_template='base.html', stats=query_monitor.stats(),
+                           statements=statements, order_by=order_by, order_keys=ORDER_KEYS)
 
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
\ No newline at end of file
@@ -4,13 +4,30 @@ Flask Application with MySQL Backend
 Dark Theme UI with Multi-Role Architecture
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
-import mysql.connector
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, abort
+from db import ConnectionPool, init_app, get_db, get_cursor, transaction
+from cache import TTLCache
+from http_cache import TableVersions, conditional_json
+from pagination import fetch_page, wants_json
+from allocation_service import allocate_transfer, AllocationError
+from audit_log import AuditWriter
+from log_store import LogFilters, LOG_SCHEMAS
+from export_service import export_query, export_response, export_filename, parse_extension
+from import_service import import_csv
+from query_stats import QueryMonitor, DEFAULT_SLOW_MS, ORDER_KEYS
+from compatibility_service import search_compatible, BLOOD_GROUPS
+from network_matrix import NetworkMatrix, HAVE_NUMPY
+from rebalance_planner import plan_for_database, load_city_distances, SAFETY_STOCK
+from expiry_scheduler import ExpiryScheduler
+from donor_service import normalize_phone, register_donor
 from mysql.connector import Error
 import bcrypt
 from datetime import datetime, timedelta
+import csv
+import io
 import os
 from functools import wraps
+from werkzeug.serving import is_running_from_reloader
 
 app = Flask(__name__)
 app.secret_key = 'blood_network_secret_key_2024'
@@ -24,14 +41,83 @@ DB_CONFIG = {
     'autocommit': True
 }
 
-# Database Connection Helper
-def get_db_connection():
-    try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
-    except Error as e:
-        print(f"Database connection error: {e}")
-        return None
+# Connection Pool
+POOL_CONFIG = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'timeout': 10,
+    'max_lifetime': 1800
+}
+
+db_pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+init_app(app, db_pool)
+
+# Statement timings behind Server-Timing headers, the slow-query log and /admin/perf
+query_monitor = QueryMonitor(slow_ms=float(os.environ.get('SLOW_QUERY_MS', DEFAULT_SLOW_MS)))
+
+query_monitor.init_app(app, db_pool)
+
+# city_a,city_b,km table for the rebalancing planner; unknown pairs use a flat distance
+city_distances = load_city_distances(os.environ.get('CITY_DISTANCES_CSV'))
+
+# Lot expiry normally runs as its own process (python expiry_scheduler.py, or
+# --once from cron). EXPIRY_SCHEDULER=embedded runs it in a daemon thread of
+# this process instead; under `python app_blood_network.py` only the reloader's serving
+# process starts it.
+if os.environ.get('EXPIRY_SCHEDULER') == 'embedded' and (__name__ != '__main__' or is_running_from_reloader()):
+    ExpiryScheduler('blood_network_db', db_config=DB_CONFIG).start()
+
+# Audit logging: 'trigger' keeps the system_logs triggers; 'buffered' writes
+# system_logs from a background batch writer instead (run
+# database/audit_buffered_logging.sql to drop the logging triggers first)
+AUDIT_MODE = os.environ.get('AUDIT_MODE', 'trigger')
+audit_writer = AuditWriter(db_pool, 'system_logs') if AUDIT_MODE == 'buffered' else None
+
+def audit(action_type, description, related_id=None, hospital_id=None):
+    """Record a system_logs event when buffered auditing is enabled"""
+    if audit_writer is not None:
+        audit_writer.emit(action_type, description, related_id, hospital_id)
+
+# Table versions behind API ETags and reference cache keys
+table_versions = TableVersions('blood_network_db', ttl=2)
+
+# Reference Data Cache (cities and hospital lists change only on registration)
+reference_cache = TTLCache(maxsize=256, ttl=600)
+
+# Hospitals x blood groups matrix for network-wide views (needs numpy)
+network_matrix = NetworkMatrix('blood_network_db') if HAVE_NUMPY else None
+
+def current_network_matrix():
+    """The network matrix, refreshed if inventory or hospitals changed"""
+    network_matrix.refresh(get_cursor(), table_versions.current('hospitals', 'inventory_summary'))
+    return network_matrix
+
+def get_cities():
+    """Distinct hospital cities, cached"""
+    def load():
+        cursor = get_cursor(dictionary=True)
+        cursor.execute("SELECT DISTINCT city FROM hospitals ORDER BY city")
+        return cursor.fetchall()
+    version = table_versions.current('hospitals')
+    return reference_cache.get_or_load(('cities', version), load)
+
+def get_all_hospitals():
+    """All hospitals for the booking form, cached"""
+    def load():
+        cursor = get_cursor(dictionary=True)
+        cursor.execute("SELECT hospital_id, hospital_name, city FROM hospitals ORDER BY city, hospital_name")
+        return cursor.fetchall()
+    version = table_versions.current('hospitals')
+    return reference_cache.get_or_load(('hospitals', version), load)
+
+def get_hospitals_in_city(city, version=None):
+    """Hospitals in one city, cached"""
+    def load():
+        cursor = get_cursor(dictionary=True)
+        cursor.execute("SELECT hospital_id, hospital_name FROM hospitals WHERE city = %s", (city,))
+        return cursor.fetchall()
+    version = version or table_versions.current('hospitals')
+    return reference_cache.get_or_load(('hospitals', city, version), load)
 
 # Authentication Decorators
 def hospital_required(f):
@@ -57,30 +143,23 @@ def admin_required(f):
 @app.route('/')
 def index():
     """Public landing page for donors"""
-    connection = get_db_connection()
-    if connection:
-        cursor = connection.cursor(dictionary=True)
-        
-        # Get available hospitals by city
-        cursor.execute("SELECT DISTINCT city FROM hospitals ORDER BY city")
-        cities = cursor.fetchall()
+    try:
+        cursor = get_cursor(dictionary=True)
         
         # Get total blood availability across all hospitals
         cursor.execute("""
-            SELECT blood_group, SUM(units_available) as total_units
-            FROM hospital_inventory 
-            WHERE status = 'Available' AND expiry_date > CURDATE()
+            SELECT blood_group, SUM(total_units) as total_units
+            FROM inventory_summary 
             GROUP BY blood_group
             ORDER BY blood_group
         """)
         blood_availability = cursor.fetchall()
         
-        cursor.close()
-        connection.close()
-        
         return render_template('public/donor_home.html', 
-                             cities=cities, 
+                             cities=get_cities(), 
                              blood_availability=blood_availability)
+    except Error as e:
+        print(f"Database connection error: {e}")
     
     return render_template('public/donor_home.html', cities=[], blood_availability=[])
 
@@ -97,18 +176,22 @@ def donate():
         city = request.form['city']
         hospital_id = int(request.form['hospital_id'])
         preferred_time = request.form['preferred_time']
-        
-        connection = get_db_connection()
-        if connection:
-            cursor = connection.cursor()
-            
-            try:
-                # Check if donor exists
-                cursor.execute("SELECT donor_id, last_donation_date FROM donors WHERE phone = %s", (phone,))
-                existing_donor = cursor.fetchone()
+        phone_key = normalize_phone(phone)
+        if phone_key is None:
+            flash('Please enter a valid phone number.', 'error')
+            return redirect(url_for('donate'))
+        
+        try:
+            # Donor upsert and appointment commit together
+            with transaction() as cursor:
+                # Point read on the unique phone_key; a concurrent first
+                # booking for the same number resolves to the same donor
+                donor_id, existing_donor = register_donor(cursor, phone_key, """
+                    INSERT INTO donors (name, age, gender, blood_group, phone, phone_key, city)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """, (name, age, gender, blood_group, phone, phone_key, city), 'donor_id, last_donation_date')
                 
                 if existing_donor:
-                    donor_id = existing_donor[0]
                     last_donation = existing_donor[1]
                     
                     # Check 90-day rule
@@ -121,42 +204,33 @@ def donate():
                         UPDATE donors SET name=%s, age=%s, gender=%s, blood_group=%s, city=%s 
                         WHERE donor_id=%s
                     """, (name, age, gender, blood_group, city, donor_id))
-                else:
-                    # Create new donor
-                    cursor.execute("""
-                        INSERT INTO donors (name, age, gender, blood_group, phone, city)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                    """, (name, age, gender, blood_group, phone, city))
-                    donor_id = cursor.lastrowid
                 
                 # Create appointment
                 cursor.execute("""
                     INSERT INTO donation_appointments (donor_id, hospital_id, preferred_time)
                     VALUES (%s, %s, %s)
                 """, (donor_id, hospital_id, preferred_time))
-                
-                flash('Donation appointment requested successfully! Hospital will contact you soon.', 'success')
-                return redirect(url_for('index'))
-                
-            except Error as e:
-                flash(f'Error: {e}', 'error')
-            finally:
-                cursor.close()
-                connection.close()
+                appointment_id = cursor.lastrowid
+            
+            audit('DONATION_REQUEST',
+                  f'New donation appointment requested by donor ID {donor_id} for {preferred_time}',
+                  appointment_id, hospital_id)
+            
+            flash('Donation appointment requested successfully! Hospital will contact you soon.', 'success')
+            return redirect(url_for('index'))
+            
+        except Error as e:
+            flash(f'Error: {e}', 'error')
     
     # GET request - show form
-    connection = get_db_connection()
     cities = []
     hospitals = []
     
-    if connection:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT DISTINCT city FROM hospitals ORDER BY city")
-        cities = cursor.fetchall()
-        cursor.execute("SELECT hospital_id, hospital_name, city FROM hospitals ORDER BY city, hospital_name")
-        hospitals = cursor.fetchall()
-        cursor.close()
-        connection.close()
+    try:
+        cities = get_cities()
+        hospitals = get_all_hospitals()
+    except Error as e:
+        print(f"Database connection error: {e}")
     
     return render_template('public/donate.html', cities=cities, hospitals=hospitals)
 
@@ -169,22 +243,17 @@ def hospital_login():
         email = request.form['email']
         password = request.form['password']
         
-        connection = get_db_connection()
-        if connection:
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM hospitals WHERE email = %s", (email,))
-            hospital = cursor.fetchone()
-            
-            if hospital and bcrypt.checkpw(password.encode('utf-8'), hospital['password'].encode('utf-8')):
-                session['hospital_id'] = hospital['hospital_id']
-                session['hospital_name'] = hospital['hospital_name']
-                flash(f'Welcome, {hospital["hospital_name"]}!', 'success')
-                return redirect(url_for('hospital_dashboard'))
-            else:
-                flash('Invalid credentials', 'error')
-            
-            cursor.close()
-            connection.close()
+        cursor = get_cursor(dictionary=True)
+        cursor.execute("SELECT * FROM hospitals WHERE email = %s", (email,))
+        hospital = cursor.fetchone()
+        
+        if hospital and bcrypt.checkpw(password.encode('utf-8'), hospital['password'].encode('utf-8')):
+            session['hospital_id'] = hospital['hospital_id']
+            session['hospital_name'] = hospital['hospital_name']
+            flash(f'Welcome, {hospital["hospital_name"]}!', 'success')
+            return redirect(url_for('hospital_dashboard'))
+        else:
+            flash('Invalid credentials', 'error')
     
     return render_template('hospital/login.html')
 
@@ -193,17 +262,14 @@ def hospital_login():
 def hospital_dashboard():
     """Hospital dashboard"""
     hospital_id = session['hospital_id']
-    connection = get_db_connection()
-    
-    if connection:
-        cursor = connection.cursor(dictionary=True)
+    try:
+        cursor = get_cursor(dictionary=True)
         
         # Get hospital inventory
         cursor.execute("""
-            SELECT blood_group, SUM(units_available) as total_units
-            FROM hospital_inventory 
-            WHERE hospital_id = %s AND status = 'Available' AND expiry_date > CURDATE()
-            GROUP BY blood_group
+            SELECT blood_group, total_units
+            FROM inventory_summary 
+            WHERE hospital_id = %s AND total_units > 0
             ORDER BY blood_group
         """, (hospital_id,))
         inventory = cursor.fetchall()
@@ -240,14 +306,13 @@ def hospital_dashboard():
         """, (hospital_id,))
         outgoing_requests = cursor.fetchall()
         
-        cursor.close()
-        connection.close()
-        
         return render_template('hospital/dashboard.html',
                              inventory=inventory,
                              pending_appointments=pending_appointments,
                              incoming_requests=incoming_requests,
                              outgoing_requests=outgoing_requests)
+    except Error as e:
+        print(f"Database connection error: {e}")
     
     return render_template('hospital/dashboard.html')
 
@@ -256,10 +321,8 @@ def hospital_dashboard():
 def hospital_inventory():
     """Hospital inventory management"""
     hospital_id = session['hospital_id']
-    connection = get_db_connection()
-    
-    if connection:
-        cursor = connection.cursor(dictionary=True)
+    try:
+        cursor = get_cursor(dictionary=True)
         cursor.execute("""
             SELECT * FROM hospital_inventory 
             WHERE hospital_id = %s 
@@ -267,10 +330,9 @@ def hospital_inventory():
         """, (hospital_id,))
         inventory = cursor.fetchall()
         
-        cursor.close()
-        connection.close()
-        
         return render_template('hospital/inventory.html', inventory=inventory)
+    except Error as e:
+        print(f"Database connection error: {e}")
     
     return render_template('hospital/inventory.html', inventory=[])
 
@@ -284,36 +346,73 @@ def add_blood():
         expiry_date = request.form['expiry_date']
         hospital_id = session['hospital_id']
         
-        connection = get_db_connection()
-        if connection:
-            cursor = connection.cursor()
-            
-            try:
+        try:
+            with transaction() as cursor:
                 cursor.execute("""
                     INSERT INTO hospital_inventory (hospital_id, blood_group, units_available, expiry_date)
                     VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE units_available = units_available + VALUES(units_available),
+                                            h_bag_id = LAST_INSERT_ID(h_bag_id)
                 """, (hospital_id, blood_group, units, expiry_date))
-                
-                flash('Blood units added successfully!', 'success')
-                return redirect(url_for('hospital_inventory'))
-                
-            except Error as e:
-                flash(f'Error: {e}', 'error')
-            finally:
-                cursor.close()
-                connection.close()
+                lot_id = cursor.lastrowid
+            audit('BLOOD_ADDED', f'New blood added: {blood_group} ({units} units) - Expires: {expiry_date}',
+                  lot_id, hospital_id)
+            
+            table_versions.invalidate()
+            flash('Blood units added successfully!', 'success')
+            return redirect(url_for('hospital_inventory'))
+            
+        except Error as e:
+            flash(f'Error: {e}', 'error')
     
     return render_template('hospital/add_blood.html')
 
+@app.route('/hospital/import_inventory', methods=['POST'])
+@hospital_required
+def import_inventory():
+    """Bulk-add lots from an uploaded CSV (blood_group, units, expiry_date)"""
+    upload = request.files.get('csv_file')
+    if not upload or not upload.filename:
+        flash('Choose a CSV file to import.', 'error')
+        return redirect(url_for('add_blood'))
+    
+    hospital_id = session['hospital_id']
+    
+    def audit_chunk(rows):
+        # One log entry per committed chunk; the per-lot log_new_blood_entry
+        # trigger is dropped when AUDIT_MODE=buffered
+        units = {}
+        for _, blood_group, lot_units, _ in rows:
+            units[blood_group] = units.get(blood_group, 0) + lot_units
+        audit('BLOOD_ADDED',
+              f'CSV import {upload.filename}: {len(rows)} lot(s), {sum(units.values())} units - '
+              + ', '.join(f'{group} {total}' for group, total in sorted(units.items())),
+              None, hospital_id)
+    
+    try:
+        stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+        result = import_csv(get_db(), 'blood_network_db', 'lots', stream, hospital_id=hospital_id,
+                            on_chunk=audit_chunk)
+        table_versions.invalidate()
+        if result.error:
+            flash(f'Import stopped after {result.imported} lot(s): {result.error}', 'error')
+        else:
+            flash(f'Imported {result.imported} lot(s).', 'success')
+        if result.rejected:
+            details = '; '.join(f'line {line}: {message}' for line, message in result.errors[:5])
+            flash(f'Skipped {result.rejected} invalid row(s) - {details}', 'warning')
+    except (Error, UnicodeDecodeError, csv.Error) as e:
+        flash(f'Import stopped: {e}', 'error')
+    
+    return redirect(url_for('hospital_inventory'))
+
 @app.route('/hospital/appointments')
 @hospital_required
 def hospital_appointments():
     """Manage donation appointments"""
     hospital_id = session['hospital_id']
-    connection = get_db_connection()
-    
-    if connection:
-        cursor = connection.cursor(dictionary=True)
+    try:
+        cursor = get_cursor(dictionary=True)
         cursor.execute("""
             SELECT da.*, d.name, d.age, d.gender, d.blood_group, d.phone, d.city
             FROM donation_appointments da
@@ -323,10 +422,9 @@ def hospital_appointments():
         """, (hospital_id,))
         appointments = cursor.fetchall()
         
-        cursor.close()
-        connection.close()
-        
         return render_template('hospital/appointments.html', appointments=appointments)
+    except Error as e:
+        print(f"Database connection error: {e}")
     
     return render_template('hospital/appointments.html', appointments=[])
 
@@ -334,18 +432,14 @@ def hospital_appointments():
 @hospital_required
 def approve_appointment(appointment_id):
     """Approve donation appointment"""
-    connection = get_db_connection()
-    if connection:
-        cursor = connection.cursor()
+    with transaction() as cursor:
         cursor.execute("""
             UPDATE donation_appointments 
             SET status = 'Approved' 
             WHERE appointment_id = %s AND hospital_id = %s
         """, (appointment_id, session['hospital_id']))
-        
-        flash('Appointment approved successfully!', 'success')
-        cursor.close()
-        connection.close()
+    
+    flash('Appointment approved successfully!', 'success')
     
     return redirect(url_for('hospital_appointments'))
 
@@ -353,18 +447,14 @@ def approve_appointment(appointment_id):
 @hospital_required
 def complete_appointment(appointment_id):
     """Mark appointment as completed"""
-    connection = get_db_connection()
-    if connection:
-        cursor = connection.cursor()
+    with transaction() as cursor:
         cursor.execute("""
             UPDATE donation_appointments 
             SET status = 'Completed' 
             WHERE appointment_id = %s AND hospital_id = %s
         """, (appointment_id, session['hospital_id']))
-        
-        flash('Donation completed successfully!', 'success')
-        cursor.close()
-        connection.close()
+    
+    flash('Donation completed successfully!', 'success')
     
     return redirect(url_for('hospital_appointments'))
 
@@ -372,25 +462,23 @@ def complete_appointment(appointment_id):
 @hospital_required
 def hospital_network():
     """View blood availability across all hospitals"""
-    connection = get_db_connection()
+    if network_matrix is not None:
+        return render_template('hospital/network.html', network_data=current_network_matrix().network_rows())
     
-    if connection:
-        cursor = connection.cursor(dictionary=True)
+    try:
+        cursor = get_cursor(dictionary=True)
         cursor.execute("""
-            SELECT h.hospital_name, h.city, hi.blood_group, 
-                   SUM(hi.units_available) as total_units
+            SELECT h.hospital_name, h.city, s.blood_group, s.total_units
             FROM hospitals h
-            LEFT JOIN hospital_inventory hi ON h.hospital_id = hi.hospital_id
-            WHERE hi.status = 'Available' AND hi.expiry_date > CURDATE()
-            GROUP BY h.hospital_id, hi.blood_group
-            ORDER BY h.city, h.hospital_name, hi.blood_group
+            JOIN inventory_summary s ON h.hospital_id = s.hospital_id
+            WHERE s.total_units > 0
+            ORDER BY h.city, h.hospital_name, s.blood_group
         """)
         network_data = cursor.fetchall()
         
-        cursor.close()
-        connection.close()
-        
         return render_template('hospital/network.html', network_data=network_data)
+    except Error as e:
+        print(f"Database connection error: {e}")
     
     return render_template('hospital/network.html', network_data=[])
 
@@ -405,32 +493,30 @@ def request_blood():
         urgency = request.form['urgency']
         notes = request.form.get('notes', '')
         
-        connection = get_db_connection()
-        if connection:
-            cursor = connection.cursor()
-            
-            try:
+        try:
+            with transaction() as cursor:
                 cursor.execute("""
                     INSERT INTO transfer_requests 
                     (from_hospital_id, to_hospital_id, blood_group, units_needed, urgency, notes)
                     VALUES (%s, %s, %s, %s, %s, %s)
                 """, (session['hospital_id'], to_hospital_id, blood_group, units_needed, urgency, notes))
-                
-                flash('Blood transfer request sent successfully!', 'success')
-                return redirect(url_for('hospital_dashboard'))
-                
-            except Error as e:
-                flash(f'Error: {e}', 'error')
-            finally:
-                cursor.close()
-                connection.close()
+                request_id = cursor.lastrowid
+            audit('TRANSFER_REQUEST',
+                  f"Blood transfer requested: {units_needed} units of {blood_group} "
+                  f"from hospital {session['hospital_id']} to hospital {to_hospital_id}",
+                  request_id, session['hospital_id'])
+            
+            flash('Blood transfer request sent successfully!', 'success')
+            return redirect(url_for('hospital_dashboard'))
+            
+        except Error as e:
+            flash(f'Error: {e}', 'error')
     
     # GET request - show form
-    connection = get_db_connection()
     hospitals = []
     
-    if connection:
-        cursor = connection.cursor(dictionary=True)
+    try:
+        cursor = get_cursor(dictionary=True)
         cursor.execute("""
             SELECT hospital_id, hospital_name, city 
             FROM hospitals 
@@ -438,28 +524,28 @@ def request_blood():
             ORDER BY city, hospital_name
         """, (session['hospital_id'],))
         hospitals = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
+    except Error as e:
+        print(f"Database connection error: {e}")
     
     return render_template('hospital/request_blood.html', hospitals=hospitals)
 
 @app.route('/hospital/approve_transfer/<int:request_id>')
 @hospital_required
 def approve_transfer(request_id):
-    """Approve blood transfer request"""
-    connection = get_db_connection()
-    if connection:
-        cursor = connection.cursor()
-        cursor.execute("""
-            UPDATE transfer_requests 
-            SET status = 'Approved' 
-            WHERE request_id = %s AND to_hospital_id = %s
-        """, (request_id, session['hospital_id']))
-        
-        flash('Transfer request approved!', 'success')
-        cursor.close()
-        connection.close()
+    """Approve blood transfer request (FEFO allocation across lots)"""
+    try:
+        with transaction() as cursor:
+            plan = allocate_transfer(cursor, request_id, approver_hospital=session['hospital_id'],
+                                     database='blood_network_db')
+        table_versions.invalidate()
+        audit('TRANSFER_APPROVED',
+              f'Blood transfer approved: {plan.units_allocated} units of {plan.blood_group} '
+              f'from hospital {plan.supplier_hospital} to hospital {plan.receiving_hospital}',
+              request_id, plan.supplier_hospital)
+        flash(f'Transfer request approved! {plan.units_allocated} units sent from '
+              f'{len(plan.allocations)} lot(s).', 'success')
+    except AllocationError as e:
+        flash(f'Cannot approve transfer: {e}', 'error')
     
     return redirect(url_for('hospital_dashboard'))
 
@@ -467,18 +553,14 @@ def approve_transfer(request_id):
 @hospital_required
 def deny_transfer(request_id):
     """Deny blood transfer request"""
-    connection = get_db_connection()
-    if connection:
-        cursor = connection.cursor()
+    with transaction() as cursor:
         cursor.execute("""
             UPDATE transfer_requests 
             SET status = 'Denied', resolved_on = CURRENT_TIMESTAMP 
             WHERE request_id = %s AND to_hospital_id = %s
         """, (request_id, session['hospital_id']))
-        
-        flash('Transfer request denied.', 'info')
-        cursor.close()
-        connection.close()
+    
+    flash('Transfer request denied.', 'info')
     
     return redirect(url_for('hospital_dashboard'))
 
@@ -499,22 +581,17 @@ def admin_login():
         username = request.form['username']
         password = request.form['password']
         
-        connection = get_db_connection()
-        if connection:
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM admins WHERE username = %s", (username,))
-            admin = cursor.fetchone()
-            
-            if admin and bcrypt.checkpw(password.encode('utf-8'), admin['password'].encode('utf-8')):
-                session['admin_id'] = admin['admin_id']
-                session['admin_username'] = admin['username']
-                flash('Admin login successful!', 'success')
-                return redirect(url_for('admin_dashboard'))
-            else:
-                flash('Invalid credentials', 'error')
-            
-            cursor.close()
-            connection.close()
+        cursor = get_cursor(dictionary=True)
+        cursor.execute("SELECT * FROM admins WHERE username = %s", (username,))
+        admin = cursor.fetchone()
+        
+        if admin and bcrypt.checkpw(password.encode('utf-8'), admin['password'].encode('utf-8')):
+            session['admin_id'] = admin['admin_id']
+            session['admin_username'] = admin['username']
+            flash('Admin login successful!', 'success')
+            return redirect(url_for('admin_dashboard'))
+        else:
+            flash('Invalid credentials', 'error')
     
     return render_template('admin/login.html')
 
@@ -522,10 +599,8 @@ def admin_login():
 @admin_required
 def admin_dashboard():
     """Admin dashboard - limited functionality"""
-    connection = get_db_connection()
-    
-    if connection:
-        cursor = connection.cursor(dictionary=True)
+    try:
+        cursor = get_cursor(dictionary=True)
         
         # System statistics
         cursor.execute("SELECT COUNT(*) as total_hospitals FROM hospitals")
@@ -540,14 +615,13 @@ def admin_dashboard():
         cursor.execute("SELECT COUNT(*) as pending_transfers FROM transfer_requests WHERE status = 'Pending'")
         pending_transfers = cursor.fetchone()['pending_transfers']
         
-        cursor.close()
-        connection.close()
-        
         return render_template('admin/dashboard.html',
                              total_hospitals=total_hospitals,
                              total_donors=total_donors,
                              pending_appointments=pending_appointments,
                              pending_transfers=pending_transfers)
+    except Error as e:
+        print(f"Database connection error: {e}")
     
     return render_template('admin/dashboard.html')
 
@@ -555,17 +629,19 @@ def admin_dashboard():
 @admin_required
 def admin_hospitals():
     """Manage hospitals"""
-    connection = get_db_connection()
-    
-    if connection:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM hospitals ORDER BY city, hospital_name")
-        hospitals = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
-        
-        return render_template('admin/hospitals.html', hospitals=hospitals)
+    try:
+        # Explicit columns: the page is also served as JSON and must not carry password hashes
+        page = fetch_page(get_cursor(dictionary=True), """
+            SELECT hospital_id, hospital_name, address, city, email, phone, created_at
+            FROM hospitals
+        """, keys=[('city', 'city'), ('hospital_name', 'hospital_name'), ('hospital_id', 'hospital_id')],
+            descending=False)
+        
+        if wants_json():
+            return jsonify(page.to_dict())
+        return render_template('admin/hospitals.html', hospitals=page.items, page=page)
+    except Error as e:
+        print(f"Database connection error: {e}")
     
     return render_template('admin/hospitals.html', hospitals=[])
 
@@ -584,24 +660,23 @@ def add_hospital():
         # Hash password
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
         
-        connection = get_db_connection()
-        if connection:
-            cursor = connection.cursor()
-            
-            try:
+        try:
+            with transaction() as cursor:
                 cursor.execute("""
                     INSERT INTO hospitals (hospital_name, address, city, email, password, phone)
                     VALUES (%s, %s, %s, %s, %s, %s)
                 """, (hospital_name, address, city, email, hashed_password, phone))
-                
-                flash('Hospital registered successfully!', 'success')
-                return redirect(url_for('admin_hospitals'))
-                
-            except Error as e:
-                flash(f'Error: {e}', 'error')
-            finally:
-                cursor.close()
-                connection.close()
+                new_hospital_id = cursor.lastrowid
+            audit('HOSPITAL_REGISTERED', f'New hospital registered: {hospital_name} in {city}',
+                  new_hospital_id, new_hospital_id)
+            table_versions.invalidate()
+            reference_cache.invalidate()
+            
+            flash('Hospital registered successfully!', 'success')
+            return redirect(url_for('admin_hospitals'))
+            
+        except Error as e:
+            flash(f'Error: {e}', 'error')
     
     return render_template('admin/add_hospital.html')
 
@@ -609,26 +684,35 @@ def add_hospital():
 @admin_required
 def admin_logs():
     """View system logs"""
-    connection = get_db_connection()
-    
-    if connection:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("""
+    try:
+        filters = LogFilters.from_args(request.args, 'blood_network_db')
+        where, params = filters.where('sl')
+        page = fetch_page(get_cursor(dictionary=True), """
             SELECT sl.*, h.hospital_name
             FROM system_logs sl
             LEFT JOIN hospitals h ON sl.hospital_id = h.hospital_id
-            ORDER BY sl.created_at DESC
-            LIMIT 100
-        """)
-        logs = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
+        """, keys=[('sl.created_at', 'created_at'), ('sl.log_id', 'log_id')], where=where, params=params)
         
-        return render_template('admin/logs.html', logs=logs)
+        if wants_json():
+            return jsonify(page.to_dict())
+        return render_template('admin/logs.html', logs=page.items, page=page, filters=filters.to_dict(),
+                               hospitals=get_all_hospitals(), action_types=LOG_SCHEMAS['blood_network_db']['action_types'])
+    except Error as e:
+        print(f"Database connection error: {e}")
     
     return render_template('admin/logs.html', logs=[])
 
+@app.route('/admin/logs/export.<ext>')
+@admin_required
+def admin_export_logs(ext):
+    """Stream the filtered system logs as CSV / JSONL (optionally .gz)"""
+    export_format = parse_extension(ext)
+    if export_format is None:
+        return jsonify({'error': f'Unsupported export format: {ext}'}), 404
+    where, params = LogFilters.from_args(request.args, 'blood_network_db').where('sl')
+    sql, params = export_query('blood_network_db', 'logs', where=where, params=params)
+    return export_response(db_pool, sql, params, export_filename('system-logs', export_format[0]), *export_format)
+
 @app.route('/admin/logout')
 def admin_logout():
     """Admin logout"""
@@ -642,33 +726,117 @@ def admin_logout():
 @app.route('/api/hospitals/<city>')
 def api_hospitals_by_city(city):
     """API: Get hospitals by city"""
-    connection = get_db_connection()
-    if connection:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT hospital_id, hospital_name FROM hospitals WHERE city = %s", (city,))
-        hospitals = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        return jsonify(hospitals)
-    return jsonify([])
+    try:
+        return conditional_json(table_versions, ('hospitals',), f'hospitals:{city}',
+                                lambda versions: get_hospitals_in_city(city, versions),
+                                cache_control='public, max-age=60')
+    except Error as e:
+        print(f"Database connection error: {e}")
+        return jsonify([])
 
 @app.route('/api/blood_availability/<int:hospital_id>')
 def api_blood_availability(hospital_id):
     """API: Get blood availability for specific hospital"""
-    connection = get_db_connection()
-    if connection:
-        cursor = connection.cursor(dictionary=True)
+    def load(versions):
+        cursor = get_cursor(dictionary=True)
         cursor.execute("""
-            SELECT blood_group, SUM(units_available) as total_units
-            FROM hospital_inventory 
-            WHERE hospital_id = %s AND status = 'Available' AND expiry_date > CURDATE()
-            GROUP BY blood_group
+            SELECT blood_group, total_units
+            FROM inventory_summary 
+            WHERE hospital_id = %s AND total_units > 0
         """, (hospital_id,))
-        availability = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        return jsonify(availability)
-    return jsonify([])
+        return cursor.fetchall()
+    
+    try:
+        # Stock changes often: let clients keep the body but revalidate every time
+        return conditional_json(table_versions, ('hospital_inventory',), f'availability:{hospital_id}',
+                                load, cache_control='public, no-cache')
+    except Error as e:
+        print(f"Database connection error: {e}")
+        return jsonify([])
+
+@app.route('/api/compatible_search')
+@hospital_required
+def api_compatible_search():
+    """API: Hospitals able to supply blood compatible with a recipient group"""
+    blood_group = request.args.get('blood_group', '')
+    units = request.args.get('units', 1, type=int)
+    try:
+        candidates = search_compatible(get_cursor(), 'blood_network_db', blood_group, units,
+                                       exclude_hospital=session.get('hospital_id'),
+                                       city=request.args.get('city') or None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'blood_group': blood_group, 'units': units,
+                    'candidates': [candidate.to_dict() for candidate in candidates]})
+
+@app.route('/api/network_matrix')
+@hospital_required
+def api_network_matrix():
+    """API: Network-wide stock totals, best-stocked hospitals and low cities from the in-memory matrix"""
+    if network_matrix is None:
+        return jsonify({'error': 'numpy is not installed'}), 503
+    blood_group = request.args.get('blood_group') or None
+    if blood_group is not None and blood_group not in BLOOD_GROUPS:
+        return jsonify({'error': f'Unknown blood group {blood_group}'}), 400
+    matrix = current_network_matrix()
+    return jsonify({
+        'totals': matrix.totals(),
+        'top_hospitals': matrix.top_hospitals(blood_group, request.args.get('k', 10, type=int),
+                                              exclude=session.get('hospital_id')),
+        'cities_below': matrix.cities_below(request.args.get('threshold', 10, type=int), blood_group),
+        'matrix': matrix.stats()
+    })
+
+@app.route('/api/pool_stats')
+@admin_required
+def api_pool_stats():
+    """API: Connection pool statistics for sizing the pool per worker"""
+    return jsonify(db_pool.stats())
+
+@app.route('/api/cache_stats')
+@admin_required
+def api_cache_stats():
+    """API: Reference cache hit/miss counters"""
+    return jsonify(reference_cache.stats())
+
+@app.route('/api/audit_stats')
+@admin_required
+def api_audit_stats():
+    """API: Buffered audit writer counters"""
+    return jsonify({'mode': AUDIT_MODE, 'writer': audit_writer.stats() if audit_writer else None})
+
+@app.route('/admin/rebalance')
+@admin_required
+def admin_rebalance():
+    """Suggested transfers moving expiring stock to hospitals that are short"""
+    blood_group = request.args.get('blood_group') or None
+    if blood_group is not None and blood_group not in BLOOD_GROUPS:
+        abort(400)
+    safety_stock = max(request.args.get('safety_stock', SAFETY_STOCK, type=int), 0)
+    plan = plan_for_database(get_cursor(), 'blood_network_db', city_distances, safety_stock,
+                             (blood_group,) if blood_group else BLOOD_GROUPS)
+    if wants_json():
+        return jsonify(plan.to_dict())
+    return render_template('admin/rebalance.html', base_template='base_dark.html', plan=plan,
+                           blood_group=blood_group, safety_stock=safety_stock, blood_groups=BLOOD_GROUPS)
+
+@app.route('/admin/perf', methods=['GET', 'POST'])
+@admin_required
+def admin_perf():
+    """Top statements by database time (debug mode only)"""
+    if not app.debug:
+        abort(404)
+    if request.method == 'POST':
+        query_monitor.reset()
+        return redirect(url_for('admin_perf'))
+    order_by = request.args.get('sort', 'total_ms')
+    if order_by not in ORDER_KEYS:
+        order_by = 'total_ms'
+    statements = query_monitor.top(50, order_by)
+    if wants_json():
+        return jsonify({'stats': query_monitor.stats(), 'statements': statements})
+    return render_template('admin/perf.html', base_template='base_dark.html', stats=query_monitor.stats(),
+                           statements=statements, order_by=order_by, order_keys=ORDER_KEYS)
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=8000)
\ No newline at end of file
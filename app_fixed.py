@@ -1,5 +1,9 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 import mysql.connector
+from db import ConnectionPool, init_app, borrow_connection
+from query_stats import QueryMonitor, DEFAULT_SLOW_MS
+from emergency_service import fulfil_emergency_requests
+from donor_service import normalize_phone, is_duplicate_phone
 from datetime import datetime, timedelta
 import os
 
@@ -13,8 +17,23 @@ DB_CONFIG = {
     'database': 'blood_bank_db'
 }
 
+# Connection Pool
+POOL_CONFIG = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'timeout': 10,
+    'max_lifetime': 1800
+}
+
+db_pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+init_app(app, db_pool)
+
+# Statement timings behind Server-Timing headers and the slow-query log
+QueryMonitor(slow_ms=float(os.environ.get('SLOW_QUERY_MS', DEFAULT_SLOW_MS))).init_app(app, db_pool)
+
 def get_db_connection():
-    return mysql.connector.connect(**DB_CONFIG)
+    # Returned to the pool on teardown if a handler exits without closing it
+    return borrow_connection()
 
 # Dashboard Route
 @app.route('/')
@@ -70,16 +89,28 @@ def add_donor():
         age = request.form['age']
         gender = request.form['gender']
         blood_group = request.form['blood_group']
+        phone = request.form.get('phone', '').strip() or None
+        phone_key = normalize_phone(phone)
+        if phone and phone_key is None:
+            flash('Please enter a valid phone number.', 'error')
+            return render_template('add_donor.html')
         
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO donors (name, age, gender, blood_group) 
-            VALUES (%s, %s, %s, %s)
-        """, (name, age, gender, blood_group))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        try:
+            cursor.execute("""
+                INSERT INTO donors (name, age, gender, blood_group, phone, phone_key) 
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, (name, age, gender, blood_group, phone, phone_key))
+            conn.commit()
+        except mysql.connector.IntegrityError as e:
+            if not is_duplicate_phone(e):
+                raise
+            flash('A donor with this phone number is already registered.', 'error')
+            return render_template('add_donor.html')
+        finally:
+            cursor.close()
+            conn.close()
         
         flash('Donor added successfully!', 'success')
         return redirect(url_for('donors'))
@@ -171,15 +202,34 @@ def add_emergency_request():
 
 @app.route('/approve_request/<int:request_id>')
 def approve_request(request_id):
+    result = _fulfil(request_ids=[request_id])
+    if result.approved:
+        flash('Emergency request approved!', 'success')
+    else:
+        flash('Not enough available blood bags to approve this request.', 'error')
+    return redirect(url_for('emergency_requests'))
+
+@app.route('/fulfil_emergency_requests', methods=['POST'])
+def fulfil_emergency_requests_batch():
+    result = _fulfil()
+    flash(f'Approved {len(result.approved)} emergency request(s) using {result.bags_used} bag(s); '
+          f'{len(result.unfilled)} left pending.', 'success' if result.approved else 'info')
+    return redirect(url_for('emergency_requests'))
+
+def _fulfil(request_ids=None):
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("UPDATE emergency_requests SET status = 'Approved' WHERE request_id = %s", (request_id,))
-    conn.commit()
-    cursor.close()
-    conn.close()
-    
-    flash('Emergency request approved!', 'success')
-    return redirect(url_for('emergency_requests'))
+    try:
+        conn.start_transaction()
+        result = fulfil_emergency_requests(cursor, request_ids=request_ids)
+        conn.commit()
+        return result
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
 
 @app.route('/reject_request/<int:request_id>')
 def reject_request(request_id):
@@ -1,8 +1,13 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
 import mysql.connector
+from db import ConnectionPool, init_app, borrow_connection
+from query_stats import QueryMonitor, DEFAULT_SLOW_MS
+from emergency_service import fulfil_emergency_requests
+from donor_service import normalize_phone, is_duplicate_phone
 from datetime import datetime, timedelta
 from functools import wraps
 import hashlib
+import os
 
 app = Flask(__name__)
 app.secret_key = 'blood_bank_professional_secret_key_2025'
@@ -14,8 +19,23 @@ DB_CONFIG = {
     'database': 'blood_bank_db'
 }
 
+# Connection Pool
+POOL_CONFIG = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'timeout': 10,
+    'max_lifetime': 1800
+}
+
+db_pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+init_app(app, db_pool)
+
+# Statement timings behind Server-Timing headers and the slow-query log
+QueryMonitor(slow_ms=float(os.environ.get('SLOW_QUERY_MS', DEFAULT_SLOW_MS))).init_app(app, db_pool)
+
 def get_db_connection():
-    return mysql.connector.connect(**DB_CONFIG)
+    # Returned to the pool on teardown if a handler exits without closing it
+    return borrow_connection()
 
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
@@ -173,17 +193,28 @@ def add_donor():
         age = request.form['age']
         gender = request.form['gender']
         blood_group = request.form['blood_group']
-        phone = request.form['phone']
+        phone = request.form['phone'].strip() or None
+        phone_key = normalize_phone(phone)
+        if phone and phone_key is None:
+            flash('Please enter a valid phone number.', 'error')
+            return render_template('admin/add_donor.html')
         
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO donors (name, age, gender, blood_group, phone) 
-            VALUES (%s, %s, %s, %s, %s)
-        """, (name, age, gender, blood_group, phone))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        try:
+            cursor.execute("""
+                INSERT INTO donors (name, age, gender, blood_group, phone, phone_key) 
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, (name, age, gender, blood_group, phone, phone_key))
+            conn.commit()
+        except mysql.connector.IntegrityError as e:
+            if not is_duplicate_phone(e):
+                raise
+            flash('A donor with this phone number is already registered.', 'error')
+            return render_template('admin/add_donor.html')
+        finally:
+            cursor.close()
+            conn.close()
         
         flash('Donor added successfully!', 'success')
         return redirect(url_for('admin_donors'))
@@ -226,30 +257,43 @@ def admin_emergency_requests():
 @admin_required
 def approve_request(request_id):
     conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    
-    # Get request details
-    cursor.execute("SELECT * FROM emergency_requests WHERE request_id = %s", (request_id,))
-    request_data = cursor.fetchone()
-    
-    if request_data:
-        # Update request status
-        cursor.execute("UPDATE emergency_requests SET status = 'Approved', approved_on = NOW() WHERE request_id = %s", (request_id,))
-        
-        # Deduct from inventory
-        cursor.execute("""
-            UPDATE blood_inventory 
-            SET status = 'Used' 
-            WHERE blood_group = %s AND status = 'Available' AND expires_on >= CURDATE()
-            ORDER BY expires_on ASC
-            LIMIT %s
-        """, (request_data['blood_group'], request_data['units_required']))
-        
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        result = fulfil_emergency_requests(cursor, request_ids=[request_id])
         conn.commit()
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+    
+    if result.approved:
         flash('Emergency request approved successfully!', 'success')
+    else:
+        flash('Not enough available blood bags to approve this request.', 'error')
+    return redirect(url_for('admin_emergency_requests'))
+
+@app.route('/admin/fulfil_requests', methods=['POST'])
+@admin_required
+def fulfil_requests():
+    """Approve every Pending request stock can cover, by urgency then age"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        result = fulfil_emergency_requests(cursor)
+        conn.commit()
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
     
-    cursor.close()
-    conn.close()
+    flash(f'Approved {len(result.approved)} emergency request(s) using {result.bags_used} bag(s); '
+          f'{len(result.unfilled)} left pending.', 'success' if result.approved else 'info')
     return redirect(url_for('admin_emergency_requests'))
 
 # Hospital Dashboard Routes
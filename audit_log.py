@@ -0,0 +1,167 @@
+"""
+Buffered audit log writer for system_logs / inventory_logs
+Request handlers call emit() and return immediately; a background thread
+drains a bounded queue and writes multi-row INSERTs every flush_interval_ms or
+flush_batch events, whichever comes first. When the queue is full emit()
+blocks for up to put_timeout (backpressure) and then writes the event itself,
+so events are never dropped. close() (also registered with atexit) flushes
+everything still queued.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+
+from mysql.connector import Error
+
+logger = logging.getLogger(__name__)
+
+# Column order of the values passed to emit(), per log table
+LOG_COLUMNS = {
+    'system_logs': ('action_type', 'description', 'related_id', 'hospital_id'),
+    'inventory_logs': ('related_id', 'action_type', 'details')
+}
+
+_STOP = object()
+
+
+class AuditWriter:
+    """Background, batched writer for one log table"""
+
+    def __init__(self, pool, table='system_logs', max_queue=10000, flush_interval_ms=200,
+                 flush_batch=500, put_timeout=1.0, retries=3):
+        self.pool = pool
+        self.table = table
+        self.columns = LOG_COLUMNS[table] + ('created_at',)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.flush_batch = flush_batch
+        self.put_timeout = put_timeout
+        self.retries = retries
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self.emitted = 0
+        self.written = 0
+        self.batches = 0
+        self.sync_fallbacks = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name=f'audit-{table}', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def emit(self, *values):
+        """Queue one log row; values follow LOG_COLUMNS[table]"""
+        if len(values) != len(self.columns) - 1:
+            raise ValueError(f"{self.table} expects {len(self.columns) - 1} values, got {len(values)}")
+        # Stamp the event time now; the row may be written a few ms later
+        row = tuple(values) + (datetime.now(),)
+        with self._stats_lock:
+            self.emitted += 1
+        if self._closed:
+            self._write([row])
+            return
+        try:
+            self._queue.put(row, timeout=self.put_timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self.sync_fallbacks += 1
+            self._write([row])
+
+    def _next(self, timeout=None):
+        """Get one item (None on timeout); every item taken is task_done'd by _run"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            taken = [self._next()]
+            deadline = time.monotonic() + self.flush_interval
+            while taken[-1] is not _STOP and len(taken) < self.flush_batch:
+                remaining = deadline - time.monotonic()
+                item = self._next(remaining) if remaining > 0 else None
+                if item is None:
+                    break
+                taken.append(item)
+            if taken[-1] is _STOP:
+                stopping = True
+                # Drain whatever was queued before close()
+                while True:
+                    item = self._next(0)
+                    if item is None:
+                        break
+                    taken.append(item)
+
+            batch = [item for item in taken if item is not _STOP]
+            for start in range(0, len(batch), self.flush_batch):
+                self._write(batch[start:start + self.flush_batch])
+            for _ in taken:
+                self._queue.task_done()
+
+    def _write(self, rows):
+        if not rows:
+            return
+        placeholders = '(' + ', '.join(['%s'] * len(self.columns)) + ')'
+        sql = (f"INSERT INTO {self.table} ({', '.join(self.columns)}) "
+               f"VALUES {', '.join([placeholders] * len(rows))}")
+        params = [value for row in rows for value in row]
+        for attempt in range(1, self.retries + 1):
+            conn = None
+            try:
+                conn = self.pool.connection()
+                cursor = conn.cursor()
+                cursor.execute(sql, params)
+                conn.commit()
+                cursor.close()
+                conn.close()
+                with self._stats_lock:
+                    self.written += len(rows)
+                    self.batches += 1
+                return
+            except Error as e:
+                if conn is not None:
+                    conn.invalidate()
+                if attempt == self.retries:
+                    with self._stats_lock:
+                        self.failed += len(rows)
+                    logger.error("Audit write of %d %s row(s) failed: %s", len(rows), self.table, e)
+                    return
+                time.sleep(0.05 * attempt)
+
+    def flush(self):
+        """Block until everything queued so far has been written"""
+        self._queue.join()
+
+    def close(self):
+        """Stop the writer thread after flushing; later emits write synchronously"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        # Rows that raced in behind the stop marker
+        leftovers = []
+        while True:
+            item = self._next(0)
+            if item is None:
+                break
+            leftovers.append(item)
+        self._write([item for item in leftovers if item is not _STOP])
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'table': self.table,
+                'queued': self._queue.qsize(),
+                'emitted': self.emitted,
+                'written': self.written,
+                'batches': self.batches,
+                'avg_batch': round(self.written / self.batches, 1) if self.batches else 0.0,
+                'sync_fallbacks': self.sync_fallbacks,
+                'failed': self.failed
+            }
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: trigger-written vs buffered audit logs under concurrent writes
+Creates two scratch tables in blood_network_db: bench_audit_items (the
+"business" insert) and bench_audit_logs (a copy of system_logs). In trigger
+mode an AFTER INSERT trigger writes the log row inside each insert; in
+buffered mode the insert runs alone and the log row goes through
+audit_log.AuditWriter. Reports per-insert latency percentiles and
+throughput for --threads concurrent writers, then drops the scratch tables.
+Run from the repository root:
+    python benchmarks/bench_audit_writes.py --threads 16 --writes 500
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audit_log import AuditWriter, LOG_COLUMNS
+from db import ConnectionPool
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '',
+    'database': 'blood_network_db',
+    'autocommit': True
+}
+
+SCRATCH_TRIGGER = """
+    CREATE TRIGGER bench_audit_items_log
+    AFTER INSERT ON bench_audit_items
+    FOR EACH ROW
+    INSERT INTO bench_audit_logs (action_type, description, related_id, hospital_id)
+    VALUES ('BLOOD_ADDED', CONCAT('Bench item ', NEW.item_id, ': ', NEW.payload), NEW.item_id, NULL)
+"""
+
+
+def setup(conn, with_trigger):
+    cursor = conn.cursor()
+    teardown(conn)
+    cursor.execute("""
+        CREATE TABLE bench_audit_items (
+            item_id INT PRIMARY KEY AUTO_INCREMENT,
+            payload VARCHAR(100) NOT NULL
+        )
+    """)
+    cursor.execute("CREATE TABLE bench_audit_logs LIKE system_logs")
+    if with_trigger:
+        cursor.execute(SCRATCH_TRIGGER)
+    cursor.close()
+
+
+def teardown(conn):
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS bench_audit_items")
+    cursor.execute("DROP TABLE IF EXISTS bench_audit_logs")
+    cursor.close()
+
+
+def worker(pool, writer, writes, latencies):
+    samples = []
+    for i in range(writes):
+        payload = f'{threading.get_ident()}-{i}'
+        start = time.perf_counter()
+        conn = pool.connection()
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO bench_audit_items (payload) VALUES (%s)", (payload,))
+        item_id = cursor.lastrowid
+        cursor.close()
+        conn.close()
+        if writer is not None:
+            writer.emit('BLOOD_ADDED', f'Bench item {item_id}: {payload}', item_id, None)
+        samples.append((time.perf_counter() - start) * 1000)
+    latencies.extend(samples)
+
+
+def run(mode, threads, writes):
+    admin = mysql.connector.connect(**DB_CONFIG)
+    setup(admin, with_trigger=(mode == 'trigger'))
+    pool = ConnectionPool(DB_CONFIG, pool_size=threads + 2, max_overflow=0)
+    writer = AuditWriter(pool, 'bench_audit_logs') if mode == 'buffered' else None
+    latencies = []
+    try:
+        workers = [threading.Thread(target=worker, args=(pool, writer, writes, latencies))
+                   for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if writer is not None:
+            writer.close()
+        drained = time.perf_counter() - start
+
+        cursor = admin.cursor()
+        cursor.execute("SELECT COUNT(*) FROM bench_audit_logs")
+        logged = cursor.fetchone()[0]
+        cursor.close()
+    finally:
+        teardown(admin)
+        admin.close()
+
+    latencies.sort()
+    total = threads * writes
+    result = {
+        'mode': mode,
+        'writes': total,
+        'logged': logged,
+        'p50_ms': round(latencies[len(latencies) // 2], 3),
+        'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3),
+        'writes_per_sec': round(total / elapsed, 1),
+        'all_logged_s': round(drained, 3)
+    }
+    if writer is not None:
+        result['writer'] = writer.stats()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--writes', type=int, default=500, help='inserts per thread')
+    args = parser.parse_args()
+
+    # The scratch log table has system_logs' columns
+    LOG_COLUMNS['bench_audit_logs'] = LOG_COLUMNS['system_logs']
+    results = [run(mode, args.threads, args.writes) for mode in ('trigger', 'buffered')]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk CSV import throughput for inventory lots and donors
+Writes a --rows row CSV (with --reject-rate invalid rows mixed in) to a temp
+file, imports it with import_service.import_csv and reports rows/second.
+Lots go to a throwaway hospital that is deleted afterwards (its lots cascade);
+imported donors are deleted by phone prefix. Run from the repository root:
+    python benchmarks/bench_bulk_import.py --kind lots --rows 1000000
+    python benchmarks/bench_bulk_import.py --kind donors --rows 1000000 --database blood_bank_db
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from import_service import import_csv, BLOOD_GROUPS, GENDERS
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+# Donor phones start with this so cleanup can find them
+PHONE_PREFIX = '000'
+
+
+def write_csv(path, kind, row_count, reject_rate, rng):
+    today = date.today()
+    with open(path, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.writer(out)
+        if kind == 'lots':
+            writer.writerow(['blood_group', 'units', 'expiry_date'])
+        else:
+            writer.writerow(['name', 'age', 'gender', 'blood_group', 'phone', 'city'])
+        for i in range(row_count):
+            bad = rng.random() < reject_rate
+            blood_group = 'Z+' if bad else rng.choice(BLOOD_GROUPS)
+            if kind == 'lots':
+                # Distinct expiry per row so upserts do not merge lots
+                writer.writerow([blood_group, rng.randint(1, 20), today + timedelta(days=1 + i % 3650)])
+            else:
+                writer.writerow([f'Bench Donor {i}', rng.randint(18, 65), rng.choice(GENDERS), blood_group,
+                                 f'{PHONE_PREFIX}{i:010d}', 'Benchville'])
+
+
+def create_hospital(cursor, database):
+    stamp = f'{os.getpid()}-{time.time_ns()}'
+    if database == 'blood_bank_db':
+        cursor.execute("INSERT INTO hospitals (name, email, password, city) VALUES (%s, %s, 'bench', 'Benchville')",
+                       ('Bench importer', f'import-{stamp}@bench.local'))
+    else:
+        cursor.execute("""
+            INSERT INTO hospitals (hospital_name, address, city, email, password, phone)
+            VALUES ('Bench importer', 'Bench', 'Benchville', %s, 'bench', '0000000000')
+        """, (f'import-{stamp}@bench.local',))
+    return cursor.lastrowid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', choices=('blood_bank_db', 'blood_network_db'), default='blood_network_db')
+    parser.add_argument('--kind', choices=('lots', 'donors'), default='lots')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--reject-rate', type=float, default=0.01)
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    conn = mysql.connector.connect(**DB_CONFIG, database=args.database, autocommit=True)
+    cursor = conn.cursor()
+    hospital_id = None
+    try:
+        write_csv(path, args.kind, args.rows, args.reject_rate, random.Random(42))
+        if args.kind == 'lots':
+            hospital_id = create_hospital(cursor, args.database)
+        with open(path, newline='', encoding='utf-8') as source:
+            result = import_csv(conn, args.database, args.kind, source, hospital_id, args.chunk_size)
+    finally:
+        if hospital_id is not None:
+            cursor.execute("DELETE FROM hospitals WHERE hospital_id = %s", (hospital_id,))
+        elif args.kind == 'donors':
+            cursor.execute("DELETE FROM donors WHERE phone LIKE %s", (PHONE_PREFIX + '%',))
+        cursor.close()
+        conn.close()
+        os.remove(path)
+
+    print(json.dumps({
+        'database': args.database,
+        'kind': args.kind,
+        'rows': args.rows,
+        'imported': result.imported,
+        'rejected': result.rejected,
+        'seconds': round(result.seconds, 2),
+        'rows_per_sec': round(result.imported / result.seconds, 1) if result.seconds else None
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compatibility-aware availability search at network scale
+In-memory mode (default) times compatibility_service.rank_candidates over
+the rows the search query would return for synthetic lots at --hospitals
+hospitals, per recipient group. With --db it
+times search_compatible against a seeded database (seed_generator.py
+--hospitals 10000) next to the exact-match lookups staff ran before, one per
+compatible group. Run from the repository root:
+    python benchmarks/bench_compatible_search.py --hospitals 10000 --lots-per-hospital 12
+    python benchmarks/bench_compatible_search.py --db blood_network_db --units 4 --iterations 50
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from allocation_service import LOT_SCHEMAS
+from compatibility_service import BLOOD_GROUPS, DONOR_RANKING, rank_candidates, search_compatible
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+GROUP_WEIGHTS = (0.223, 0.005, 0.322, 0.006, 0.071, 0.002, 0.364, 0.007)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def synthetic_lots(hospitals, lots_per_hospital, seed):
+    rng = random.Random(seed)
+    today = date.today()
+    lots, lot_id = [], 0
+    for hospital_id in range(1, hospitals + 1):
+        for group in rng.choices(BLOOD_GROUPS, GROUP_WEIGHTS, k=lots_per_hospital):
+            lot_id += 1
+            lots.append((lot_id, hospital_id, f'Hospital {hospital_id}', 'City', group,
+                         rng.randint(1, 20), today + timedelta(days=rng.randint(0, 42))))
+    return lots
+
+
+def drawn_lots(lots, recipient, units):
+    """The rows search_compatible's query returns: each hospital's lots up to units, in ranking order"""
+    order = {group: i for i, group in enumerate(DONOR_RANKING[recipient])}
+    ranked = sorted((lot for lot in lots if lot[4] in order), key=lambda lot: (lot[1], order[lot[4]], lot[6], lot[0]))
+    rows, hospital_id, running = [], None, 0
+    for lot in ranked:
+        if lot[1] != hospital_id:
+            hospital_id, running = lot[1], 0
+        if running < units:
+            rows.append(lot)
+        running += lot[5]
+    return rows
+
+
+def bench_memory(args):
+    lots = synthetic_lots(args.hospitals, args.lots_per_hospital, args.seed)
+    results = []
+    for recipient in BLOOD_GROUPS:
+        rows = drawn_lots(lots, recipient, args.units)
+        samples = []
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            candidates = rank_candidates(rows, recipient, args.units)
+            samples.append((time.perf_counter() - start) * 1000)
+        results.append({
+            'recipient': recipient,
+            'rows_ranked': len(rows),
+            'top_hospital': candidates[0].hospital_id if candidates else None,
+            'p50_ms': round(percentile(samples, 50), 2),
+            'p99_ms': round(percentile(samples, 99), 2)
+        })
+    return {'mode': 'memory', 'hospitals': args.hospitals, 'lots': len(lots), 'units': args.units,
+            'results': results}
+
+
+def exact_lookups(cursor, database, recipient):
+    """One exact-match availability query per compatible group, as done by hand"""
+    schema = LOT_SCHEMAS[database]
+    for group in DONOR_RANKING[recipient]:
+        cursor.execute(f"""
+            SELECT hospital_id, SUM(units_available)
+            FROM hospital_inventory
+            WHERE blood_group = %s AND {schema['available']} AND {schema['expiry_column']} >= CURDATE()
+            GROUP BY hospital_id
+        """, (group,))
+        cursor.fetchall()
+
+
+def bench_db(args):
+    conn = mysql.connector.connect(**DB_CONFIG, database=args.db)
+    cursor = conn.cursor(buffered=True)
+    results = []
+    try:
+        for recipient in BLOOD_GROUPS:
+            timings = {'search_compatible': [], 'exact_lookups': []}
+            for _ in range(args.iterations):
+                start = time.perf_counter()
+                search_compatible(cursor, args.db, recipient, args.units)
+                timings['search_compatible'].append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                exact_lookups(cursor, args.db, recipient)
+                timings['exact_lookups'].append((time.perf_counter() - start) * 1000)
+            results.append({
+                'recipient': recipient,
+                'round_trips': {'search_compatible': 1, 'exact_lookups': len(DONOR_RANKING[recipient])},
+                **{f'{name}_p50_ms': round(percentile(samples, 50), 2) for name, samples in timings.items()}
+            })
+    finally:
+        cursor.close()
+        conn.close()
+    return {'mode': 'db', 'database': args.db, 'units': args.units, 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hospitals', type=int, default=10000)
+    parser.add_argument('--lots-per-hospital', type=int, default=12)
+    parser.add_argument('--units', type=int, default=4)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', choices=sorted(LOT_SCHEMAS), help='benchmark against this database instead')
+    args = parser.parse_args()
+
+    print(json.dumps(bench_db(args) if args.db else bench_memory(args), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark: legacy 7-query dashboard vs single round-trip dashboard_service
+Run from the repository root against a seeded blood_bank_db:
+    python benchmarks/bench_dashboard.py --hospital-id 1 --iterations 500
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dashboard_service import fetch_dashboard
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '',
+    'database': 'blood_bank_db'
+}
+
+
+class CountingConnection:
+    """Counts client/server round trips issued through cursors"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.round_trips = 0
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._conn.cursor(*args, **kwargs)
+        execute = cursor.execute
+
+        def counted(*a, **kw):
+            self.round_trips += 1
+            return execute(*a, **kw)
+
+        cursor.execute = counted
+        return cursor
+
+
+def legacy_dashboard(conn, hospital_id):
+    """The original app.py dashboard() query sequence"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT blood_group, SUM(units_available) as total_units,
+               SUM(CASE WHEN expires_on <= DATE_ADD(CURDATE(), INTERVAL 7 DAY) THEN units_available ELSE 0 END) as expiring_soon
+        FROM hospital_inventory 
+        WHERE hospital_id = %s AND units_available > 0
+        GROUP BY blood_group
+    """, (hospital_id,))
+    cursor.fetchall()
+    cursor.execute("""
+        SELECT tr.blood_group, 
+               SUM(tr.units_needed) as requested_units,
+               COALESCE(hi.total_units, 0) as available_units,
+               COALESCE(hi.expiring_soon, 0) as expiring_soon
+        FROM transfer_requests tr
+        LEFT JOIN (
+            SELECT blood_group, SUM(units_available) as total_units,
+                   SUM(CASE WHEN expires_on <= DATE_ADD(CURDATE(), INTERVAL 7 DAY) THEN units_available ELSE 0 END) as expiring_soon
+            FROM hospital_inventory WHERE hospital_id = %s GROUP BY blood_group
+        ) hi ON tr.blood_group = hi.blood_group
+        WHERE tr.to_hospital = %s AND tr.status = 'Pending'
+        GROUP BY tr.blood_group
+    """, (hospital_id, hospital_id))
+    cursor.fetchall()
+    cursor.execute("""
+        SELECT COUNT(*) as pending_appointments
+        FROM donation_appointments 
+        WHERE hospital_id = %s AND status = 'Pending'
+    """, (hospital_id,))
+    cursor.fetchone()
+    cursor.execute("""
+        SELECT COUNT(*) as today_appointments
+        FROM donation_appointments 
+        WHERE hospital_id = %s AND DATE(preferred_time) = CURDATE()
+    """, (hospital_id,))
+    cursor.fetchone()
+    cursor.execute("""
+        SELECT 
+            (SELECT COUNT(*) FROM transfer_requests WHERE to_hospital = %s AND status = 'Pending') as incoming_requests,
+            (SELECT COUNT(*) FROM transfer_requests WHERE from_hospital = %s AND status = 'Pending') as outgoing_requests
+    """, (hospital_id, hospital_id))
+    cursor.fetchone()
+    cursor.execute("SELECT city FROM hospitals WHERE hospital_id = %s", (hospital_id,))
+    result = cursor.fetchone()
+    city = result['city'] if result else 'Unknown'
+    cursor.execute("""
+        SELECT d.name, d.blood_group, d.phone
+        FROM donors d
+        JOIN rare_donors rd ON d.donor_id = rd.donor_id
+        WHERE d.city = %s
+        ORDER BY d.name
+    """, (city,))
+    cursor.fetchall()
+    cursor.close()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(label, fn, conn, hospital_id, iterations, warmup):
+    for _ in range(warmup):
+        fn(conn, hospital_id)
+    conn.round_trips = 0
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(conn, hospital_id)
+        samples.append((time.perf_counter() - start) * 1000)
+        conn.rollback()
+    return {
+        'handler': label,
+        'round_trips_per_view': conn.round_trips / iterations,
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p99_ms': round(percentile(samples, 99), 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hospital-id', type=int, default=1)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=20)
+    args = parser.parse_args()
+
+    conn = CountingConnection(mysql.connector.connect(**DB_CONFIG))
+    try:
+        results = [
+            run('legacy', legacy_dashboard, conn, args.hospital_id, args.iterations, args.warmup),
+            run('dashboard_service', lambda c, h: fetch_dashboard(h, conn=c), conn,
+                args.hospital_id, args.iterations, args.warmup)
+        ]
+    finally:
+        conn.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
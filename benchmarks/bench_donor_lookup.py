@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: donor phone normalisation and returning-donor lookup
+In-memory mode (default) writes --donors synthetic numbers in the formats
+donors actually type, runs donor_service.normalize_phone over all of them
+and checks that every variant of a number collapses to one key. With --db it
+times the returning-donor point read on donors.phone_key against the old
+read on the raw phone, and runs a dry-run dedup scan. Run from the
+repository root:
+    python benchmarks/bench_donor_lookup.py --donors 1000000
+    python benchmarks/bench_donor_lookup.py --db blood_bank_db --lookups 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from donor_service import DEDUP_SCHEMAS, dedup_donors, normalize_phone
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+# Ways the same mobile number arrives through the donor forms
+FORMATS = (
+    lambda n: n,
+    lambda n: f"+91{n}",
+    lambda n: f"+91-{n}",
+    lambda n: f"+91 {n[:5]} {n[5:]}",
+    lambda n: f"0{n}",
+    lambda n: f"91{n}",
+    lambda n: f"0091 {n}",
+    lambda n: f"({n[:3]}) {n[3:6]}-{n[6:]}"
+)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def bench_memory(args):
+    rng = random.Random(args.seed)
+    numbers = [f"{rng.choice('6789')}{rng.randrange(10 ** 9):09d}" for _ in range(args.donors)]
+    # A share of donors come back and type their number differently
+    typed = numbers + [rng.choice(FORMATS)(rng.choice(numbers)) for _ in range(int(args.donors * args.repeat_share))]
+    rng.shuffle(typed)
+
+    start = time.perf_counter()
+    keys = [normalize_phone(phone) for phone in typed]
+    elapsed = time.perf_counter() - start
+    return {
+        'mode': 'memory',
+        'typed_numbers': len(typed),
+        'normalize_ms': round(elapsed * 1000, 1),
+        'per_number_us': round(elapsed / len(typed) * 1e6, 2),
+        'distinct_raw': len(set(typed)),
+        'distinct_keys': len(set(keys)),
+        'expected_donors': len(set(numbers)),
+        'unparseable': keys.count(None)
+    }
+
+
+def timed_lookups(cursor, sql, values):
+    samples = []
+    for value in values:
+        start = time.perf_counter()
+        cursor.execute(sql, (value,))
+        cursor.fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'p50_ms': round(percentile(samples, 50), 3), 'p95_ms': round(percentile(samples, 95), 3)}
+
+
+def explain_type(cursor, sql, value):
+    cursor.execute("EXPLAIN " + sql, (value,))
+    columns = [column[0] for column in cursor.description]
+    return dict(zip(columns, cursor.fetchone())).get('type')
+
+
+def bench_db(args):
+    conn = mysql.connector.connect(**DB_CONFIG, database=args.db)
+    cursor = conn.cursor(buffered=True)
+    try:
+        cursor.execute("SELECT phone, phone_key FROM donors WHERE phone_key IS NOT NULL ORDER BY RAND() LIMIT %s",
+                       (args.lookups,))
+        sample = cursor.fetchall()
+        if not sample:
+            print("⚠️  No donors have a phone_key yet; run donor_service.py first")
+            return None
+        key_sql = "SELECT donor_id FROM donors WHERE phone_key = %s"
+        raw_sql = "SELECT donor_id FROM donors WHERE phone = %s"
+        result = {
+            'mode': 'db',
+            'database': args.db,
+            'lookups': len(sample),
+            'phone_key': dict(timed_lookups(cursor, key_sql, [key for _, key in sample]),
+                              access=explain_type(cursor, key_sql, sample[0][1])),
+            'raw_phone': dict(timed_lookups(cursor, raw_sql, [phone for phone, _ in sample]),
+                              access=explain_type(cursor, raw_sql, sample[0][0]))
+        }
+    finally:
+        cursor.close()
+
+    try:
+        scan = dedup_donors(conn, args.db, dry_run=True)
+    finally:
+        conn.close()
+    result.update(scanned=scan.scanned, duplicates=scan.duplicates, scan_s=round(scan.seconds, 2))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--donors', type=int, default=1000000)
+    parser.add_argument('--repeat-share', type=float, default=0.1, help='returning donors per donor')
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', choices=sorted(DEDUP_SCHEMAS), help='benchmark against this database instead')
+    args = parser.parse_args()
+
+    result = bench_db(args) if args.db else bench_memory(args)
+    if result is None:
+        return 1
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request emergency approvals vs batch fulfilment
+Queues --requests Pending emergency requests plus enough Available bags, then
+approves them all with the old one-request-at-a-time statements and with
+emergency_service.fulfil_emergency_requests. Each run is rolled back, so the
+database is left unchanged. Requires migration 0004. Run from the repository
+root:
+    python benchmarks/bench_emergency_fulfilment.py --requests 1000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emergency_service import fulfil_emergency_requests, URGENCY_ORDER
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '',
+    'database': 'blood_bank_db'
+}
+
+BLOOD_GROUPS = ('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-')
+
+
+def seed(cursor, request_count, rng):
+    requests = [(f'Bench requester {i}', rng.choice(BLOOD_GROUPS), rng.randint(1, 4), rng.choice(URGENCY_ORDER))
+                for i in range(request_count)]
+    bags = []
+    for _, blood_group, units, _ in requests:
+        bags.extend((blood_group, rng.randint(1, 40)) for _ in range(units))
+
+    for start in range(0, len(requests), 1000):
+        chunk = requests[start:start + 1000]
+        cursor.execute(f"""
+            INSERT INTO emergency_requests (requester_name, blood_group, units_required, urgency)
+            VALUES {', '.join(['(%s, %s, %s, %s)'] * len(chunk))}
+        """, [value for row in chunk for value in row])
+    for start in range(0, len(bags), 1000):
+        chunk = bags[start:start + 1000]
+        cursor.execute(f"""
+            INSERT INTO blood_inventory (blood_group, collected_on, expires_on)
+            VALUES {', '.join(['(%s, CURDATE(), DATE_ADD(CURDATE(), INTERVAL %s DAY))'] * len(chunk))}
+        """, [value for row in chunk for value in row])
+
+
+def legacy_approve_all(cursor):
+    """The old app_complete.py path, once per Pending request"""
+    cursor.execute("""
+        SELECT request_id, blood_group, units_required FROM emergency_requests
+        WHERE status = 'Pending'
+        ORDER BY FIELD(urgency, 'Critical', 'High', 'Medium', 'Low'), requested_on, request_id
+    """)
+    for request_id, blood_group, units in cursor.fetchall():
+        cursor.execute("UPDATE emergency_requests SET status = 'Approved', approved_on = NOW() WHERE request_id = %s",
+                       (request_id,))
+        cursor.execute("""
+            UPDATE blood_inventory
+            SET status = 'Used'
+            WHERE blood_group = %s AND status = 'Available' AND expires_on >= CURDATE()
+            ORDER BY expires_on ASC
+            LIMIT %s
+        """, (blood_group, units))
+
+
+def timed(conn, fn, request_count, repeats):
+    samples = []
+    for run in range(repeats):
+        cursor = conn.cursor(buffered=True)
+        conn.start_transaction()
+        # Only the seeded requests should be Pending during the run
+        cursor.execute("UPDATE emergency_requests SET status = 'Rejected' WHERE status = 'Pending'")
+        seed(cursor, request_count, random.Random(run))
+        start = time.perf_counter()
+        fn(cursor)
+        samples.append(time.perf_counter() - start)
+        conn.rollback()
+        cursor.close()
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        legacy = timed(conn, legacy_approve_all, args.requests, args.repeats)
+        batch = timed(conn, fulfil_emergency_requests, args.requests, args.repeats)
+    finally:
+        conn.close()
+
+    print(json.dumps({
+        'requests': args.requests,
+        'legacy_p50_ms': round(legacy * 1000, 1),
+        'legacy_requests_per_sec': round(args.requests / legacy, 1),
+        'batch_p50_ms': round(batch * 1000, 1),
+        'batch_requests_per_sec': round(args.requests / batch, 1)
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FEFO transfer allocation against hospitals with thousands of lots
+Seeds a throwaway supplier with --lots lots of one blood group, then times
+allocation_service.allocate_transfer for requests that span 1, 10 and 100+
+lots. Each run happens inside a transaction that is rolled back, so the
+database is left unchanged. Requires migrations 0002 and 0003. Run from the
+repository root:
+    python benchmarks/bench_fefo_allocation.py --lots 1000 5000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from allocation_service import allocate_transfer
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '',
+    'database': 'blood_bank_db'
+}
+
+UNITS_PER_LOT = 4
+
+
+def seed(cursor, lot_count):
+    """Create a requester and a supplier with lot_count lots; returns their ids"""
+    stamp = f'{os.getpid()}-{time.time_ns()}'
+    ids = []
+    for role in ('requester', 'supplier'):
+        cursor.execute("""
+            INSERT INTO hospitals (name, email, password, city)
+            VALUES (%s, %s, 'bench', 'Benchville')
+        """, (f'Bench {role}', f'{role}-{stamp}@bench.local'))
+        ids.append(cursor.lastrowid)
+    requester, supplier = ids
+
+    rows = [(supplier, 'O+', UNITS_PER_LOT, day) for day in range(1, lot_count + 1)]
+    for start in range(0, len(rows), 1000):
+        chunk = rows[start:start + 1000]
+        cursor.execute(f"""
+            INSERT INTO hospital_inventory (hospital_id, blood_group, units_available, expires_on)
+            VALUES {', '.join(['(%s, %s, %s, DATE_ADD(CURDATE(), INTERVAL %s DAY))'] * len(chunk))}
+        """, [value for row in chunk for value in row])
+    return requester, supplier
+
+
+def timed(conn, lot_count, units_needed, repeats):
+    samples, lots_used = [], 0
+    for _ in range(repeats):
+        cursor = conn.cursor(buffered=True)
+        conn.start_transaction()
+        requester, supplier = seed(cursor, lot_count)
+        cursor.execute("""
+            INSERT INTO transfer_requests (from_hospital, to_hospital, blood_group, units_needed)
+            VALUES (%s, %s, 'O+', %s)
+        """, (requester, supplier, units_needed))
+        request_id = cursor.lastrowid
+
+        start = time.perf_counter()
+        plan = allocate_transfer(cursor, request_id, approver_hospital=supplier)
+        samples.append((time.perf_counter() - start) * 1000)
+        lots_used = len(plan.allocations)
+        conn.rollback()
+        cursor.close()
+    samples.sort()
+    return round(samples[len(samples) // 2], 3), lots_used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lots', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--units', type=int, nargs='+', default=[2, 40, 400])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    results = []
+    try:
+        for lot_count in args.lots:
+            for units_needed in args.units:
+                if units_needed > lot_count * UNITS_PER_LOT:
+                    continue
+                p50, lots_used = timed(conn, lot_count, units_needed, args.repeats)
+                results.append({
+                    'supplier_lots': lot_count,
+                    'units_needed': units_needed,
+                    'lots_used': lots_used,
+                    'allocate_p50_ms': p50
+                })
+    finally:
+        conn.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batch demand-forecast refit
+In-memory mode (default) fits demand_forecast.fit_forecasts over --series
+synthetic Poisson series with a weekly pattern and reports the fit time and
+how well the forecast tracks each series' true rate. With --db it runs a
+forced DemandForecaster refit (stream, fit, store) against a seeded
+blood_bank_db. Run from the repository root:
+    python benchmarks/bench_forecast.py --series 10000
+    python benchmarks/bench_forecast.py --db
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from demand_forecast import HAVE_NUMPY, HISTORY_DAYS, DemandForecaster, fit_forecasts
+
+if HAVE_NUMPY:
+    import numpy as np
+
+WEEKDAY_PATTERN = (1.2, 1.1, 1.0, 1.0, 1.0, 0.7, 0.6)
+
+
+def bench_memory(args):
+    rng = np.random.default_rng(args.seed)
+    rates = rng.gamma(1.0, 1.0, args.series)
+    pattern = np.resize(np.asarray(WEEKDAY_PATTERN), args.days)
+    history = rng.poisson(rates[:, None] * pattern[None, :])
+
+    samples = []
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        daily, _, alpha, gamma = fit_forecasts(history)
+        samples.append((time.perf_counter() - start) * 1000)
+    # The true mean daily rate over the coming week, for comparison
+    upcoming = np.resize(np.asarray(WEEKDAY_PATTERN), args.days + 7)[args.days:].mean()
+    truth = rates * upcoming
+    return {
+        'mode': 'memory',
+        'series': args.series,
+        'days': args.days,
+        'fit_ms': round(min(samples), 1),
+        'mean_abs_error_units_per_day': round(float(np.abs(daily - truth).mean()), 3),
+        'naive_mean_abs_error_units_per_day': round(float(np.abs(history[:, -28:].mean(axis=1) - truth).mean()), 3),
+        'alpha_counts': {str(a): int(n) for a, n in zip(*np.unique(alpha, return_counts=True))},
+        'gamma_counts': {str(g): int(n) for g, n in zip(*np.unique(gamma, return_counts=True))}
+    }
+
+
+def bench_db(args):
+    run = DemandForecaster(history_days=args.days).run_once(force=True)
+    return {'mode': 'db', 'series': run.series, 'history_rows': run.history_rows, 'load_ms': round(run.load_ms, 1),
+            'fit_ms': round(run.fit_ms, 1), 'write_ms': round(run.write_ms, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--series', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=HISTORY_DAYS)
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', action='store_true', help='refit blood_bank_db instead')
+    args = parser.parse_args()
+
+    if not HAVE_NUMPY:
+        print("❌ numpy is not installed (pip install numpy)")
+        return 1
+    print(json.dumps(bench_db(args) if args.db else bench_memory(args), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
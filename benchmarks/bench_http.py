@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTTP load against the running Flask app
+Each worker is one logged-in hospital session that replays a weighted mix of
+the real routes (dashboard, network, transfers, donor booking, availability
+API) for --duration seconds. Per-route throughput and p50/p95/p99 latency are
+printed as JSON. Start the app against a seeded database first (see
+seed_generator.py), then, from the repository root:
+    python benchmarks/bench_http.py --app bank --concurrency 16 --duration 60 -o before.json
+    python benchmarks/bench_http.py --app network --base-url http://127.0.0.1:8000 \\
+        --account 'hospital{n}.s42@seed.local' --accounts 200 --password 123456
+    python benchmarks/bench_http.py --compare before.json after.json --threshold 10
+Donor booking requests create donors and appointments; run it against a
+throwaway database.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timedelta
+from http.cookiejar import CookieJar
+
+BLOOD_GROUPS = ('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-')
+
+# Per app: base URL, login form, default account and the route mix as
+# name -> (method, path, weight); {hospital_id} is a random hospital
+APPS = {
+    'bank': {
+        'base_url': 'http://127.0.0.1:5001',
+        'login': ('/login', {'user_type': 'hospital'}),
+        'account': ('admin@msramaiah.com', '123456'),
+        'routes': {
+            'dashboard': ('GET', '/dashboard', 30),
+            'network': ('GET', '/hospital/network', 25),
+            'transfers': ('GET', '/hospital/transfers', 20),
+            'donor_booking': ('POST', '/donor', 10),
+            'hospitals_by_city': ('GET', '/get_hospitals/{city}', 15)
+        }
+    },
+    'network': {
+        'base_url': 'http://127.0.0.1:8000',
+        'login': ('/hospital/login', {}),
+        'account': ('admin@citygeneral.com', 'hospital123'),
+        'routes': {
+            'dashboard': ('GET', '/hospital/dashboard', 30),
+            'network': ('GET', '/hospital/network', 25),
+            'inventory': ('GET', '/hospital/inventory', 10),
+            'donor_booking': ('POST', '/donate', 10),
+            'blood_availability': ('GET', '/api/blood_availability/{hospital_id}', 25)
+        }
+    }
+}
+
+CITIES = ('Mumbai', 'Delhi', 'Bangalore', 'Hyderabad', 'Ahmedabad', 'Chennai', 'Kolkata', 'Pune')
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Time each request on its own; a redirect counts as a response"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Worker(threading.Thread):
+    def __init__(self, index, args, app, deadline, results):
+        super().__init__(daemon=True)
+        self.index = index
+        self.args = args
+        self.app = app
+        self.deadline = deadline
+        self.results = results
+        self.rng = random.Random(args.seed * 1000 + index)
+        self.logged_in = False
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()), NoRedirect)
+        names = list(app['routes'])
+        self.route_names = names
+        self.route_weights = [app['routes'][name][2] for name in names]
+
+    def request(self, name, method, path, form=None):
+        data = urllib.parse.urlencode(form).encode('utf-8') if form is not None else None
+        req = urllib.request.Request(self.args.base_url + path, data=data, method=method)
+        start = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=self.args.timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            status = 0
+        self.results[name].append((start, (time.perf_counter() - start) * 1000, status))
+        return status
+
+    def login(self):
+        path, extra = self.app['login']
+        email = self.args.account.format(n=self.index % self.args.accounts + 1)
+        status = self.request('login', 'POST', path, dict(extra, email=email, password=self.args.password))
+        # A failed login re-renders the form with 200
+        self.logged_in = status in (302, 303)
+        return self.logged_in
+
+    def donor_form(self):
+        preferred = datetime.now() + timedelta(days=self.rng.randint(1, 14), hours=self.rng.randint(0, 8))
+        return {
+            'name': f'Bench Donor {self.index}',
+            'age': self.rng.randint(18, 65),
+            'gender': self.rng.choice(('Male', 'Female')),
+            'blood_group': self.rng.choice(BLOOD_GROUPS),
+            'phone': f"9{self.rng.randrange(10 ** 9):09d}",
+            'city': self.rng.choice(CITIES),
+            'hospital_id': self.rng.randint(1, self.args.hospitals),
+            'preferred_time': preferred.strftime('%Y-%m-%dT%H:00')
+        }
+
+    def run(self):
+        if not self.login():
+            return
+        while time.perf_counter() < self.deadline:
+            name = self.rng.choices(self.route_names, self.route_weights)[0]
+            method, path, _ = self.app['routes'][name]
+            path = path.format(hospital_id=self.rng.randint(1, self.args.hospitals),
+                               city=urllib.parse.quote(self.rng.choice(CITIES)))
+            self.request(name, method, path, self.donor_form() if method == 'POST' else None)
+
+
+def run_load(args):
+    app = APPS[args.app]
+    workers = []
+    started = time.perf_counter()
+    deadline = started + args.warmup + args.duration
+    for i in range(args.concurrency):
+        worker = Worker(i, args, app, deadline, defaultdict(list))
+        workers.append(worker)
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    # Only requests started after warmup count, except logins which all happen then
+    measure_from = started + args.warmup
+    results = defaultdict(list)
+    for worker in workers:
+        for name, samples in worker.results.items():
+            results[name].extend((latency, status) for start, latency, status in samples
+                                 if name == 'login' or start >= measure_from)
+
+    routes = {}
+    for name, samples in sorted(results.items()):
+        latencies = [latency for latency, status in samples if 0 < status < 400]
+        errors = len(samples) - len(latencies)
+        window = args.warmup + args.duration if name == 'login' else args.duration
+        routes[name] = {
+            'requests': len(samples),
+            'errors': errors,
+            'throughput_rps': round(len(latencies) / window, 2),
+            'p50_ms': round(percentile(latencies, 50), 2) if latencies else None,
+            'p95_ms': round(percentile(latencies, 95), 2) if latencies else None,
+            'p99_ms': round(percentile(latencies, 99), 2) if latencies else None
+        }
+    return {
+        'app': args.app,
+        'base_url': args.base_url,
+        'concurrency': args.concurrency,
+        'duration_s': args.duration,
+        'seed': args.seed,
+        'workers_logged_in': sum(worker.logged_in for worker in workers),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'routes': routes
+    }
+
+
+def error_rate(route):
+    return route['errors'] / route['requests'] if route.get('requests') else 0.0
+
+
+def compare(baseline, current, threshold):
+    """Per-route deltas and the routes that regressed.
+
+    A route regresses if it is missing from the current run or has no
+    successful request in it (p95 None), if its error rate rises, or if p95
+    rises or throughput falls by more than threshold %.
+    """
+    report, regressions = {}, []
+    for name, before in baseline['routes'].items():
+        # Logins happen once per worker; their rate says nothing about the app
+        if name == 'login':
+            continue
+        after = current['routes'].get(name)
+        if not after or after.get('p95_ms') is None:
+            report[name] = {
+                'p95_ms': [before['p95_ms'], after and after.get('p95_ms')],
+                'errors': [before['errors'], after and after['errors']],
+                'reason': 'missing from current run' if not after else 'no successful requests',
+                'regressed': True
+            }
+            regressions.append(name)
+            continue
+        p95_change = ((after['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100
+                      if before['p95_ms'] else 0.0)
+        rps_change = ((after['throughput_rps'] - before['throughput_rps']) / before['throughput_rps'] * 100
+                      if before['throughput_rps'] else 0.0)
+        errors_before, errors_after = error_rate(before), error_rate(after)
+        regressed = p95_change > threshold or rps_change < -threshold or errors_after > errors_before
+        report[name] = {
+            'p95_ms': [before['p95_ms'], after['p95_ms']],
+            'p95_change_pct': round(p95_change, 1),
+            'throughput_rps': [before['throughput_rps'], after['throughput_rps']],
+            'throughput_change_pct': round(rps_change, 1),
+            'error_rate_pct': [round(errors_before * 100, 2), round(errors_after * 100, 2)],
+            'regressed': regressed
+        }
+        if regressed:
+            regressions.append(name)
+    return report, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--app', choices=sorted(APPS), default='bank')
+    parser.add_argument('--base-url', help='default: the app\'s development server')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30.0, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5.0)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--account', help='login email; {n} is replaced by 1..--accounts per worker')
+    parser.add_argument('--accounts', type=int, default=1)
+    parser.add_argument('--password')
+    parser.add_argument('--hospitals', type=int, default=5, help='hospital ids 1..N used in requests')
+    parser.add_argument('-o', '--output', help='also write the JSON report here')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help='compare two saved reports instead of running load')
+    parser.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        report, regressions = compare(baseline, current, args.threshold)
+        print(json.dumps(report, indent=2))
+        if regressions:
+            print(f"❌ Regressed (beyond {args.threshold}%, more errors or no successful requests): "
+                  f"{', '.join(regressions)}")
+            return 1
+        print(f"✅ No route regressed beyond {args.threshold}%")
+        return 0
+
+    app = APPS[args.app]
+    args.base_url = (args.base_url or app['base_url']).rstrip('/')
+    default_email, default_password = app['account']
+    args.account = args.account or default_email
+    args.password = args.password or default_password
+
+    result = run_load(args)
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    if not result['workers_logged_in']:
+        print("❌ No worker could log in; check --account/--password", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
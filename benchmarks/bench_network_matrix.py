@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Benchmark: in-memory network inventory matrix
+In-memory mode (default) loads network_matrix.NetworkMatrix from synthetic
+inventory_summary rows for --hospitals hospitals and times a full load, an
+incremental refresh and each query. With --db it times the matrix against the
+aggregate queries the network pages ran before, on a seeded database
+(seed_generator.py --hospitals 10000). Run from the repository root:
+    python benchmarks/bench_network_matrix.py --hospitals 10000
+    python benchmarks/bench_network_matrix.py --db blood_network_db --iterations 50
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compatibility_service import BLOOD_GROUPS, HOSPITAL_NAME_COLUMNS
+from network_matrix import NetworkMatrix, HAVE_NUMPY
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'p50_ms': round(percentile(samples, 50), 2), 'p99_ms': round(percentile(samples, 99), 2)}
+
+
+class SyntheticCursor:
+    """Answers NetworkMatrix's three queries from in-memory rows"""
+
+    def __init__(self, hospitals, summary):
+        self.hospitals = hospitals
+        self.summary = summary
+        self._result = []
+
+    def execute(self, sql, params=None):
+        if 'FROM hospitals' in sql:
+            self._result = self.hospitals
+        elif 'WHERE updated_at' in sql:
+            since = params[0] - timedelta(seconds=params[1])
+            self._result = [row for row in self.summary if row[4] >= since]
+        else:
+            self._result = self.summary
+
+    def fetchall(self):
+        return self._result
+
+
+def synthetic_network(hospitals, cities, seed):
+    rng = random.Random(seed)
+    now = datetime.now()
+    hospital_rows = [(i, f'Hospital {i}', f'City {rng.randint(1, cities)}') for i in range(1, hospitals + 1)]
+    summary = [(i, group, rng.randint(0, 60), rng.randint(0, 5), now - timedelta(hours=rng.randint(1, 48)))
+               for i in range(1, hospitals + 1) for group in BLOOD_GROUPS]
+    return hospital_rows, summary
+
+
+def bench_memory(args):
+    hospitals, summary = synthetic_network(args.hospitals, args.cities, args.seed)
+    cursor = SyntheticCursor(hospitals, summary)
+    matrix = NetworkMatrix('blood_network_db')
+
+    def full_load():
+        matrix.refresh(cursor, versions=('full', time.perf_counter()))
+        matrix._stale = True
+
+    load = timed(full_load, max(1, args.iterations // 5))
+    matrix.refresh(cursor, versions=(1, 1))
+
+    # A handful of rows changed since the last refresh
+    now = datetime.now()
+    for i in range(args.changed_rows):
+        hospital_id, group, units, expiring, _ = summary[i]
+        summary[i] = (hospital_id, group, units + 1, expiring, now)
+    version = iter(range(2, 10 ** 9))
+    incremental = timed(lambda: matrix.refresh(cursor, versions=(1, next(version))), args.iterations)
+
+    return {
+        'mode': 'memory',
+        'hospitals': args.hospitals,
+        'summary_rows': len(summary),
+        'full_load': load,
+        'incremental_refresh': {'changed_rows': args.changed_rows, **incremental},
+        'unchanged_refresh': timed(lambda: matrix.refresh(cursor, versions=(1, 1)), args.iterations),
+        'totals': timed(matrix.totals, args.iterations),
+        'top_hospitals_O-': timed(lambda: matrix.top_hospitals('O-', 10), args.iterations),
+        'cities_below_10': timed(lambda: matrix.cities_below(10), args.iterations),
+        'network_rows': timed(matrix.network_rows, args.iterations)
+    }
+
+
+def bench_db(args):
+    conn = mysql.connector.connect(**DB_CONFIG, database=args.db)
+    cursor = conn.cursor(buffered=True)
+    name = HOSPITAL_NAME_COLUMNS[args.db]
+    matrix = NetworkMatrix(args.db)
+
+    def sql(statement, params=None):
+        def run():
+            cursor.execute(statement, params)
+            cursor.fetchall()
+        return run
+
+    try:
+        start = time.perf_counter()
+        matrix.refresh(cursor, versions=(0, 0))
+        load_ms = (time.perf_counter() - start) * 1000
+        result = {
+            'mode': 'db',
+            'database': args.db,
+            'hospitals': len(matrix.names),
+            'matrix_full_load_ms': round(load_ms, 2),
+            'matrix_incremental_refresh': timed(lambda: matrix.refresh(cursor, versions=(0, time.perf_counter())),
+                                                args.iterations),
+            'sql_network_rows': timed(sql(f"""
+                SELECT h.{name}, h.city, s.blood_group, s.total_units
+                FROM hospitals h
+                JOIN inventory_summary s ON h.hospital_id = s.hospital_id
+                WHERE s.total_units > 0
+                ORDER BY h.city, h.{name}, s.blood_group
+            """), args.iterations),
+            'matrix_network_rows': timed(matrix.network_rows, args.iterations),
+            'sql_totals': timed(sql("""
+                SELECT blood_group, SUM(total_units), SUM(expiring_soon_units)
+                FROM inventory_summary
+                GROUP BY blood_group
+            """), args.iterations),
+            'matrix_totals': timed(matrix.totals, args.iterations),
+            'sql_top_hospitals': timed(sql("""
+                SELECT hospital_id, total_units
+                FROM inventory_summary
+                WHERE blood_group = %s
+                ORDER BY total_units DESC
+                LIMIT 10
+            """, ('O-',)), args.iterations),
+            'matrix_top_hospitals': timed(lambda: matrix.top_hospitals('O-', 10), args.iterations),
+            'sql_cities_below': timed(sql("""
+                SELECT h.city, COALESCE(SUM(s.total_units), 0) AS units
+                FROM hospitals h
+                LEFT JOIN inventory_summary s ON s.hospital_id = h.hospital_id
+                GROUP BY h.city
+                HAVING units < %s
+            """, (10,)), args.iterations),
+            'matrix_cities_below': timed(lambda: matrix.cities_below(10), args.iterations)
+        }
+    finally:
+        cursor.close()
+        conn.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hospitals', type=int, default=10000)
+    parser.add_argument('--cities', type=int, default=400)
+    parser.add_argument('--changed-rows', type=int, default=50)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', choices=sorted(HOSPITAL_NAME_COLUMNS), help='benchmark against this database instead')
+    args = parser.parse_args()
+
+    if not HAVE_NUMPY:
+        print("❌ numpy is not installed (pip install numpy)")
+        return 1
+    print(json.dumps(bench_db(args) if args.db else bench_memory(args), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
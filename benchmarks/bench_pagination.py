@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: LIMIT/OFFSET vs keyset pagination (pagination.fetch_page)
+Fills a scratch table with --rows rows (default 1M), then times fetching one
+page at increasing depths. OFFSET cost grows with depth; keyset stays flat.
+The scratch table is dropped afterwards unless --keep is given. Run from the
+repository root:
+    python benchmarks/bench_pagination.py --rows 1000000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import mysql.connector
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pagination import encode_token, fetch_page
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '',
+    'database': 'blood_bank_db'
+}
+
+TABLE = 'bench_page_rows'
+KEYS = [('created_at', 'created_at'), ('row_id', 'row_id')]
+
+
+def seed(cursor, rows):
+    cursor.execute(f"SELECT COUNT(*) FROM information_schema.tables "
+                   f"WHERE table_schema = DATABASE() AND table_name = '{TABLE}'")
+    if cursor.fetchone()[0]:
+        cursor.execute(f"SELECT COUNT(*) FROM {TABLE}")
+        if cursor.fetchone()[0] >= rows:
+            return
+        cursor.execute(f"DROP TABLE {TABLE}")
+
+    cursor.execute(f"""
+        CREATE TABLE {TABLE} (
+            row_id INT AUTO_INCREMENT PRIMARY KEY,
+            created_at DATETIME NOT NULL,
+            payload VARCHAR(64) NOT NULL,
+            KEY idx_created (created_at, row_id)
+        )
+    """)
+    cursor.execute("SET SESSION cte_max_recursion_depth = %s", (rows + 1,))
+    cursor.execute(f"""
+        INSERT INTO {TABLE} (created_at, payload)
+        WITH RECURSIVE seq (n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s)
+        SELECT NOW() - INTERVAL (n DIV 3) MINUTE, MD5(n) FROM seq
+    """, (rows,))
+
+
+def time_offset(cursor, depth, page_size, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        cursor.execute(f"""
+            SELECT * FROM {TABLE} ORDER BY created_at DESC, row_id DESC LIMIT %s OFFSET %s
+        """, (page_size, depth))
+        cursor.fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return round(samples[len(samples) // 2], 3)
+
+
+def time_keyset(app, cursor, depth, page_size, repeats):
+    # The token a client would hold after paging down to `depth`
+    cursor.execute(f"""
+        SELECT created_at, row_id FROM {TABLE}
+        ORDER BY created_at DESC, row_id DESC LIMIT 1 OFFSET %s
+    """, (max(depth - 1, 0),))
+    row = cursor.fetchone()
+    token = encode_token([row['created_at'], row['row_id']])
+
+    samples = []
+    for _ in range(repeats):
+        with app.test_request_context(f'/?after={token}&limit={page_size}'):
+            start = time.perf_counter()
+            fetch_page(cursor, f"SELECT * FROM {TABLE}", keys=KEYS)
+            samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return round(samples[len(samples) // 2], 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--depths', type=int, nargs='+', default=[50, 1000, 10000, 100000, 500000, 950000])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--keep', action='store_true', help='keep the scratch table for later runs')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        cursor = conn.cursor(buffered=True)
+        seed(cursor, args.rows)
+        conn.commit()
+        cursor.close()
+
+        cursor = conn.cursor(buffered=True, dictionary=True)
+        results = []
+        for depth in args.depths:
+            if depth >= args.rows:
+                continue
+            results.append({
+                'depth': depth,
+                'offset_p50_ms': time_offset(cursor, depth, args.page_size, args.repeats),
+                'keyset_p50_ms': time_keyset(app, cursor, depth, args.page_size, args.repeats)
+            })
+        cursor.close()
+
+        if not args.keep:
+            cursor = conn.cursor()
+            cursor.execute(f"DROP TABLE {TABLE}")
+            cursor.close()
+    finally:
+        conn.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
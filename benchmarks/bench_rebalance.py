@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: network rebalancing planner
+In-memory mode (default) plans a synthetic network of --hospitals hospitals
+over --cities cities with random stock, expiring units and pending requests,
+and reports the solve time against the 1 second budget. With --db it times
+load_network plus planning against a seeded database (seed_generator.py).
+Run from the repository root:
+    python benchmarks/bench_rebalance.py --hospitals 1000 --cities 30
+    python benchmarks/bench_rebalance.py --db blood_network_db --iterations 5
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compatibility_service import BLOOD_GROUPS
+from rebalance_planner import CityDistances, DEMAND_COSTS, URGENCY_COLUMNS, load_network, plan_rebalance
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+GROUP_WEIGHTS = (0.223, 0.005, 0.322, 0.006, 0.071, 0.002, 0.364, 0.007)
+
+BUDGET_MS = 1000
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def synthetic_network(hospitals, cities, requests, seed):
+    rng = random.Random(seed)
+    city_names = [f'City {c}' for c in range(1, cities + 1)]
+    positions = {c: (rng.uniform(0, 2000), rng.uniform(0, 2000)) for c in city_names}
+    distances = CityDistances({
+        (a, b): ((positions[a][0] - positions[b][0]) ** 2 + (positions[a][1] - positions[b][1]) ** 2) ** 0.5
+        for i, a in enumerate(city_names) for b in city_names[i + 1:]
+    })
+    network = {h: (f'Hospital {h}', rng.choice(city_names)) for h in range(1, hospitals + 1)}
+    stock = {}
+    for h in network:
+        for group, weight in zip(BLOOD_GROUPS, GROUP_WEIGHTS):
+            total = int(rng.expovariate(1 / (weight * 60)))
+            if total:
+                stock[h, group] = (total, rng.randint(0, total // 3))
+    pending = [(r, rng.randint(1, hospitals), rng.choices(BLOOD_GROUPS, GROUP_WEIGHTS)[0], rng.randint(1, 10),
+                rng.choice(tuple(DEMAND_COSTS)[:4])) for r in range(1, requests + 1)]
+    return network, stock, pending, distances
+
+
+def timed_plans(run, iterations):
+    samples, plan = [], None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        plan = run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return plan, {'p50_ms': round(percentile(samples, 50), 1), 'max_ms': round(max(samples), 1),
+                  'within_budget': max(samples) < BUDGET_MS}
+
+
+def summarise(plan):
+    return {
+        'transfers': len(plan.transfers),
+        'units_moved': sum(summary['moved'] for summary in plan.groups.values()),
+        'unmet_requests': sum(summary['unmet_requests'] for summary in plan.groups.values()),
+        'at_risk': sum(summary['at_risk'] for summary in plan.groups.values()),
+        'at_risk_moved': sum(summary['at_risk_moved'] for summary in plan.groups.values())
+    }
+
+
+def bench_memory(args):
+    network, stock, pending, distances = synthetic_network(args.hospitals, args.cities, args.requests, args.seed)
+    plan, timing = timed_plans(lambda: plan_rebalance(network, stock, pending, distances), args.iterations)
+    return {'mode': 'memory', 'hospitals': args.hospitals, 'cities': args.cities,
+            'pending_requests': len(pending), **timing, **summarise(plan)}
+
+
+def bench_db(args):
+    conn = mysql.connector.connect(**DB_CONFIG, database=args.db)
+    cursor = conn.cursor(buffered=True)
+    try:
+        start = time.perf_counter()
+        load_network(cursor, args.db)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        def run():
+            return plan_rebalance(*load_network(cursor, args.db))
+
+        plan, timing = timed_plans(run, args.iterations)
+    finally:
+        cursor.close()
+        conn.close()
+    return {'mode': 'db', 'database': args.db, 'hospitals': plan.hospitals, 'cities': plan.cities,
+            'load_ms': round(load_ms, 1), **timing, **summarise(plan)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hospitals', type=int, default=1000)
+    parser.add_argument('--cities', type=int, default=30)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', choices=sorted(URGENCY_COLUMNS), help='benchmark against this database instead')
+    args = parser.parse_args()
+
+    print(json.dumps(bench_db(args) if args.db else bench_memory(args), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-hospital INSERT loop vs batched broadcast_transfer_request
+Creates N throwaway hospitals inside a transaction that is rolled back, so the
+database is left unchanged. Run from the repository root:
+    python benchmarks/bench_transfer_broadcast.py --sizes 10 100 1000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transfer_service import broadcast_transfer_request
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '',
+    'database': 'blood_bank_db'
+}
+
+
+def legacy_broadcast(cursor, from_hospital, blood_group, units_needed):
+    """The original app.py loop: one INSERT round trip per hospital"""
+    cursor.execute("SELECT hospital_id FROM hospitals WHERE hospital_id != %s", (from_hospital,))
+    for (to_hospital,) in cursor.fetchall():
+        cursor.execute("""
+            INSERT INTO transfer_requests (from_hospital, to_hospital, blood_group, units_needed)
+            VALUES (%s, %s, %s, %s)
+        """, (from_hospital, to_hospital, blood_group, units_needed))
+
+
+def seed_hospitals(cursor, count):
+    cursor.execute("SELECT COUNT(*) FROM hospitals")
+    existing = cursor.fetchone()[0]
+    missing = max(0, count + 1 - existing)
+    cursor.executemany("""
+        INSERT INTO hospitals (name, email, password, city)
+        VALUES (%s, %s, 'bench', 'Benchville')
+    """, [(f'Bench Hospital {i}', f'bench{i}@bench.local') for i in range(missing)])
+    cursor.execute("SELECT hospital_id FROM hospitals ORDER BY hospital_id LIMIT 1")
+    return cursor.fetchone()[0]
+
+
+def timed(fn, conn, size, repeats):
+    samples = []
+    for _ in range(repeats):
+        cursor = conn.cursor(buffered=True)
+        conn.start_transaction()
+        from_hospital = seed_hospitals(cursor, size)
+        # Keep exactly `size` recipients for this run
+        cursor.execute("CREATE TEMPORARY TABLE IF NOT EXISTS bench_keep (hospital_id INT PRIMARY KEY)")
+        cursor.execute("DELETE FROM bench_keep")
+        cursor.execute("""
+            INSERT INTO bench_keep SELECT hospital_id FROM hospitals
+            WHERE hospital_id != %s ORDER BY hospital_id LIMIT %s
+        """, (from_hospital, size))
+        cursor.execute("""
+            DELETE FROM hospitals WHERE hospital_id != %s
+            AND hospital_id NOT IN (SELECT hospital_id FROM bench_keep)
+        """, (from_hospital,))
+        start = time.perf_counter()
+        fn(cursor, from_hospital, 'O+', 2)
+        samples.append((time.perf_counter() - start) * 1000)
+        conn.rollback()
+        cursor.close()
+    samples.sort()
+    return round(samples[len(samples) // 2], 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    results = []
+    try:
+        for size in args.sizes:
+            results.append({
+                'hospitals': size,
+                'legacy_p50_ms': timed(legacy_broadcast, conn, size, args.repeats),
+                'batched_p50_ms': timed(broadcast_transfer_request, conn, size, args.repeats)
+            })
+    finally:
+        conn.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
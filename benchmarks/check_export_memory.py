@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Check: streaming export memory stays flat as the row count grows
+Streams a generated result set (a cross join of digit tables, so nothing has
+to be seeded) through export_service.stream_export for each --rows size, in
+increasing order, discarding the output. Peak RSS after the smallest run is
+the baseline; the check fails if a larger run raises it by more than
+--max-growth-mb. Run from the repository root:
+    python benchmarks/check_export_memory.py --rows 100000 1000000 5000000
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export_service import stream_export
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '',
+    'database': 'blood_bank_db'
+}
+
+DIGITS = "(SELECT 0 AS d UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4 " \
+         "UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9)"
+
+
+def generated_rows_sql(row_count):
+    """SELECT producing row_count export-shaped rows without touching a table"""
+    places = max(1, len(str(row_count - 1)))
+    joins = ' CROSS JOIN '.join(f"{DIGITS} d{i}" for i in range(places))
+    number = ' + '.join(f"d{i}.d * {10 ** i}" for i in range(places))
+    return f"""
+        SELECT n AS log_id, MOD(n, 1000) AS related_id, 'INSERT' AS action_type,
+               CONCAT('Synthetic export row ', n, ' for memory check') AS details,
+               NOW() - INTERVAL MOD(n, 86400) SECOND AS created_at
+        FROM (SELECT {number} AS n FROM {joins}) seq
+        WHERE n < {int(row_count)}
+    """
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(conn, row_count, fmt, compress):
+    start = time.perf_counter()
+    sent = 0
+    for chunk in stream_export(conn, generated_rows_sql(row_count), (), fmt, compress):
+        sent += len(chunk)
+    return {
+        'rows': row_count,
+        'bytes': sent,
+        'seconds': round(time.perf_counter() - start, 2),
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000, 5000000])
+    parser.add_argument('--format', choices=('csv', 'jsonl'), default='csv')
+    parser.add_argument('--gzip', action='store_true')
+    parser.add_argument('--max-growth-mb', type=float, default=16.0)
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        results = [run(conn, row_count, args.format, args.gzip) for row_count in sorted(args.rows)]
+    finally:
+        conn.close()
+
+    growth = results[-1]['peak_rss_mb'] - results[0]['peak_rss_mb']
+    print(json.dumps({'runs': results, 'peak_rss_growth_mb': round(growth, 1)}, indent=2))
+    if growth > args.max_growth_mb:
+        print(f"❌ Peak RSS grew {growth:.1f} MB from {results[0]['rows']} to {results[-1]['rows']} rows")
+        return 1
+    print(f"✅ Peak RSS flat within {args.max_growth_mb} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
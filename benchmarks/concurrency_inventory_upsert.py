@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Concurrency check: parallel additions to the same hospital_inventory lot
+Fires --workers threads, each on its own connection, adding units to one lot
+through inventory_service.add_lot_units, then asserts there is exactly one
+row holding the summed units. Uses a throwaway hospital that is deleted
+afterwards. Requires migration 0002 (python migrate.py up). Run from the
+repository root:
+    python benchmarks/concurrency_inventory_upsert.py --workers 32 --rounds 5
+--legacy runs the old SELECT-then-INSERT path instead to show the race.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory_service import add_lot_units
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '',
+    'database': 'blood_bank_db'
+}
+
+BLOOD_GROUP = 'O+'
+EXPIRES_ON = '2099-12-31'
+
+
+def legacy_add(cursor, hospital_id, blood_group, units, expires_on):
+    """The original app.py path: SELECT, then UPDATE or INSERT"""
+    cursor.execute("""
+        SELECT h_bag_id FROM hospital_inventory
+        WHERE hospital_id = %s AND blood_group = %s AND expires_on = %s
+    """, (hospital_id, blood_group, expires_on))
+    existing = cursor.fetchone()
+    if existing:
+        cursor.execute("UPDATE hospital_inventory SET units_available = units_available + %s WHERE h_bag_id = %s",
+                       (units, existing[0]))
+    else:
+        cursor.execute("""
+            INSERT INTO hospital_inventory (hospital_id, blood_group, units_available, expires_on)
+            VALUES (%s, %s, %s, %s)
+        """, (hospital_id, blood_group, units, expires_on))
+
+
+def worker(writer, hospital_id, units, rounds, barrier, errors):
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor(buffered=True)
+    try:
+        for _ in range(rounds):
+            barrier.wait()
+            try:
+                conn.start_transaction()
+                writer(cursor, hospital_id, BLOOD_GROUP, units, EXPIRES_ON)
+                conn.commit()
+            except mysql.connector.Error as err:
+                conn.rollback()
+                errors.append(str(err))
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--units', type=int, default=3)
+    parser.add_argument('--legacy', action='store_true', help='use the old SELECT-then-INSERT path')
+    args = parser.parse_args()
+
+    writer = legacy_add if args.legacy else add_lot_units
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO hospitals (name, email, password, city)
+        VALUES ('Concurrency Check', %s, 'check', 'Checkville')
+    """, (f'concurrency-{os.getpid()}-{int(time.time())}@check.local',))
+    hospital_id = cursor.lastrowid
+    conn.commit()
+
+    try:
+        barrier = threading.Barrier(args.workers)
+        errors = []
+        threads = [threading.Thread(target=worker, args=(writer, hospital_id, args.units, args.rounds, barrier, errors))
+                   for _ in range(args.workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(units_available), 0) FROM hospital_inventory
+            WHERE hospital_id = %s AND blood_group = %s AND expires_on = %s
+        """, (hospital_id, BLOOD_GROUP, EXPIRES_ON))
+        rows, units = cursor.fetchone()
+    finally:
+        # Cascades to hospital_inventory and inventory_summary
+        cursor.execute("DELETE FROM hospitals WHERE hospital_id = %s", (hospital_id,))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    expected = args.workers * args.rounds * args.units
+    print(f"{args.workers} workers x {args.rounds} rounds in {elapsed * 1000:.1f} ms")
+    print(f"rows={rows} units={units} expected_rows=1 expected_units={expected} errors={len(errors)}")
+    for message in sorted(set(errors)):
+        print(f"  error: {message}")
+
+    if rows == 1 and units == expected and not errors:
+        print("✅ exactly one lot row with the summed units")
+        return 0
+    print("❌ concurrent additions lost or duplicated units")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
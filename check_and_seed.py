@@ -5,6 +5,8 @@ Check existing hospitals and add seed data accordingly
 
 import mysql.connector
 
+from donor_service import normalize_phone
+
 DB_CONFIG = {
     'host': 'localhost',
     'user': 'root',
@@ -65,9 +67,9 @@ def seed_database():
     for name, age, gender, blood_group, phone, city in donors:
         try:
             cursor.execute("""
-                INSERT INTO donors (name, age, gender, blood_group, phone, city, goodwill_score) 
-                VALUES (%s, %s, %s, %s, %s, %s, 0)
-            """, (name, age, gender, blood_group, phone, city))
+                INSERT INTO donors (name, age, gender, blood_group, phone, phone_key, city, goodwill_score) 
+                VALUES (%s, %s, %s, %s, %s, %s, %s, 0)
+            """, (name, age, gender, blood_group, phone, normalize_phone(phone), city))
         except Exception as e:
             print(f"❌ Failed to add donor {name}: {e}")
     
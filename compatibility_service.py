@@ -0,0 +1,196 @@
+"""
+Blood-group compatibility-aware availability search
+Red-cell compatibility is precomputed as an 8x8 bitmap: bit d of
+COMPATIBLE_DONORS[r] is set when donor group d can be given to recipient
+group r. A search expands the recipient group through the bitmap, reads every
+usable lot a hospital would draw on in one query and ranks hospitals by:
+exact-group cover first, then the cheapest substitutes (groups that can serve
+the fewest recipients go first, so O- is spent last), then soonest expiry.
+"""
+
+import heapq
+from dataclasses import dataclass, field
+
+from allocation_service import LOT_SCHEMAS
+
+BLOOD_GROUPS = ('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-')
+GROUP_INDEX = {group: i for i, group in enumerate(BLOOD_GROUPS)}
+
+HOSPITAL_NAME_COLUMNS = {
+    'blood_bank_db': 'name',
+    'blood_network_db': 'hospital_name'
+}
+
+MAX_SEARCH_UNITS = 1000
+
+
+def _can_donate(donor, recipient):
+    """ABO: the recipient must carry every donor antigen; Rh+ only to Rh+"""
+    donor_antigens = set(donor[:-1].replace('O', ''))
+    recipient_antigens = set(recipient[:-1].replace('O', ''))
+    return donor_antigens <= recipient_antigens and (donor[-1] == '-' or recipient[-1] == '+')
+
+
+# Recipient index -> bitmask of compatible donor indexes
+COMPATIBLE_DONORS = tuple(
+    sum(1 << d for d, donor in enumerate(BLOOD_GROUPS) if _can_donate(donor, recipient))
+    for recipient in BLOOD_GROUPS
+)
+
+# How many recipient groups each donor group can serve; spending a group
+# that serves many recipients costs more (O- = 8, AB+ = 1)
+SUBSTITUTION_COST = tuple(
+    sum(1 for mask in COMPATIBLE_DONORS if mask >> d & 1)
+    for d in range(len(BLOOD_GROUPS))
+)
+
+
+def compatible_donors(recipient):
+    """Donor groups usable for recipient, best first: exact, then cheapest substitute, Rh- last on ties"""
+    r = GROUP_INDEX[recipient]
+    donors = [d for d in range(len(BLOOD_GROUPS)) if COMPATIBLE_DONORS[r] >> d & 1]
+    donors.sort(key=lambda d: (d != r, SUBSTITUTION_COST[d], BLOOD_GROUPS[d].endswith('-')))
+    return tuple(BLOOD_GROUPS[d] for d in donors)
+
+
+# Recipient group -> ranked donor groups
+DONOR_RANKING = {recipient: compatible_donors(recipient) for recipient in BLOOD_GROUPS}
+
+
+@dataclass
+class Candidate:
+    hospital_id: int
+    hospital_name: str
+    city: str
+    units_needed: int
+    units_covered: int = 0
+    exact_units: int = 0
+    substitution_cost: int = 0
+    earliest_expiry: object = None
+    lots: list = field(default_factory=list)      # (lot_id, blood_group, units_taken, expires_on)
+
+    @property
+    def fully_covers(self):
+        return self.units_covered >= self.units_needed
+
+    def rank_key(self):
+        return _rank_key(self.units_covered, self.units_needed, self.exact_units, self.substitution_cost,
+                         self.earliest_expiry, self.hospital_id)
+
+    def to_dict(self):
+        return {
+            'hospital_id': self.hospital_id,
+            'hospital_name': self.hospital_name,
+            'city': self.city,
+            'units_covered': self.units_covered,
+            'fully_covers': self.fully_covers,
+            'exact_units': self.exact_units,
+            'substitution_cost': self.substitution_cost,
+            'earliest_expiry': str(self.earliest_expiry) if self.earliest_expiry else None,
+            'lots': [{'lot_id': lot_id, 'blood_group': group, 'units': units, 'expires_on': str(expires_on)}
+                     for lot_id, group, units, expires_on in self.lots]
+        }
+
+
+def _rank_key(covered, needed, exact, cost, earliest_expiry, hospital_id):
+    """Full cover first (else most units), exact-only before substitutes, cheapest substitutes, soonest expiry"""
+    full = covered >= needed
+    return (not full, 0 if full else -covered, exact < covered, cost, earliest_expiry, hospital_id)
+
+
+def rank_candidates(rows, recipient, units_needed, limit=20):
+    """Pick lots per hospital and rank the hospitals.
+
+    rows are (lot_id, hospital_id, hospital_name, city, blood_group, units,
+    expires_on) for compatible lots in any order. Each hospital draws from its
+    lots in donor-ranking then expiry order until units_needed is covered;
+    Candidates are only built for the top `limit` hospitals.
+    """
+    order = {group: i for i, group in enumerate(DONOR_RANKING[recipient])}
+    by_hospital = {}
+    for row in rows:
+        lots = by_hospital.get(row[1])
+        if lots is None:
+            lots = by_hospital[row[1]] = []
+        lots.append(row)
+
+    ranked = []
+    for hospital_id, lots in by_hospital.items():
+        if len(lots) > 1:
+            lots.sort(key=lambda lot: (order[lot[4]], lot[6], lot[0]))
+        covered = exact = cost = 0
+        earliest = None
+        taken = []
+        for lot_id, _, _, _, group, units, expires_on in lots:
+            take = min(units, units_needed - covered)
+            taken.append((lot_id, group, take, expires_on))
+            covered += take
+            if group == recipient:
+                exact += take
+            else:
+                cost += take * SUBSTITUTION_COST[GROUP_INDEX[group]]
+            if earliest is None or expires_on < earliest:
+                earliest = expires_on
+            if covered >= units_needed:
+                break
+        ranked.append((_rank_key(covered, units_needed, exact, cost, earliest, hospital_id),
+                       lots[0][2], lots[0][3], covered, exact, cost, earliest, taken))
+
+    # Keys end in the unique hospital_id, so ties never compare further
+    return [Candidate(key[-1], name, city, units_needed, covered, exact, cost, earliest, taken)
+            for key, name, city, covered, exact, cost, earliest, taken in heapq.nsmallest(limit, ranked)]
+
+
+def search_compatible(cursor, database, recipient, units_needed, exclude_hospital=None, city=None, limit=20):
+    """Ranked Candidates able to supply recipient-compatible blood, in one query.
+
+    A running total per hospital, in donor-ranking then expiry order, keeps
+    only the lots each hospital would actually draw from, so a network of
+    thousands of hospitals returns a few rows per hospital rather than every
+    compatible lot.
+    """
+    if recipient not in GROUP_INDEX:
+        raise ValueError(f"Unknown blood group {recipient!r}")
+    if not 1 <= units_needed <= MAX_SEARCH_UNITS:
+        raise ValueError(f"units must be between 1 and {MAX_SEARCH_UNITS}")
+
+    schema = LOT_SCHEMAS[database]
+    expiry = schema['expiry_column']
+    donors = DONOR_RANKING[recipient]
+    group_list = ', '.join(['%s'] * len(donors))
+    clauses = [f"hi.blood_group IN ({group_list})", schema['available'], f"hi.{expiry} >= CURDATE()"]
+    params = list(donors) + list(donors)
+    if exclude_hospital is not None:
+        clauses.append("hi.hospital_id != %s")
+        params.append(exclude_hospital)
+    if city:
+        clauses.append("h.city = %s")
+        params.append(city)
+    params.append(units_needed)
+    cursor.execute(f"""
+        SELECT lot_id, hospital_id, hospital_name, city, blood_group, units_available, expires_on
+        FROM (
+            SELECT hi.h_bag_id AS lot_id, hi.hospital_id, h.{HOSPITAL_NAME_COLUMNS[database]} AS hospital_name,
+                   h.city, hi.blood_group, hi.units_available, hi.{expiry} AS expires_on,
+                   SUM(hi.units_available) OVER (
+                       PARTITION BY hi.hospital_id
+                       ORDER BY FIELD(hi.blood_group, {group_list}), hi.{expiry}, hi.h_bag_id
+                       ROWS UNBOUNDED PRECEDING
+                   ) AS running_units
+            FROM hospital_inventory hi
+            JOIN hospitals h ON h.hospital_id = hi.hospital_id
+            WHERE {' AND '.join(clauses)}
+        ) lots
+        WHERE running_units - units_available < %s
+    """, params)
+    rows = cursor.fetchall()
+    if rows and isinstance(rows[0], dict):
+        rows = [tuple(row.values()) for row in rows]
+    return rank_candidates(rows, recipient, units_needed, limit)
+
+
+def compatible_units(summary_rows, recipient):
+    """Units usable for recipient out of {blood_group, total_units} summary rows"""
+    mask = COMPATIBLE_DONORS[GROUP_INDEX[recipient]]
+    return sum(row['total_units'] for row in summary_rows
+               if mask >> GROUP_INDEX[row['blood_group']] & 1)
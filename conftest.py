@@ -0,0 +1,57 @@
+"""
+Shared pytest fixtures. Tests that need a real MySQL server take the
+mysql_database fixture and are skipped when none is reachable; point them at
+a server with MYSQL_HOST / MYSQL_PORT / MYSQL_USER / MYSQL_PASSWORD.
+"""
+
+import os
+import uuid
+
+import mysql.connector
+import pytest
+from mysql.connector import Error
+
+import migrate
+
+SCRIPT_DATABASES = ('blood_network_db', 'blood_bank_db')
+
+
+@pytest.fixture(scope='session')
+def mysql_config():
+    """Server connection settings, or skip if no server answers"""
+    config = {
+        'host': os.environ.get('MYSQL_HOST', 'localhost'),
+        'port': int(os.environ.get('MYSQL_PORT', 3306)),
+        'user': os.environ.get('MYSQL_USER', 'root'),
+        'password': os.environ.get('MYSQL_PASSWORD', ''),
+        'connection_timeout': 2
+    }
+    try:
+        mysql.connector.connect(**config).close()
+    except Error as e:
+        pytest.skip(f'MySQL server not available: {e}')
+    return config
+
+
+@pytest.fixture
+def mysql_database(mysql_config):
+    """Name of a throwaway database, dropped after the test"""
+    name = f'test_{uuid.uuid4().hex[:12]}'
+    yield name
+    conn = mysql.connector.connect(**mysql_config)
+    try:
+        conn.cursor().execute(f'DROP DATABASE IF EXISTS {name}')
+    finally:
+        conn.close()
+
+
+def load_script(conn, path, database):
+    """Run a database/ script with its database name replaced by `database`"""
+    cursor = conn.cursor()
+    for statement in migrate.split_statements(path):
+        for original in SCRIPT_DATABASES:
+            statement = statement.replace(original, database)
+        cursor.execute(statement)
+        if cursor.with_rows:
+            cursor.fetchall()
+    cursor.close()
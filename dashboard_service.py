@@ -0,0 +1,105 @@
+"""
+Hospital dashboard data service
+Fetches everything the premium dashboard shows in a single round trip
+"""
+
+from dataclasses import dataclass, field
+
+from compatibility_service import compatible_units
+from db import get_db
+
+# All dashboard statements, sent together as one multi-statement batch.
+# Order matters: results are read back in this order.
+DASHBOARD_SQL = """
+    SELECT blood_group, total_units, expiring_soon_units as expiring_soon
+    FROM inventory_summary
+    WHERE hospital_id = %(hospital_id)s AND total_units > 0;
+
+    SELECT tr.blood_group,
+           SUM(tr.units_needed) as requested_units,
+           COALESCE(hi.total_units, 0) as available_units,
+           COALESCE(hi.expiring_soon, 0) as expiring_soon
+    FROM transfer_requests tr
+    LEFT JOIN (
+        SELECT blood_group, total_units, expiring_soon_units as expiring_soon
+        FROM inventory_summary WHERE hospital_id = %(hospital_id)s
+    ) hi ON tr.blood_group = hi.blood_group
+    WHERE tr.to_hospital = %(hospital_id)s AND tr.status = 'Pending'
+    GROUP BY tr.blood_group, hi.total_units, hi.expiring_soon;
+
+    SELECT
+        (SELECT COUNT(*) FROM donation_appointments
+         WHERE hospital_id = %(hospital_id)s AND status = 'Pending') as pending_appointments,
+        (SELECT COUNT(*) FROM donation_appointments
+         WHERE hospital_id = %(hospital_id)s
+           AND preferred_time >= CURDATE() AND preferred_time < CURDATE() + INTERVAL 1 DAY) as today_appointments,
+        (SELECT COUNT(*) FROM transfer_requests
+         WHERE to_hospital = %(hospital_id)s AND status = 'Pending') as incoming_requests,
+        (SELECT COUNT(*) FROM transfer_requests
+         WHERE from_hospital = %(hospital_id)s AND status = 'Pending') as outgoing_requests;
+
+    SELECT d.name, d.blood_group, d.phone
+    FROM donors d
+    JOIN rare_donors rd ON d.donor_id = rd.donor_id
+    WHERE d.city = (SELECT city FROM hospitals WHERE hospital_id = %(hospital_id)s)
+    ORDER BY d.name
+"""
+
+
+@dataclass
+class DashboardSnapshot:
+    """Everything hospital_dashboard_premium.html renders for one hospital"""
+    hospital_id: int
+    inventory_summary: list = field(default_factory=list)
+    bui_data: list = field(default_factory=list)
+    pending_appointments: int = 0
+    today_appointments: int = 0
+    incoming_requests: int = 0
+    outgoing_requests: int = 0
+    rare_donors: list = field(default_factory=list)
+
+    @property
+    def transfer_summary(self):
+        return {
+            'incoming_requests': self.incoming_requests,
+            'outgoing_requests': self.outgoing_requests
+        }
+
+    def template_context(self):
+        return {
+            'inventory_summary': self.inventory_summary,
+            'bui_data': self.bui_data,
+            'pending_appointments': self.pending_appointments,
+            'today_appointments': self.today_appointments,
+            'transfer_summary': self.transfer_summary,
+            'rare_donors': self.rare_donors
+        }
+
+
+def fetch_dashboard(hospital_id, conn=None):
+    """Load a DashboardSnapshot with one multi-statement round trip"""
+    conn = conn or get_db()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        results = []
+        for result in cursor.execute(DASHBOARD_SQL, {'hospital_id': hospital_id}, multi=True):
+            if result.with_rows:
+                results.append(result.fetchall())
+    finally:
+        cursor.close()
+
+    inventory_summary, bui_data, counts, rare_donors = results
+    counts = counts[0]
+    # Stock the hospital could use for each requested group, not just exact matches
+    for row in bui_data:
+        row['compatible_units'] = compatible_units(inventory_summary, row['blood_group'])
+    return DashboardSnapshot(
+        hospital_id=hospital_id,
+        inventory_summary=inventory_summary,
+        bui_data=bui_data,
+        pending_appointments=counts['pending_appointments'],
+        today_appointments=counts['today_appointments'],
+        incoming_requests=counts['incoming_requests'],
+        outgoing_requests=counts['outgoing_requests'],
+        rare_donors=rare_donors
+    )
@@ -0,0 +1,16 @@
+-- Buffered audit logging for blood_network_db
+-- Run when app_blood_network.py is started with AUDIT_MODE=buffered: the app
+-- then writes these system_logs rows itself through audit_log.AuditWriter
+-- (batched multi-row INSERTs off the request path), so the per-row logging
+-- triggers would only duplicate them. update_donor_last_donation is kept
+-- because it also maintains donors.last_donation_date. To switch back to
+-- trigger mode, re-run blood_network_triggers.sql: it drops every trigger
+-- before creating it, so the kept one is replaced rather than clashing.
+
+USE blood_network_db;
+
+DROP TRIGGER IF EXISTS log_new_blood_entry;
+DROP TRIGGER IF EXISTS handle_transfer_approval;
+DROP TRIGGER IF EXISTS log_donation_request;
+DROP TRIGGER IF EXISTS log_transfer_request;
+DROP TRIGGER IF EXISTS log_hospital_registration;
@@ -12,9 +12,11 @@ CREATE TABLE donors (
     gender ENUM('Male', 'Female', 'Other') NOT NULL,
     blood_group ENUM('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-') NOT NULL,
     phone VARCHAR(15) NOT NULL,
+    phone_key VARCHAR(16) NULL,  -- canonical E.164 phone (donor_service.normalize_phone)
     city VARCHAR(50) NOT NULL,
     last_donation_date DATE DEFAULT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_donors_phone_key (phone_key),
     INDEX idx_blood_group (blood_group),
     INDEX idx_city (city)
 );
@@ -29,7 +31,9 @@ CREATE TABLE hospitals (
     password VARCHAR(255) NOT NULL,
     phone VARCHAR(15) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    INDEX idx_city (city)
+    updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX idx_city (city),
+    INDEX idx_hospitals_updated (updated_at)  -- MAX(updated_at) is the hospitals version (http_cache.py)
 );
 
 -- Table: donation_appointments (Donor appointment requests)
@@ -57,12 +61,28 @@ CREATE TABLE hospital_inventory (
     expiry_date DATE NOT NULL,
     status ENUM('Available', 'Expired', 'Used', 'Transferred') DEFAULT 'Available',
     last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    -- 1 while the lot is Available, NULL after; NULLs never collide, so only one
+    -- Available lot per (hospital, group, expiry) and additions merge into it
+    available_lot TINYINT AS (IF(status = 'Available', 1, NULL)) VIRTUAL,
     FOREIGN KEY (hospital_id) REFERENCES hospitals(hospital_id) ON DELETE CASCADE,
+    UNIQUE KEY uq_inventory_lot (hospital_id, blood_group, expiry_date, available_lot),
     INDEX idx_hospital_blood (hospital_id, blood_group),
     INDEX idx_expiry (expiry_date),
     INDEX idx_status (status)
 );
 
+-- Table: inventory_summary (Per-hospital totals, maintained by triggers on hospital_inventory)
+CREATE TABLE inventory_summary (
+    hospital_id INT NOT NULL,
+    blood_group ENUM('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-') NOT NULL,
+    total_units INT NOT NULL DEFAULT 0,
+    expiring_soon_units INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    PRIMARY KEY (hospital_id, blood_group),
+    INDEX idx_summary_updated (updated_at),  -- inventory version and network_matrix deltas
+    FOREIGN KEY (hospital_id) REFERENCES hospitals(hospital_id) ON DELETE CASCADE
+);
+
 -- Table: transfer_requests (Hospital-to-hospital blood requests)
 CREATE TABLE transfer_requests (
     request_id INT PRIMARY KEY AUTO_INCREMENT,
@@ -83,16 +103,34 @@ CREATE TABLE transfer_requests (
 );
 
 -- Table: system_logs (System activity tracking)
+-- Partitioned by month so old months can be archived and dropped by
+-- log_store.py; partitioned tables cannot have foreign keys, so hospital_id is
+-- a plain indexed column.
 CREATE TABLE system_logs (
-    log_id INT PRIMARY KEY AUTO_INCREMENT,
+    log_id INT AUTO_INCREMENT,
     action_type ENUM('DONATION_REQUEST', 'APPOINTMENT_APPROVED', 'BLOOD_ADDED', 'BLOOD_EXPIRED', 'TRANSFER_REQUEST', 'TRANSFER_APPROVED', 'BLOOD_USED', 'HOSPITAL_REGISTERED') NOT NULL,
     description TEXT NOT NULL,
     related_id INT DEFAULT NULL,
     hospital_id INT DEFAULT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (hospital_id) REFERENCES hospitals(hospital_id) ON DELETE SET NULL,
-    INDEX idx_action_type (action_type),
-    INDEX idx_created_at (created_at)
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (log_id, created_at),
+    INDEX idx_created_at (created_at),
+    INDEX idx_logs_action_created (action_type, created_at),
+    INDEX idx_logs_hospital_created (hospital_id, created_at)
+)
+PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+    PARTITION p_history VALUES LESS THAN (UNIX_TIMESTAMP('2026-10-01 00:00:00')),
+    PARTITION p202610 VALUES LESS THAN (UNIX_TIMESTAMP('2026-11-01 00:00:00')),
+    PARTITION p202611 VALUES LESS THAN (UNIX_TIMESTAMP('2026-12-01 00:00:00')),
+    PARTITION p202612 VALUES LESS THAN (UNIX_TIMESTAMP('2027-01-01 00:00:00')),
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+);
+
+-- Table: table_versions (Change counters for tables written by batch jobs;
+-- hospital and inventory versions are derived from the data, see http_cache.py)
+CREATE TABLE table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0
 );
 
 -- Table: admins (Optional admin accounts - very limited role)
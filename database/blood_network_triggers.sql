@@ -1,23 +1,15 @@
 -- Blood Network System MySQL Triggers
+-- Every object is dropped before it is created, so re-running this script
+-- replaces older definitions (including the baseline handle_transfer_approval
+-- that moved stock itself) instead of failing on the first existing trigger.
 USE blood_network_db;
 
--- Trigger 1: Auto-expire blood units past expiry date
-DELIMITER $$
-CREATE TRIGGER auto_expire_blood
-BEFORE UPDATE ON hospital_inventory
-FOR EACH ROW
-BEGIN
-    IF NEW.expiry_date < CURDATE() AND OLD.status = 'Available' THEN
-        SET NEW.status = 'Expired';
-        INSERT INTO system_logs (action_type, description, related_id, hospital_id)
-        VALUES ('BLOOD_EXPIRED', 
-                CONCAT('Blood unit expired: ', NEW.blood_group, ' (', NEW.units_available, ' units) at hospital ID ', NEW.hospital_id),
-                NEW.h_bag_id, NEW.hospital_id);
-    END IF;
-END$$
-DELIMITER ;
+-- Expiry is handled by expiry_scheduler.py (min-heap of upcoming expiries,
+-- bounded batch updates) rather than a BEFORE UPDATE trigger on every write.
+DROP TRIGGER IF EXISTS auto_expire_blood;
 
 -- Trigger 2: Auto-log new blood entries
+DROP TRIGGER IF EXISTS log_new_blood_entry;
 DELIMITER $$
 CREATE TRIGGER log_new_blood_entry
 AFTER INSERT ON hospital_inventory
@@ -30,48 +22,28 @@ BEGIN
 END$$
 DELIMITER ;
 
--- Trigger 3: Auto-decrease inventory on transfer approval
+-- Trigger 3: Log transfer approvals
+-- Inventory moves are done by allocation_service.allocate_transfer, which
+-- splits the request across the supplier's lots first-expiry-first-out and
+-- sets resolved_on in the same transaction.
+DROP TRIGGER IF EXISTS handle_transfer_approval;
 DELIMITER $$
 CREATE TRIGGER handle_transfer_approval
 AFTER UPDATE ON transfer_requests
 FOR EACH ROW
 BEGIN
     IF NEW.status = 'Approved' AND OLD.status = 'Pending' THEN
-        -- Decrease inventory from source hospital
-        UPDATE hospital_inventory 
-        SET units_available = units_available - NEW.units_needed,
-            status = CASE 
-                WHEN units_available - NEW.units_needed <= 0 THEN 'Transferred'
-                ELSE 'Available'
-            END
-        WHERE hospital_id = NEW.from_hospital_id 
-        AND blood_group = NEW.blood_group 
-        AND status = 'Available'
-        AND units_available >= NEW.units_needed
-        LIMIT 1;
-        
-        -- Add inventory to destination hospital
-        INSERT INTO hospital_inventory (hospital_id, blood_group, units_available, expiry_date)
-        VALUES (NEW.to_hospital_id, NEW.blood_group, NEW.units_needed, DATE_ADD(CURDATE(), INTERVAL 35 DAY))
-        ON DUPLICATE KEY UPDATE 
-        units_available = units_available + NEW.units_needed;
-        
-        -- Log the transfer
         INSERT INTO system_logs (action_type, description, related_id, hospital_id)
         VALUES ('TRANSFER_APPROVED', 
                 CONCAT('Blood transfer approved: ', NEW.units_needed, ' units of ', NEW.blood_group, 
-                       ' from hospital ', NEW.from_hospital_id, ' to hospital ', NEW.to_hospital_id),
-                NEW.request_id, NEW.from_hospital_id);
-        
-        -- Update resolved timestamp
-        UPDATE transfer_requests 
-        SET resolved_on = CURRENT_TIMESTAMP 
-        WHERE request_id = NEW.request_id;
+                       ' from hospital ', NEW.to_hospital_id, ' to hospital ', NEW.from_hospital_id),
+                NEW.request_id, NEW.to_hospital_id);
     END IF;
 END$$
 DELIMITER ;
 
 -- Trigger 4: Auto-update last donation date when appointment completed
+DROP TRIGGER IF EXISTS update_donor_last_donation;
 DELIMITER $$
 CREATE TRIGGER update_donor_last_donation
 AFTER UPDATE ON donation_appointments
@@ -91,6 +63,7 @@ END$$
 DELIMITER ;
 
 -- Trigger 5: Log donation appointment requests
+DROP TRIGGER IF EXISTS log_donation_request;
 DELIMITER $$
 CREATE TRIGGER log_donation_request
 AFTER INSERT ON donation_appointments
@@ -104,6 +77,7 @@ END$$
 DELIMITER ;
 
 -- Trigger 6: Log transfer requests
+DROP TRIGGER IF EXISTS log_transfer_request;
 DELIMITER $$
 CREATE TRIGGER log_transfer_request
 AFTER INSERT ON transfer_requests
@@ -118,6 +92,7 @@ END$$
 DELIMITER ;
 
 -- Trigger 7: Log hospital registrations
+DROP TRIGGER IF EXISTS log_hospital_registration;
 DELIMITER $$
 CREATE TRIGGER log_hospital_registration
 AFTER INSERT ON hospitals
@@ -130,18 +105,91 @@ BEGIN
 END$$
 DELIMITER ;
 
--- Event to automatically expire blood units daily
+-- Inventory summary maintenance
+-- inventory_summary holds per-hospital, per-group totals of Available units so
+-- dashboards and the API read O(groups) rows instead of re-aggregating lots.
+-- Each trigger removes the OLD row's contribution and adds the NEW one. Only
+-- total_units is maintained here; expiring_soon_units depends on the date, so
+-- expiry_scheduler.py republishes it after every sweep.
+DROP TRIGGER IF EXISTS summary_inventory_insert;
+DROP TRIGGER IF EXISTS summary_inventory_update;
+DROP TRIGGER IF EXISTS summary_inventory_delete;
+DROP PROCEDURE IF EXISTS apply_inventory_delta;
+
 DELIMITER $$
-CREATE EVENT daily_blood_expiry_check
-ON SCHEDULE EVERY 1 DAY
-STARTS CURRENT_TIMESTAMP
-DO
+CREATE PROCEDURE apply_inventory_delta(
+    IN p_hospital_id INT,
+    IN p_blood_group VARCHAR(3),
+    IN p_units INT
+)
 BEGIN
-    UPDATE hospital_inventory 
-    SET status = 'Expired' 
-    WHERE expiry_date < CURDATE() AND status = 'Available';
+    IF p_units <> 0 THEN
+        INSERT INTO inventory_summary (hospital_id, blood_group, total_units)
+        VALUES (p_hospital_id, p_blood_group, p_units)
+        ON DUPLICATE KEY UPDATE total_units = total_units + VALUES(total_units);
+    END IF;
 END$$
 DELIMITER ;
 
--- Enable event scheduler
-SET GLOBAL event_scheduler = ON;
\ No newline at end of file
+-- Trigger 8: Add new lots to the summary
+DELIMITER $$
+CREATE TRIGGER summary_inventory_insert
+AFTER INSERT ON hospital_inventory
+FOR EACH ROW
+BEGIN
+    IF NEW.status = 'Available' THEN
+        CALL apply_inventory_delta(NEW.hospital_id, NEW.blood_group, NEW.units_available);
+    END IF;
+END$$
+DELIMITER ;
+
+-- Trigger 9: Move a lot's contribution on unit, status, expiry or group changes
+DELIMITER $$
+CREATE TRIGGER summary_inventory_update
+AFTER UPDATE ON hospital_inventory
+FOR EACH ROW
+BEGIN
+    IF OLD.status = 'Available' THEN
+        CALL apply_inventory_delta(OLD.hospital_id, OLD.blood_group, -OLD.units_available);
+    END IF;
+    IF NEW.status = 'Available' THEN
+        CALL apply_inventory_delta(NEW.hospital_id, NEW.blood_group, NEW.units_available);
+    END IF;
+END$$
+DELIMITER ;
+
+-- Trigger 10: Remove deleted lots from the summary
+DELIMITER $$
+CREATE TRIGGER summary_inventory_delete
+AFTER DELETE ON hospital_inventory
+FOR EACH ROW
+BEGIN
+    IF OLD.status = 'Available' THEN
+        CALL apply_inventory_delta(OLD.hospital_id, OLD.blood_group, -OLD.units_available);
+    END IF;
+END$$
+DELIMITER ;
+
+-- Backfill the totals from existing inventory
+INSERT INTO inventory_summary (hospital_id, blood_group, total_units)
+SELECT hospital_id, blood_group, SUM(units_available)
+FROM hospital_inventory
+WHERE status = 'Available'
+GROUP BY hospital_id, blood_group
+ON DUPLICATE KEY UPDATE total_units = VALUES(total_units);
+
+-- Table versions
+-- The API's ETags and the reference cache are keyed on versions derived from
+-- hospitals and inventory_summary (http_cache.py). The per-row triggers that
+-- bumped one shared counter row on every write are gone.
+DROP TRIGGER IF EXISTS version_hospitals_insert;
+DROP TRIGGER IF EXISTS version_hospitals_update;
+DROP TRIGGER IF EXISTS version_hospitals_delete;
+DROP TRIGGER IF EXISTS version_inventory_insert;
+DROP TRIGGER IF EXISTS version_inventory_update;
+DROP TRIGGER IF EXISTS version_inventory_delete;
+DROP PROCEDURE IF EXISTS bump_table_version;
+DELETE FROM table_versions WHERE table_name IN ('hospitals', 'hospital_inventory');
+
+-- Daily expiry is done by expiry_scheduler.py; drop the old event if present
+DROP EVENT IF EXISTS daily_blood_expiry_check;
@@ -5,6 +5,7 @@ USE blood_bank_db;
 -- Drop existing tables
 DROP TABLE IF EXISTS transfer_requests;
 DROP TABLE IF EXISTS donation_appointments;
+DROP TABLE IF EXISTS inventory_summary;
 DROP TABLE IF EXISTS hospital_inventory;
 DROP TABLE IF EXISTS rare_donors;
 DROP TABLE IF EXISTS logs;
@@ -61,6 +62,17 @@ CREATE TABLE hospital_inventory (
     FOREIGN KEY (hospital_id) REFERENCES hospitals(hospital_id) ON DELETE CASCADE
 );
 
+-- Inventory Summary Table (per-hospital totals, maintained by inventory_summary_triggers.sql)
+CREATE TABLE inventory_summary (
+    hospital_id INT NOT NULL,
+    blood_group ENUM('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-') NOT NULL,
+    total_units INT NOT NULL DEFAULT 0,
+    expiring_soon_units INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (hospital_id, blood_group),
+    FOREIGN KEY (hospital_id) REFERENCES hospitals(hospital_id) ON DELETE CASCADE
+);
+
 -- Donation Appointments Table
 CREATE TABLE donation_appointments (
     appointment_id INT AUTO_INCREMENT PRIMARY KEY,
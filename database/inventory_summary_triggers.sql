@@ -0,0 +1,82 @@
+-- Inventory Summary Triggers for blood_bank_db
+-- Keeps inventory_summary in step with hospital_inventory so the dashboard,
+-- network and availability views read O(groups) rows instead of re-aggregating
+-- every lot. Lots count while units_available > 0. The triggers maintain only
+-- total_units: a lot's share of the 7-day expiring window depends on the date,
+-- not on the write, so expiring_soon_units is owned by expiry_scheduler.py,
+-- which republishes it after every sweep.
+
+USE blood_bank_db;
+
+CREATE TABLE IF NOT EXISTS inventory_summary (
+    hospital_id INT NOT NULL,
+    blood_group ENUM('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-') NOT NULL,
+    total_units INT NOT NULL DEFAULT 0,
+    expiring_soon_units INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (hospital_id, blood_group),
+    FOREIGN KEY (hospital_id) REFERENCES hospitals(hospital_id) ON DELETE CASCADE
+);
+
+DROP TRIGGER IF EXISTS summary_inventory_insert;
+DROP TRIGGER IF EXISTS summary_inventory_update;
+DROP TRIGGER IF EXISTS summary_inventory_delete;
+DROP PROCEDURE IF EXISTS apply_inventory_delta;
+
+DELIMITER $$
+CREATE PROCEDURE apply_inventory_delta(
+    IN p_hospital_id INT,
+    IN p_blood_group VARCHAR(3),
+    IN p_units INT
+)
+BEGIN
+    IF p_units <> 0 THEN
+        INSERT INTO inventory_summary (hospital_id, blood_group, total_units)
+        VALUES (p_hospital_id, p_blood_group, p_units)
+        ON DUPLICATE KEY UPDATE total_units = total_units + VALUES(total_units);
+    END IF;
+END$$
+
+-- 1. New lots
+CREATE TRIGGER summary_inventory_insert
+AFTER INSERT ON hospital_inventory
+FOR EACH ROW
+BEGIN
+    IF NEW.units_available > 0 THEN
+        CALL apply_inventory_delta(NEW.hospital_id, NEW.blood_group, NEW.units_available);
+    END IF;
+END$$
+
+-- 2. Unit, expiry or group changes (including transfers)
+CREATE TRIGGER summary_inventory_update
+AFTER UPDATE ON hospital_inventory
+FOR EACH ROW
+BEGIN
+    IF OLD.units_available > 0 THEN
+        CALL apply_inventory_delta(OLD.hospital_id, OLD.blood_group, -OLD.units_available);
+    END IF;
+    IF NEW.units_available > 0 THEN
+        CALL apply_inventory_delta(NEW.hospital_id, NEW.blood_group, NEW.units_available);
+    END IF;
+END$$
+
+-- 3. Deleted lots
+CREATE TRIGGER summary_inventory_delete
+AFTER DELETE ON hospital_inventory
+FOR EACH ROW
+BEGIN
+    IF OLD.units_available > 0 THEN
+        CALL apply_inventory_delta(OLD.hospital_id, OLD.blood_group, -OLD.units_available);
+    END IF;
+END$$
+
+DELIMITER ;
+
+-- Backfill the totals from existing inventory (expiring_soon_units is left to
+-- the expiry scheduler's next publish)
+INSERT INTO inventory_summary (hospital_id, blood_group, total_units)
+SELECT hospital_id, blood_group, SUM(units_available)
+FROM hospital_inventory
+WHERE units_available > 0
+GROUP BY hospital_id, blood_group
+ON DUPLICATE KEY UPDATE total_units = VALUES(total_units);
@@ -0,0 +1,27 @@
+-- Revert 0001_hot_query_indexes
+-- MySQL silently drops the implicit foreign key index once a composite index
+-- can serve the constraint, so put a plain one back before dropping ours.
+
+ALTER TABLE hospital_inventory
+    ADD INDEX hospital_id (hospital_id),
+    DROP INDEX idx_inventory_lot;
+
+ALTER TABLE transfer_requests
+    ADD INDEX to_hospital (to_hospital),
+    ADD INDEX from_hospital (from_hospital),
+    DROP INDEX idx_transfers_to_status,
+    DROP INDEX idx_transfers_to_created,
+    DROP INDEX idx_transfers_from_status,
+    DROP INDEX idx_transfers_from_created;
+
+ALTER TABLE donation_appointments
+    ADD INDEX hospital_id (hospital_id),
+    DROP INDEX idx_appointments_status,
+    DROP INDEX idx_appointments_time;
+
+ALTER TABLE donors
+    DROP INDEX idx_donors_phone,
+    DROP INDEX idx_donors_city;
+
+ALTER TABLE hospitals
+    DROP INDEX idx_hospitals_city;
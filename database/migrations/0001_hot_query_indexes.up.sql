@@ -0,0 +1,32 @@
+-- Covering indexes for the hot blood_bank_db queries in app.py and dashboard_service.py
+-- Each index lists the query it serves; explain_check.py verifies they are used.
+
+-- hospital_inventory: lot lookup (hospital_id, blood_group, expires_on) on add,
+-- per-hospital listing ORDER BY blood_group, expires_on, and the summary
+-- reconciliation aggregate (covered via units_available).
+ALTER TABLE hospital_inventory
+    ADD INDEX idx_inventory_lot (hospital_id, blood_group, expires_on, units_available);
+
+-- transfer_requests: incoming/outgoing Pending counts, the dashboard BUI
+-- aggregate (covered via blood_group, units_needed) and the keyset-paged
+-- incoming/outgoing lists on (created_at, request_id).
+ALTER TABLE transfer_requests
+    ADD INDEX idx_transfers_to_status (to_hospital, status, blood_group, units_needed),
+    ADD INDEX idx_transfers_to_created (to_hospital, created_at),
+    ADD INDEX idx_transfers_from_status (from_hospital, status),
+    ADD INDEX idx_transfers_from_created (from_hospital, created_at);
+
+-- donation_appointments: Pending count, today's count (range on
+-- preferred_time) and the keyset-paged appointment list.
+ALTER TABLE donation_appointments
+    ADD INDEX idx_appointments_status (hospital_id, status),
+    ADD INDEX idx_appointments_time (hospital_id, preferred_time);
+
+-- donors: returning-donor lookup by phone and rare donors by city.
+ALTER TABLE donors
+    ADD INDEX idx_donors_phone (phone),
+    ADD INDEX idx_donors_city (city);
+
+-- hospitals: city picker (DISTINCT city) and hospitals-in-city lookups.
+ALTER TABLE hospitals
+    ADD INDEX idx_hospitals_city (city, name);
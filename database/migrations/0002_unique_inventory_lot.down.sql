@@ -0,0 +1,4 @@
+-- Revert 0002_unique_inventory_lot (merged duplicate lots stay merged)
+
+ALTER TABLE hospital_inventory
+    DROP INDEX uq_inventory_lot;
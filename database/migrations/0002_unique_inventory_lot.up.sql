@@ -0,0 +1,27 @@
+-- One hospital_inventory row per lot: (hospital_id, blood_group, expires_on)
+-- Existing duplicate lots (left by the old SELECT-then-INSERT race) are folded
+-- into their lowest h_bag_id first. The summary triggers see the survivor's
+-- UPDATE and the duplicates' DELETEs, so inventory_summary totals are unchanged.
+
+UPDATE hospital_inventory hi
+JOIN (
+    SELECT MIN(h_bag_id) as keep_id, SUM(units_available) as total_units
+    FROM hospital_inventory
+    GROUP BY hospital_id, blood_group, expires_on
+    HAVING COUNT(*) > 1
+) dup ON hi.h_bag_id = dup.keep_id
+SET hi.units_available = dup.total_units;
+
+DELETE hi FROM hospital_inventory hi
+JOIN (
+    SELECT hospital_id, blood_group, expires_on, MIN(h_bag_id) as keep_id
+    FROM hospital_inventory
+    GROUP BY hospital_id, blood_group, expires_on
+    HAVING COUNT(*) > 1
+) dup ON hi.hospital_id = dup.hospital_id
+     AND hi.blood_group = dup.blood_group
+     AND hi.expires_on = dup.expires_on
+     AND hi.h_bag_id <> dup.keep_id;
+
+ALTER TABLE hospital_inventory
+    ADD UNIQUE KEY uq_inventory_lot (hospital_id, blood_group, expires_on);
@@ -0,0 +1,26 @@
+-- Revert 0003_fefo_transfer_allocation: restore the trigger from triggers.sql
+
+DROP TRIGGER IF EXISTS auto_transfer_inventory;
+
+DELIMITER $$
+CREATE TRIGGER auto_transfer_inventory
+AFTER UPDATE ON transfer_requests
+FOR EACH ROW
+BEGIN
+    IF NEW.status = 'Approved' AND OLD.status = 'Pending' THEN
+        UPDATE hospital_inventory 
+        SET units_available = units_available - NEW.units_needed
+        WHERE hospital_id = NEW.from_hospital 
+        AND blood_group = NEW.blood_group 
+        AND units_available >= NEW.units_needed;
+        
+        INSERT INTO hospital_inventory (hospital_id, blood_group, units_available, expires_on)
+        VALUES (NEW.to_hospital, NEW.blood_group, NEW.units_needed, DATE_ADD(CURDATE(), INTERVAL 90 DAY))
+        ON DUPLICATE KEY UPDATE units_available = units_available + NEW.units_needed;
+        
+        INSERT INTO logs (hospital_id, action_type, description) 
+        VALUES (NEW.from_hospital, 'TRANSFER_APPROVE', 
+                CONCAT('Transferred ', NEW.units_needed, ' units of ', NEW.blood_group, ' to hospital ID ', NEW.to_hospital));
+    END IF;
+END$$
+DELIMITER ;
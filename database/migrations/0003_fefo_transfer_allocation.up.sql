@@ -0,0 +1,6 @@
+-- Transfer approvals move stock through allocation_service.allocate_transfer
+-- (FEFO across all of the supplier's lots, one transaction). The old trigger
+-- decremented every matching lot with enough units from the requesting
+-- hospital and invented a 90-day expiry at the destination, so it must go.
+
+DROP TRIGGER IF EXISTS auto_transfer_inventory;
@@ -0,0 +1,41 @@
+-- Revert 0004_batch_emergency_fulfilment: restore the trigger from triggers_fixed.sql
+
+ALTER TABLE blood_inventory
+    DROP INDEX idx_bags_fefo;
+
+ALTER TABLE emergency_requests
+    DROP INDEX idx_emergency_pending;
+
+DROP TRIGGER IF EXISTS emergency_approval_trigger;
+
+DELIMITER $$
+CREATE TRIGGER emergency_approval_trigger
+AFTER UPDATE ON emergency_requests
+FOR EACH ROW
+BEGIN
+    DECLARE units_to_deduct INT;
+    DECLARE bags_updated INT DEFAULT 0;
+    
+    IF NEW.status = 'Approved' AND OLD.status = 'Pending' THEN
+        SET units_to_deduct = NEW.units_required;
+        
+        UPDATE blood_inventory 
+        SET status = 'Used' 
+        WHERE blood_group = NEW.blood_group 
+        AND status = 'Available' 
+        AND expires_on >= CURDATE()
+        ORDER BY expires_on ASC
+        LIMIT units_to_deduct;
+        
+        SET bags_updated = ROW_COUNT();
+        
+        INSERT INTO inventory_logs (related_id, action_type, details)
+        VALUES (NEW.request_id, 'EMERGENCY_APPROVAL', 
+                CONCAT('Emergency request approved - ', bags_updated, ' units of ', NEW.blood_group, ' deducted'));
+        
+        UPDATE emergency_requests 
+        SET approved_on = NOW() 
+        WHERE request_id = NEW.request_id;
+    END IF;
+END$$
+DELIMITER ;
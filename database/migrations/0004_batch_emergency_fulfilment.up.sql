@@ -0,0 +1,12 @@
+-- Emergency approvals move bags through emergency_service.fulfil_emergency_requests
+-- (batched, urgency then age, FEFO over available bags). The per-row trigger
+-- would mark a second set of bags Used for every approved request.
+
+DROP TRIGGER IF EXISTS emergency_approval_trigger;
+
+-- Pending queue in urgency/age order, and FEFO bag lookup per blood group
+ALTER TABLE emergency_requests
+    ADD INDEX idx_emergency_pending (status, urgency, requested_on);
+
+ALTER TABLE blood_inventory
+    ADD INDEX idx_bags_fefo (blood_group, status, expires_on);
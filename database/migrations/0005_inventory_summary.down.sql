@@ -0,0 +1,9 @@
+-- Revert 0005_inventory_summary. The summary triggers go with the table, or
+-- every hospital_inventory write would fail on the missing table.
+
+DROP TRIGGER IF EXISTS summary_inventory_insert;
+DROP TRIGGER IF EXISTS summary_inventory_update;
+DROP TRIGGER IF EXISTS summary_inventory_delete;
+DROP PROCEDURE IF EXISTS apply_inventory_delta;
+
+DROP TABLE IF EXISTS inventory_summary;
@@ -0,0 +1,24 @@
+-- inventory_summary: per-hospital, per-group totals of available units.
+-- Databases set up per the README already have it from
+-- inventory_summary_triggers.sql; this makes the migrations self-contained,
+-- since 0006 reinstalls the triggers that write it. The backfill recomputes
+-- every total from hospital_inventory, so it also repairs a pre-existing table.
+
+CREATE TABLE IF NOT EXISTS inventory_summary (
+    hospital_id INT NOT NULL,
+    blood_group ENUM('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-') NOT NULL,
+    total_units INT NOT NULL DEFAULT 0,
+    expiring_soon_units INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (hospital_id, blood_group),
+    FOREIGN KEY (hospital_id) REFERENCES hospitals(hospital_id) ON DELETE CASCADE
+);
+
+UPDATE inventory_summary SET total_units = 0 WHERE total_units <> 0;
+
+INSERT INTO inventory_summary (hospital_id, blood_group, total_units)
+SELECT hospital_id, blood_group, SUM(units_available)
+FROM hospital_inventory
+WHERE units_available > 0
+GROUP BY hospital_id, blood_group
+ON DUPLICATE KEY UPDATE total_units = VALUES(total_units);
@@ -0,0 +1,77 @@
+-- Revert 0006_expiry_scheduler: restore the trigger from triggers.sql and the
+-- summary triggers that keep expiring_soon_units themselves
+
+ALTER TABLE hospital_inventory
+    DROP INDEX idx_inventory_expiry;
+
+DROP TRIGGER IF EXISTS auto_expire_inventory;
+
+DELIMITER $$
+CREATE TRIGGER auto_expire_inventory
+BEFORE UPDATE ON hospital_inventory
+FOR EACH ROW
+BEGIN
+    IF NEW.expires_on < CURDATE() AND OLD.units_available > 0 THEN
+        SET NEW.units_available = 0;
+        INSERT INTO logs (hospital_id, action_type, description) 
+        VALUES (NEW.hospital_id, 'EXPIRY', CONCAT('Auto-expired ', OLD.units_available, ' units of ', NEW.blood_group));
+    END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS summary_inventory_insert;
+DROP TRIGGER IF EXISTS summary_inventory_update;
+DROP TRIGGER IF EXISTS summary_inventory_delete;
+DROP PROCEDURE IF EXISTS apply_inventory_delta;
+
+DELIMITER $$
+CREATE PROCEDURE apply_inventory_delta(
+    IN p_hospital_id INT,
+    IN p_blood_group VARCHAR(3),
+    IN p_units INT,
+    IN p_expiring INT
+)
+BEGIN
+    IF p_units <> 0 OR p_expiring <> 0 THEN
+        INSERT INTO inventory_summary (hospital_id, blood_group, total_units, expiring_soon_units)
+        VALUES (p_hospital_id, p_blood_group, p_units, p_expiring)
+        ON DUPLICATE KEY UPDATE
+            total_units = total_units + VALUES(total_units),
+            expiring_soon_units = expiring_soon_units + VALUES(expiring_soon_units);
+    END IF;
+END$$
+
+CREATE TRIGGER summary_inventory_insert
+AFTER INSERT ON hospital_inventory
+FOR EACH ROW
+BEGIN
+    IF NEW.units_available > 0 THEN
+        CALL apply_inventory_delta(NEW.hospital_id, NEW.blood_group, NEW.units_available,
+            IF(NEW.expires_on <= DATE_ADD(CURDATE(), INTERVAL 7 DAY), NEW.units_available, 0));
+    END IF;
+END$$
+
+CREATE TRIGGER summary_inventory_update
+AFTER UPDATE ON hospital_inventory
+FOR EACH ROW
+BEGIN
+    IF OLD.units_available > 0 THEN
+        CALL apply_inventory_delta(OLD.hospital_id, OLD.blood_group, -OLD.units_available,
+            IF(OLD.expires_on <= DATE_ADD(CURDATE(), INTERVAL 7 DAY), -OLD.units_available, 0));
+    END IF;
+    IF NEW.units_available > 0 THEN
+        CALL apply_inventory_delta(NEW.hospital_id, NEW.blood_group, NEW.units_available,
+            IF(NEW.expires_on <= DATE_ADD(CURDATE(), INTERVAL 7 DAY), NEW.units_available, 0));
+    END IF;
+END$$
+
+CREATE TRIGGER summary_inventory_delete
+AFTER DELETE ON hospital_inventory
+FOR EACH ROW
+BEGIN
+    IF OLD.units_available > 0 THEN
+        CALL apply_inventory_delta(OLD.hospital_id, OLD.blood_group, -OLD.units_available,
+            IF(OLD.expires_on <= DATE_ADD(CURDATE(), INTERVAL 7 DAY), -OLD.units_available, 0));
+    END IF;
+END$$
+DELIMITER ;
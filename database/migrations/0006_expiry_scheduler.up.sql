@@ -0,0 +1,62 @@
+-- Lot expiry moves to expiry_scheduler.py, which expires due lots in bounded
+-- batches. The BEFORE UPDATE trigger ran its check on every inventory write.
+
+DROP TRIGGER IF EXISTS auto_expire_inventory;
+
+-- Lets the scheduler load the upcoming-expiry window without a full scan
+ALTER TABLE hospital_inventory
+    ADD INDEX idx_inventory_expiry (expires_on);
+
+-- The scheduler publishes inventory_summary.expiring_soon_units after every
+-- sweep. Summary triggers installed before it also adjusted that column on
+-- each write; replace them with the totals-only versions from
+-- inventory_summary_triggers.sql so there is a single writer
+DROP TRIGGER IF EXISTS summary_inventory_insert;
+DROP TRIGGER IF EXISTS summary_inventory_update;
+DROP TRIGGER IF EXISTS summary_inventory_delete;
+DROP PROCEDURE IF EXISTS apply_inventory_delta;
+
+DELIMITER $$
+CREATE PROCEDURE apply_inventory_delta(
+    IN p_hospital_id INT,
+    IN p_blood_group VARCHAR(3),
+    IN p_units INT
+)
+BEGIN
+    IF p_units <> 0 THEN
+        INSERT INTO inventory_summary (hospital_id, blood_group, total_units)
+        VALUES (p_hospital_id, p_blood_group, p_units)
+        ON DUPLICATE KEY UPDATE total_units = total_units + VALUES(total_units);
+    END IF;
+END$$
+
+CREATE TRIGGER summary_inventory_insert
+AFTER INSERT ON hospital_inventory
+FOR EACH ROW
+BEGIN
+    IF NEW.units_available > 0 THEN
+        CALL apply_inventory_delta(NEW.hospital_id, NEW.blood_group, NEW.units_available);
+    END IF;
+END$$
+
+CREATE TRIGGER summary_inventory_update
+AFTER UPDATE ON hospital_inventory
+FOR EACH ROW
+BEGIN
+    IF OLD.units_available > 0 THEN
+        CALL apply_inventory_delta(OLD.hospital_id, OLD.blood_group, -OLD.units_available);
+    END IF;
+    IF NEW.units_available > 0 THEN
+        CALL apply_inventory_delta(NEW.hospital_id, NEW.blood_group, NEW.units_available);
+    END IF;
+END$$
+
+CREATE TRIGGER summary_inventory_delete
+AFTER DELETE ON hospital_inventory
+FOR EACH ROW
+BEGIN
+    IF OLD.units_available > 0 THEN
+        CALL apply_inventory_delta(OLD.hospital_id, OLD.blood_group, -OLD.units_available);
+    END IF;
+END$$
+DELIMITER ;
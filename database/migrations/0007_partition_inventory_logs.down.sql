@@ -0,0 +1,11 @@
+-- Merges all partitions back into one table. Months already archived by
+-- log_store.py stay in their JSONL exports.
+
+ALTER TABLE inventory_logs REMOVE PARTITIONING;
+
+ALTER TABLE inventory_logs
+    DROP INDEX idx_inventory_logs_action_created,
+    DROP INDEX idx_inventory_logs_created,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (log_id),
+    MODIFY created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP;
@@ -0,0 +1,24 @@
+-- inventory_logs grows without bound and every read is "newest first". Range
+-- partitioning by month lets created_at-bounded reads touch only the months
+-- in range and lets log_store.py archive a month by dropping its partition.
+-- Rows before October 2026 share p_history; log_store.py extend pre-creates
+-- the following months by splitting p_future.
+
+UPDATE inventory_logs SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL;
+
+-- Every unique key of a partitioned table must include the partition column
+ALTER TABLE inventory_logs
+    MODIFY created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (log_id, created_at),
+    ADD INDEX idx_inventory_logs_created (created_at),
+    ADD INDEX idx_inventory_logs_action_created (action_type, created_at);
+
+ALTER TABLE inventory_logs
+    PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+        PARTITION p_history VALUES LESS THAN (UNIX_TIMESTAMP('2026-10-01 00:00:00')),
+        PARTITION p202610 VALUES LESS THAN (UNIX_TIMESTAMP('2026-11-01 00:00:00')),
+        PARTITION p202611 VALUES LESS THAN (UNIX_TIMESTAMP('2026-12-01 00:00:00')),
+        PARTITION p202612 VALUES LESS THAN (UNIX_TIMESTAMP('2027-01-01 00:00:00')),
+        PARTITION p_future VALUES LESS THAN MAXVALUE
+    );
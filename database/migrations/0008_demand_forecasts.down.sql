@@ -0,0 +1,12 @@
+-- Revert 0008_demand_forecasts: hospital_inventory() falls back to the
+-- 5-unit threshold when no forecasts are stored
+
+DELETE FROM table_versions WHERE table_name = 'demand_forecasts';
+
+ALTER TABLE transfer_requests
+    DROP INDEX idx_transfer_status_created;
+
+ALTER TABLE emergency_requests
+    DROP INDEX idx_emergency_requested;
+
+DROP TABLE IF EXISTS demand_forecasts;
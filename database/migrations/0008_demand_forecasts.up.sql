@@ -0,0 +1,30 @@
+-- Stored demand forecasts per hospital and blood group, written by
+-- demand_forecast.py. hospital_inventory() reads them to judge stock by days
+-- of cover instead of the fixed 5-unit threshold.
+
+CREATE TABLE demand_forecasts (
+    hospital_id INT NOT NULL,
+    blood_group ENUM('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-') NOT NULL,
+    daily_units DECIMAL(9,3) NOT NULL,
+    horizon_units DECIMAL(10,3) NOT NULL,
+    alpha DECIMAL(4,3) NOT NULL,
+    gamma DECIMAL(4,3) NOT NULL,
+    active_days SMALLINT NOT NULL,
+    data_version VARCHAR(64) NOT NULL,
+    fitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (hospital_id, blood_group),
+    FOREIGN KEY (hospital_id) REFERENCES hospitals(hospital_id) ON DELETE CASCADE
+);
+
+-- The history scans and demand_forecast.data_version() are bounded by date;
+-- status is in both indexes so the version counts never read the rows
+ALTER TABLE emergency_requests
+    ADD INDEX idx_emergency_requested (requested_on, status);
+
+ALTER TABLE transfer_requests
+    ADD INDEX idx_transfer_status_created (status, created_at);
+
+-- demand_forecast.py bumps this once after each refit, which clears the
+-- app's cached forecasts
+INSERT IGNORE INTO table_versions (table_name)
+VALUES ('demand_forecasts');
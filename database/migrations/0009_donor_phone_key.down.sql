@@ -0,0 +1,8 @@
+-- Revert 0009_donor_phone_key (merged donors stay merged)
+
+ALTER TABLE donors
+    ADD INDEX idx_donors_phone (phone);
+
+ALTER TABLE donors
+    DROP INDEX uq_donors_phone_key,
+    DROP COLUMN phone_key;
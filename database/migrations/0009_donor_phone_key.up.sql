@@ -0,0 +1,14 @@
+-- Canonical phone per donor (E.164, e.g. +919845012345), written by the apps
+-- through donor_service.normalize_phone. The unique index makes the
+-- returning-donor lookup a single point read and stops formatting variants
+-- ("+91-98...", "098...") from creating duplicate donors.
+-- Existing donors start with NULL keys; run donor_service.py afterwards to
+-- merge duplicates and backfill the keys.
+
+ALTER TABLE donors
+    ADD COLUMN phone_key VARCHAR(16) NULL AFTER phone,
+    ADD UNIQUE KEY uq_donors_phone_key (phone_key);
+
+-- The raw-phone index from 0001 no longer serves any lookup
+ALTER TABLE donors
+    DROP INDEX idx_donors_phone;
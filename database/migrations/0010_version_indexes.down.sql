@@ -0,0 +1,9 @@
+-- Revert 0010_version_indexes
+
+ALTER TABLE inventory_summary
+    DROP INDEX idx_summary_updated,
+    MODIFY updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;
+
+ALTER TABLE hospitals
+    DROP INDEX idx_hospitals_updated,
+    DROP COLUMN updated_at;
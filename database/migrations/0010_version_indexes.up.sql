@@ -0,0 +1,12 @@
+-- Versions behind the API ETags and the reference cache (http_cache.py) are
+-- MAX(updated_at) of hospitals and inventory_summary. Indexed, that is one
+-- index lookup instead of a scan; microsecond precision keeps two writes in
+-- the same second from sharing a version.
+
+ALTER TABLE hospitals
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_hospitals_updated (updated_at);
+
+ALTER TABLE inventory_summary
+    MODIFY updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_summary_updated (updated_at);
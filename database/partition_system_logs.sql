@@ -0,0 +1,33 @@
+-- Monthly partitioning for an existing blood_network_db.system_logs
+-- (blood_network_schema.sql creates it partitioned on fresh installs).
+-- created_at-bounded reads touch only the months in range, and log_store.py
+-- archives old months by exporting and dropping their partitions. Partitioned
+-- InnoDB tables cannot have foreign keys, so hospital_id becomes a plain
+-- indexed column: logs of a deleted hospital keep its id and show as System.
+-- Afterwards run `python log_store.py --database blood_network_db extend`
+-- monthly (cron) so upcoming months get their own partitions.
+
+USE blood_network_db;
+
+ALTER TABLE system_logs DROP FOREIGN KEY system_logs_ibfk_1;
+
+UPDATE system_logs SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL;
+
+-- Every unique key of a partitioned table must include the partition column
+ALTER TABLE system_logs
+    MODIFY created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (log_id, created_at),
+    DROP INDEX idx_action_type,
+    DROP INDEX hospital_id,
+    ADD INDEX idx_logs_action_created (action_type, created_at),
+    ADD INDEX idx_logs_hospital_created (hospital_id, created_at);
+
+ALTER TABLE system_logs
+    PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+        PARTITION p_history VALUES LESS THAN (UNIX_TIMESTAMP('2026-10-01 00:00:00')),
+        PARTITION p202610 VALUES LESS THAN (UNIX_TIMESTAMP('2026-11-01 00:00:00')),
+        PARTITION p202611 VALUES LESS THAN (UNIX_TIMESTAMP('2026-12-01 00:00:00')),
+        PARTITION p202612 VALUES LESS THAN (UNIX_TIMESTAMP('2027-01-01 00:00:00')),
+        PARTITION p_future VALUES LESS THAN MAXVALUE
+    );
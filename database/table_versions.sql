@@ -0,0 +1,23 @@
+-- Table versions for blood_bank_db
+-- The versions behind the HTTP ETags on /get_hospitals/<city> and the
+-- reference cache keys are derived from the data itself (http_cache.py:
+-- fingerprints of hospitals and inventory_summary). table_versions only holds
+-- counters for tables written by batch jobs, which bump them once per run.
+
+USE blood_bank_db;
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0
+);
+
+-- Per-row version triggers from earlier releases: every hospital and
+-- inventory write queued on the same counter row
+DROP TRIGGER IF EXISTS version_hospitals_insert;
+DROP TRIGGER IF EXISTS version_hospitals_update;
+DROP TRIGGER IF EXISTS version_hospitals_delete;
+DROP TRIGGER IF EXISTS version_inventory_insert;
+DROP TRIGGER IF EXISTS version_inventory_update;
+DROP TRIGGER IF EXISTS version_inventory_delete;
+DELETE FROM table_versions WHERE table_name IN ('hospitals', 'hospital_inventory');
+DROP PROCEDURE IF EXISTS bump_table_version;
@@ -0,0 +1,325 @@
+"""
+Shared MySQL connection pool used by every app variant
+Connections are borrowed with pool.connection() and returned with conn.close()
+Request handlers can instead use get_db()/get_cursor(), which keep one
+connection per request on flask.g and release it in a teardown hook.
+Handlers that manage their own connection borrow it with borrow_connection(),
+so the same hook returns it if the handler exits without closing it.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import Error
+from flask import current_app, g
+
+# Default pool settings, overridden per app through POOL_CONFIG
+DEFAULT_POOL_CONFIG = {
+    'pool_size': 5,            # connections kept open while idle
+    'max_overflow': 10,        # extra connections opened under burst load
+    'timeout': 10,             # seconds to wait for a free connection
+    'pre_ping': True,          # health-check idle connections on borrow
+    'ping_interval': 30,       # only ping connections idle longer than this
+    'max_lifetime': 1800,      # recycle connections older than this (seconds)
+    'stats_window': 60         # seconds of history for checkouts/sec
+}
+
+
+class PoolTimeout(Error):
+    """Raised when no connection becomes free within the pool timeout"""
+
+
+class PooledConnection:
+    """Proxy around a raw connection; close() hands it back to the pool"""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+        self._lease = 0          # bumped on every borrow
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, instrument=True, **kwargs):
+        cursor = self._raw.cursor(*args, **kwargs)
+        monitor = self._pool.monitor
+        return monitor.wrap(cursor) if instrument and monitor is not None else cursor
+
+    def invalidate(self):
+        """Drop this connection instead of returning it to the pool"""
+        if not self._released:
+            self._released = True
+            self._pool._release(self, discard=True)
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool._release(self)
+
+
+class ConnectionPool:
+    """Bounded pool of MySQL connections with overflow and recycling"""
+
+    def __init__(self, db_config, **options):
+        config = dict(DEFAULT_POOL_CONFIG)
+        unknown = set(options) - set(config)
+        if unknown:
+            raise ValueError(f"Unknown pool option(s): {', '.join(sorted(unknown))}")
+        config.update(options)
+
+        self.db_config = dict(db_config)
+        self.pool_size = config['pool_size']
+        self.max_overflow = config['max_overflow']
+        self.timeout = config['timeout']
+        self.pre_ping = config['pre_ping']
+        self.ping_interval = config['ping_interval']
+        self.max_lifetime = config['max_lifetime']
+        self.stats_window = config['stats_window']
+
+        # Optional query_stats.QueryMonitor; wraps every cursor handed out
+        self.monitor = None
+
+        self._idle = deque()
+        self._open = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+        # Statistics
+        self._started = time.monotonic()
+        self._checkouts = 0
+        self._recent_checkouts = deque()
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._recycled = 0
+        self._failed_pings = 0
+
+    def _connect(self):
+        return mysql.connector.connect(**self.db_config)
+
+    def _is_expired(self, conn, now):
+        return self.max_lifetime and now - conn.created_at > self.max_lifetime
+
+    def _is_healthy(self, conn, now):
+        if not self.pre_ping or now - conn.last_used < self.ping_interval:
+            return True
+        try:
+            conn._raw.ping(reconnect=False)
+            return True
+        except Error:
+            self._failed_pings += 1
+            return False
+
+    def _close_raw(self, conn):
+        try:
+            conn._raw.close()
+        except Error:
+            pass
+
+    def connection(self, timeout=None):
+        """Borrow a connection, opening a new one or waiting up to timeout seconds if the pool is busy"""
+        start = time.monotonic()
+        timeout = self.timeout if timeout is None else timeout
+        deadline = start + timeout
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.pool_size + self.max_overflow:
+                    conn = None
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(msg=f"No database connection available after {timeout}s")
+                self._cond.wait(remaining)
+            self._in_use += 1
+
+        try:
+            now = time.monotonic()
+            if conn is not None and (self._is_expired(conn, now) or not self._is_healthy(conn, now)):
+                self._recycled += 1
+                self._close_raw(conn)
+                conn = None
+            if conn is None:
+                conn = PooledConnection(self, self._connect())
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        # Bump the lease before marking it borrowed, so a teardown holding the
+        # previous lease never releases it from under its new borrower
+        conn._lease += 1
+        conn._released = False
+        self._record_checkout(start)
+        return conn
+
+    def _record_checkout(self, start):
+        now = time.monotonic()
+        waited = now - start
+        with self._cond:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._recent_checkouts.append(now)
+            cutoff = now - self.stats_window
+            while self._recent_checkouts and self._recent_checkouts[0] < cutoff:
+                self._recent_checkouts.popleft()
+
+    def _release(self, conn, discard=False):
+        if not discard:
+            try:
+                if not conn._raw.is_connected():
+                    discard = True
+                elif conn._raw.in_transaction:
+                    # Never hand an open transaction to the next borrower
+                    conn._raw.rollback()
+            except Error:
+                discard = True
+
+        now = time.monotonic()
+        if not discard and self._is_expired(conn, now):
+            discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or len(self._idle) >= self.pool_size:
+                self._open -= 1
+                if discard:
+                    self._recycled += 1
+            else:
+                conn.last_used = now
+                self._idle.append(conn)
+                conn = None
+            self._cond.notify()
+
+        if conn is not None:
+            self._close_raw(conn)
+
+    def dispose(self):
+        """Close every idle connection; borrowed ones close when returned"""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+        for conn in idle:
+            self._close_raw(conn)
+
+    def stats(self):
+        """Snapshot of pool usage for sizing the pool per worker"""
+        now = time.monotonic()
+        with self._cond:
+            cutoff = now - self.stats_window
+            recent = sum(1 for t in self._recent_checkouts if t >= cutoff)
+            window = min(self.stats_window, now - self._started) or 1
+            return {
+                'pool_size': self.pool_size,
+                'max_overflow': self.max_overflow,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'overflow_in_use': max(0, self._open - self.pool_size),
+                'checkouts': self._checkouts,
+                'checkouts_per_sec': round(recent / window, 3),
+                'avg_wait_ms': round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                'max_wait_ms': round(self._wait_max * 1000, 3),
+                'timeouts': self._timeouts,
+                'recycled': self._recycled,
+                'failed_pings': self._failed_pings
+            }
+
+
+# ==================== REQUEST-SCOPED ACCESS ====================
+
+def init_app(app, pool):
+    """Attach a pool to the app and release request connections on teardown"""
+    app.extensions['db_pool'] = pool
+    app.teardown_appcontext(_release_request_db)
+
+
+def get_db():
+    """Connection for the current request, borrowed lazily on first use"""
+    if 'db_conn' not in g:
+        g.db_conn = current_app.extensions['db_pool'].connection()
+        g.db_cursors = {}
+        g.db_tx_depth = 0
+    return g.db_conn
+
+
+def get_cursor(dictionary=False):
+    """Buffered cursor reused by every query in the current request"""
+    conn = get_db()
+    cursor = g.db_cursors.get(dictionary)
+    if cursor is None:
+        cursor = conn.cursor(dictionary=dictionary, buffered=True)
+        g.db_cursors[dictionary] = cursor
+    return cursor
+
+
+@contextmanager
+def transaction(dictionary=False):
+    """Commit once when the outermost block exits, roll back on any error"""
+    conn = get_db()
+    if g.db_tx_depth == 0 and conn.autocommit:
+        conn.start_transaction()
+    g.db_tx_depth += 1
+    try:
+        yield get_cursor(dictionary=dictionary)
+    except Exception:
+        g.db_tx_depth -= 1
+        if g.db_tx_depth == 0:
+            conn.rollback()
+        raise
+    g.db_tx_depth -= 1
+    if g.db_tx_depth == 0:
+        conn.commit()
+
+
+def borrow_connection():
+    """Pool connection for a handler that closes it itself.
+
+    If the handler returns or raises before conn.close(), the teardown hook
+    hands the connection back, so a missed close cannot pin a pool slot.
+    """
+    conn = current_app.extensions['db_pool'].connection()
+    g.setdefault('db_borrowed', []).append((conn, conn._lease))
+    return conn
+
+
+def _release_borrowed(exc):
+    for conn, lease in g.pop('db_borrowed', []):
+        if conn._released or conn._lease != lease:
+            continue
+        if isinstance(exc, Error):
+            conn.invalidate()
+        else:
+            conn.close()
+
+
+def _release_request_db(exc):
+    _release_borrowed(exc)
+    conn = g.pop('db_conn', None)
+    if conn is None:
+        return
+    for cursor in g.pop('db_cursors', {}).values():
+        try:
+            cursor.close()
+        except Error:
+            pass
+    g.pop('db_tx_depth', None)
+    if isinstance(exc, Error):
+        # The connection may be mid-protocol or poisoned; don't reuse it
+        conn.invalidate()
+    else:
+        conn.close()
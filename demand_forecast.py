@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Demand forecasting per hospital and blood group
+Streams the last HISTORY_DAYS days of draws on each hospital's stock as daily
+unit totals per (hospital, blood group): emergency requests raised at the
+hospital and approved transfers it supplied. All series are fitted together
+with additive weekly-seasonal exponential smoothing on NumPy arrays, one row
+per series and one column per day. Each series gets its own alpha / gamma
+from a small grid, chosen by one-step-ahead error. Forecasts are stored in
+demand_forecasts (migration 0008), and hospital_inventory() turns them into
+days of cover. A refit runs only when the history, or the date, has moved
+since the stored forecasts were made:
+    python demand_forecast.py                    # refit whenever new history arrives
+    python demand_forecast.py --once             # one refit if anything changed (cron)
+    python demand_forecast.py --once --force     # refit regardless
+"""
+
+import argparse
+import sys
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import date
+
+import mysql.connector
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+HISTORY_DAYS = 182
+SEASON_DAYS = 7
+HORIZON_DAYS = 7
+
+# Smoothing grid searched per series: level (alpha) and day-of-week (gamma) weights
+ALPHAS = (0.02, 0.05, 0.1, 0.2, 0.4)
+GAMMAS = (0.05, 0.15, 0.3)
+
+# Stock is low when it covers fewer days of forecast demand than this
+LOW_COVER_DAYS = 3
+
+# Without a forecast, lots under this many units are low (the old fixed threshold)
+LOW_STOCK_UNITS = 5
+
+# Forecasts under this many units a day count as no regular demand
+MIN_DAILY_UNITS = 0.05
+
+STREAM_BATCH = 5000
+WRITE_BATCH = 1000
+
+# History that draws units out of a hospital's stock, as (hospital_id,
+# blood_group, days_ago, units) for days_ago 1..history_days
+FORECAST_SCHEMAS = {
+    'blood_bank_db': {
+        'history_sql': (
+            """
+            SELECT hospital_id, blood_group, DATEDIFF(CURDATE(), DATE(requested_on)), SUM(units_required)
+            FROM emergency_requests
+            WHERE hospital_id IS NOT NULL AND status <> 'Rejected'
+              AND requested_on >= CURDATE() - INTERVAL %(days)s DAY AND requested_on < CURDATE()
+            GROUP BY hospital_id, blood_group, DATE(requested_on)
+            """,
+            """
+            SELECT to_hospital, blood_group, DATEDIFF(CURDATE(), DATE(created_at)), SUM(units_needed)
+            FROM transfer_requests
+            WHERE status = 'Approved'
+              AND created_at >= CURDATE() - INTERVAL %(days)s DAY AND created_at < CURDATE()
+            GROUP BY to_hospital, blood_group, DATE(created_at)
+            """
+        ),
+        # Changes when a request is raised, or moves into or out of the
+        # statuses the history counts; both counts are index-only scans
+        'version_sql': """
+            SELECT CONCAT_WS(':',
+                (SELECT COALESCE(MAX(request_id), 0) FROM emergency_requests),
+                (SELECT COUNT(*) FROM emergency_requests
+                 WHERE requested_on >= CURDATE() - INTERVAL %(days)s DAY AND status = 'Rejected'),
+                (SELECT COALESCE(MAX(request_id), 0) FROM transfer_requests),
+                (SELECT COUNT(*) FROM transfer_requests
+                 WHERE status = 'Approved' AND created_at >= CURDATE() - INTERVAL %(days)s DAY))
+        """
+    }
+}
+
+
+def fit_forecasts(history, season=SEASON_DAYS, horizon=HORIZON_DAYS, alphas=ALPHAS, gammas=GAMMAS):
+    """Additive seasonal exponential smoothing over every row of history at once.
+
+    history is (series, days) daily units, oldest day first. Returns
+    (daily, horizon_total, alpha, gamma) arrays: the mean daily forecast and
+    total over the next horizon days, and the parameters picked per series.
+    """
+    history = np.asarray(history, dtype=np.float64)
+    series, days = history.shape
+    if days < 2 * season:
+        raise ValueError(f"Need at least {2 * season} days of history")
+    rows = np.arange(series)
+    best_sse = np.full(series, np.inf)
+    best_level = np.zeros(series)
+    best_seasonal = np.zeros((series, season))
+    best_alpha = np.zeros(series)
+    best_gamma = np.zeros(series)
+
+    for alpha in alphas:
+        for gamma in gammas:
+            level = history[:, :season].mean(axis=1)
+            seasonal = history[:, :season] - level[:, None]
+            sse = np.zeros(series)
+            for t in range(season, days):
+                s = seasonal[:, t % season]
+                error = history[:, t] - level - s
+                sse += error * error
+                level = level + alpha * error
+                seasonal[:, t % season] = s + gamma * (1 - alpha) * error
+            better = sse < best_sse
+            best_sse[better] = sse[better]
+            best_level[better] = level[better]
+            best_seasonal[better] = seasonal[better]
+            best_alpha[better] = alpha
+            best_gamma[better] = gamma
+
+    upcoming = (days + np.arange(horizon)) % season
+    forecast = np.clip(best_level[:, None] + best_seasonal[rows[:, None], upcoming[None, :]], 0, None)
+    total = forecast.sum(axis=1)
+    return total / horizon, total, best_alpha, best_gamma
+
+
+def days_of_cover(units, daily_units):
+    """Days the units last at the forecast rate; None when there is no regular demand"""
+    if daily_units is None or daily_units < MIN_DAILY_UNITS:
+        return None
+    return units / daily_units
+
+
+def is_low_stock(group_units, daily_units, lot_units):
+    """Low on days of cover when the group has a forecast, else on the fixed lot threshold"""
+    if daily_units is None:
+        return lot_units < LOW_STOCK_UNITS
+    cover = days_of_cover(group_units, daily_units)
+    return cover is not None and cover < LOW_COVER_DAYS
+
+
+def load_forecasts(cursor, hospital_id):
+    """blood_group -> forecast daily units for one hospital (a primary-key range read)"""
+    cursor.execute("""
+        SELECT blood_group, daily_units
+        FROM demand_forecasts
+        WHERE hospital_id = %s
+    """, (hospital_id,))
+    return {row[0]: float(row[1]) for row in cursor.fetchall()}
+
+
+@dataclass
+class ForecastRun:
+    series: int = 0
+    history_rows: int = 0
+    load_ms: float = 0.0
+    fit_ms: float = 0.0
+    write_ms: float = 0.0
+    data_version: str = ''
+
+
+class DemandForecaster:
+    """Batch refit of every hospital x blood group demand series for one database"""
+
+    def __init__(self, database='blood_bank_db', history_days=HISTORY_DAYS, refresh_interval=300, db_config=None):
+        if np is None:
+            raise RuntimeError("DemandForecaster needs numpy")
+        self.database = database
+        self.schema = FORECAST_SCHEMAS[database]
+        self.history_days = history_days
+        self.refresh_interval = refresh_interval
+        self.db_config = dict(db_config or DB_CONFIG, database=database)
+        self._stop = threading.Event()
+        self.last_run = None
+
+    def _connect(self):
+        return mysql.connector.connect(**self.db_config)
+
+    # Change detection
+
+    def data_version(self, cursor):
+        """Today's date plus a fingerprint of the history; forecasts made under the same version are current"""
+        cursor.execute(self.schema['version_sql'], {'days': self.history_days})
+        return f"{date.today().isoformat()}:{cursor.fetchone()[0]}"
+
+    def stored_version(self, cursor):
+        cursor.execute("SELECT data_version FROM demand_forecasts LIMIT 1")
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    # Loading
+
+    def load_history(self, conn):
+        """(series keys, history array), streaming the aggregated rows in batches"""
+        index = {}
+        series, days, units = array('l'), array('l'), array('d')
+        rows = 0
+        for sql in self.schema['history_sql']:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, {'days': self.history_days})
+                while True:
+                    batch = cursor.fetchmany(STREAM_BATCH)
+                    if not batch:
+                        break
+                    rows += len(batch)
+                    for hospital_id, blood_group, days_ago, total in batch:
+                        key = (hospital_id, blood_group)
+                        position = index.get(key)
+                        if position is None:
+                            position = index[key] = len(index)
+                        series.append(position)
+                        days.append(self.history_days - days_ago)
+                        units.append(float(total))
+            finally:
+                cursor.close()
+        history = np.zeros((len(index), self.history_days))
+        if index:
+            np.add.at(history, (np.asarray(series), np.asarray(days)), np.asarray(units))
+        return list(index), history, rows
+
+    # Storing
+
+    def store(self, conn, keys, daily, total, alpha, gamma, active_days, version):
+        """Replace the stored forecasts in one transaction and bump their version counter"""
+        cursor = conn.cursor()
+        try:
+            conn.start_transaction()
+            rows = [(hospital_id, blood_group, round(float(d), 3), round(float(t), 3), float(a), float(g), int(n),
+                     version)
+                    for (hospital_id, blood_group), d, t, a, g, n in zip(keys, daily, total, alpha, gamma, active_days)]
+            for start in range(0, len(rows), WRITE_BATCH):
+                chunk = rows[start:start + WRITE_BATCH]
+                cursor.execute(f"""
+                    REPLACE INTO demand_forecasts
+                        (hospital_id, blood_group, daily_units, horizon_units, alpha, gamma, active_days, data_version)
+                    VALUES {', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s)'] * len(chunk))}
+                """, [value for row in chunk for value in row])
+            # Series with no draws left in the window
+            cursor.execute("DELETE FROM demand_forecasts WHERE data_version <> %s", (version,))
+            cursor.execute("""
+                INSERT INTO table_versions (table_name, version) VALUES ('demand_forecasts', 1)
+                ON DUPLICATE KEY UPDATE version = version + 1
+            """)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    # Running
+
+    def run_once(self, conn=None, force=False):
+        """Refit and store everything if the history changed; returns the ForecastRun or None"""
+        own = conn is None
+        conn = conn or self._connect()
+        try:
+            cursor = conn.cursor(buffered=True)
+            try:
+                version = self.data_version(cursor)
+                if not force and version == self.stored_version(cursor):
+                    return None
+            finally:
+                cursor.close()
+
+            run = ForecastRun(data_version=version)
+            start = time.perf_counter()
+            keys, history, run.history_rows = self.load_history(conn)
+            run.load_ms = (time.perf_counter() - start) * 1000
+            run.series = len(keys)
+
+            start = time.perf_counter()
+            if keys:
+                daily, total, alpha, gamma = fit_forecasts(history)
+            else:
+                daily = total = alpha = gamma = np.zeros(0)
+            run.fit_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            self.store(conn, keys, daily, total, alpha, gamma, (history > 0).sum(axis=1), version)
+            run.write_ms = (time.perf_counter() - start) * 1000
+            self.last_run = run
+            return run
+        finally:
+            if own:
+                conn.close()
+
+    def run(self):
+        """Loop until stop(): check for new history every refresh_interval seconds"""
+        conn = self._connect()
+        try:
+            while not self._stop.is_set():
+                if not conn.is_connected():
+                    conn.reconnect(attempts=3, delay=1)
+                self.run_once(conn)
+                if self._stop.wait(self.refresh_interval):
+                    break
+        finally:
+            conn.close()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', choices=sorted(FORECAST_SCHEMAS), default='blood_bank_db')
+    parser.add_argument('--history-days', type=int, default=HISTORY_DAYS)
+    parser.add_argument('--refresh-interval', type=int, default=300, help='seconds between checks for new history')
+    parser.add_argument('--once', action='store_true', help='refit once if anything changed, then exit')
+    parser.add_argument('--force', action='store_true', help='refit even if the history has not changed')
+    args = parser.parse_args()
+
+    if not HAVE_NUMPY:
+        print("❌ numpy is not installed (pip install numpy)")
+        return 1
+
+    forecaster = DemandForecaster(args.database, args.history_days, args.refresh_interval)
+    if args.once:
+        run = forecaster.run_once(force=args.force)
+        if run is None:
+            print("✅ Forecasts are current; nothing new since the last refit")
+        else:
+            print(f"✅ Refitted {run.series} series from {run.history_rows} history rows "
+                  f"(load {run.load_ms:.0f} ms, fit {run.fit_ms:.0f} ms, write {run.write_ms:.0f} ms)")
+        return 0
+
+    print(f"📈 Demand forecaster running for {args.database} (Ctrl+C to stop)")
+    try:
+        forecaster.run()
+    except KeyboardInterrupt:
+        forecaster.stop()
+    print("✅ Stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Donor identity by normalised phone number
+normalize_phone() turns whatever a donor typed ("+91-98450 12345",
+"098450 12345", "9845012345") into one canonical E.164 string
+("+919845012345"). The apps store it in donors.phone_key (unique index,
+migration 0009) and find returning donors with a single point read on it.
+
+The one-off dedup job folds donors that share a canonical phone into one
+survivor. It streams donors in donor_id order, then merges duplicates in
+batches: appointments, rare-donor rows and other references are re-pointed
+onto the survivor, the survivor keeps the latest donation date, and the
+duplicates are deleted. Survivors get their phone_key backfilled. Re-running
+it is safe; run it once right after the migration:
+    python donor_service.py --database blood_bank_db --dry-run
+    python donor_service.py --database blood_bank_db
+    python donor_service.py --database blood_network_db --batch-size 500
+"""
+
+import argparse
+import re
+import sys
+import time
+from dataclasses import dataclass
+
+import mysql.connector
+from mysql.connector import errorcode
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+# Numbers typed without a country code are Indian
+DEFAULT_COUNTRY_CODE = '91'
+NATIONAL_DIGITS = 10
+
+# E.164 allows at most 15 digits after the '+'
+MIN_PHONE_DIGITS = 8
+MAX_PHONE_DIGITS = 15
+
+# Donors read per keyset batch, and duplicates merged per transaction
+SCAN_BATCH = 5000
+MERGE_BATCH = 500
+
+NON_DIGITS = re.compile(r'\D')
+
+# Tables holding donor_id references, the rare-donor flag table (one row kept
+# per survivor) and the goodwill column pooled onto the survivor, where the
+# schema has them
+DEDUP_SCHEMAS = {
+    'blood_bank_db': {
+        'references': ('donation_appointments', 'blood_inventory'),
+        'rare_table': 'rare_donors',
+        'goodwill_column': 'goodwill_score'
+    },
+    'blood_network_db': {
+        'references': ('donation_appointments',),
+        'rare_table': None,
+        'goodwill_column': None
+    }
+}
+
+
+def normalize_phone(phone):
+    """Canonical E.164 form of a phone number, or None if it is not one"""
+    if not phone:
+        return None
+    phone = phone.strip()
+    digits = NON_DIGITS.sub('', phone)
+    if phone.startswith('+'):
+        international = digits
+    elif digits.startswith('00'):
+        international = digits[2:]
+    elif len(digits) == NATIONAL_DIGITS:
+        international = DEFAULT_COUNTRY_CODE + digits
+    elif len(digits) == NATIONAL_DIGITS + 1 and digits.startswith('0'):
+        international = DEFAULT_COUNTRY_CODE + digits[1:]
+    elif len(digits) == NATIONAL_DIGITS + len(DEFAULT_COUNTRY_CODE) and digits.startswith(DEFAULT_COUNTRY_CODE):
+        international = digits
+    else:
+        return None
+    # "+91 0984..." keeps the national trunk prefix after the country code
+    if (international.startswith(DEFAULT_COUNTRY_CODE + '0')
+            and len(international) == len(DEFAULT_COUNTRY_CODE) + NATIONAL_DIGITS + 1):
+        international = DEFAULT_COUNTRY_CODE + international[len(DEFAULT_COUNTRY_CODE) + 1:]
+    if not MIN_PHONE_DIGITS <= len(international) <= MAX_PHONE_DIGITS or international.startswith('0'):
+        return None
+    return '+' + international
+
+
+def is_duplicate_phone(error):
+    """True when the unique phone_key index rejected a donor insert"""
+    return error.errno == errorcode.ER_DUP_ENTRY and 'uq_donors_phone_key' in str(error)
+
+
+def find_donor(cursor, phone_key, columns='donor_id', lock=False):
+    """The donor row holding phone_key, or None.
+
+    lock=True takes a shared lock, which reads the latest committed row even
+    when the transaction's snapshot is older than it.
+    """
+    cursor.execute(f"SELECT {columns} FROM donors WHERE phone_key = %s{' FOR SHARE' if lock else ''}",
+                   (phone_key,))
+    return cursor.fetchone()
+
+
+def register_donor(cursor, phone_key, insert_sql, params, columns='donor_id'):
+    """(donor_id, row) for the donor holding phone_key, inserting one if new.
+
+    row holds `columns` (donor_id first) for a returning donor and is None
+    when insert_sql, which must write phone_key, just created the donor. Two
+    first bookings for one number can both miss the read; the later insert
+    hits the unique index and takes the committed winner instead of failing.
+    """
+    row = find_donor(cursor, phone_key, columns)
+    if row is None:
+        try:
+            cursor.execute(insert_sql, params)
+            return cursor.lastrowid, None
+        except mysql.connector.IntegrityError as e:
+            if not is_duplicate_phone(e):
+                raise
+            row = find_donor(cursor, phone_key, columns, lock=True)
+    return row[0], row
+
+
+@dataclass
+class DedupResult:
+    scanned: int = 0
+    unparseable: int = 0
+    duplicates: int = 0
+    merged: int = 0
+    backfilled: int = 0
+    seconds: float = 0.0
+
+
+def _case_map(column, mapping):
+    """CASE expression mapping old column values to new ones, with its parameters"""
+    sql = f"CASE {column} " + ' '.join(['WHEN %s THEN %s'] * len(mapping)) + " END"
+    return sql, [value for pair in mapping.items() for value in pair]
+
+
+def find_duplicates(conn, scan_batch=SCAN_BATCH, result=None):
+    """Stream donors in donor_id order and group them by canonical phone.
+
+    Returns (merges, backfill): merges maps each duplicate donor_id to its
+    survivor, backfill maps survivor donor_ids to the phone_key they still
+    need. A donor already holding a phone_key is the survivor for it, so the
+    donor the apps currently find stays the one they find; otherwise the
+    oldest donor_id survives.
+    """
+    result = result or DedupResult()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT phone_key, donor_id FROM donors WHERE phone_key IS NOT NULL")
+        survivors = dict(cursor.fetchall())
+        merges, backfill = {}, {}
+        last_id = 0
+        while True:
+            cursor.execute("""
+                SELECT donor_id, phone, phone_key FROM donors
+                WHERE donor_id > %s
+                ORDER BY donor_id
+                LIMIT %s
+            """, (last_id, scan_batch))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            result.scanned += len(rows)
+            for donor_id, phone, phone_key in rows:
+                key = phone_key or normalize_phone(phone)
+                if key is None:
+                    result.unparseable += 1
+                    continue
+                survivor = survivors.setdefault(key, donor_id)
+                if survivor != donor_id:
+                    merges[donor_id] = survivor
+                elif phone_key is None:
+                    backfill[donor_id] = key
+        result.duplicates = len(merges)
+        return merges, backfill
+    finally:
+        cursor.close()
+
+
+def _merge_rare_flags(cursor, table, merges):
+    """One rare-donor row per survivor: its own if it has one, else its first duplicate's"""
+    candidates = list(merges) + sorted(set(merges.values()))
+    cursor.execute(f"SELECT DISTINCT donor_id FROM {table} WHERE donor_id IN ({', '.join(['%s'] * len(candidates))})",
+                   candidates)
+    flagged = {row[0] for row in cursor.fetchall()}
+    carried, dropped = {}, []
+    for duplicate in sorted(merges):
+        if duplicate not in flagged:
+            continue
+        survivor = merges[duplicate]
+        if survivor in flagged:
+            dropped.append(duplicate)
+        else:
+            carried[duplicate] = survivor
+            flagged.add(survivor)
+    if dropped:
+        cursor.execute(f"DELETE FROM {table} WHERE donor_id IN ({', '.join(['%s'] * len(dropped))})", dropped)
+    if carried:
+        carry_sql, carry_params = _case_map('donor_id', carried)
+        cursor.execute(f"""
+            UPDATE {table} SET donor_id = {carry_sql}
+            WHERE donor_id IN ({', '.join(['%s'] * len(carried))})
+        """, carry_params + list(carried))
+
+
+def merge_batch(conn, database, merges):
+    """Fold one batch of duplicate -> survivor donors in a single transaction"""
+    schema = DEDUP_SCHEMAS[database]
+    duplicates = list(merges)
+    survivors = sorted(set(merges.values()))
+    in_duplicates = ', '.join(['%s'] * len(duplicates))
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        # Lock both sides so a booking cannot land on a donor being deleted
+        goodwill = schema['goodwill_column']
+        cursor.execute(f"""
+            SELECT donor_id, last_donation_date, {goodwill or 0} FROM donors
+            WHERE donor_id IN ({', '.join(['%s'] * (len(duplicates) + len(survivors)))})
+            FOR UPDATE
+        """, duplicates + survivors)
+        profiles = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        repoint_sql, repoint_params = _case_map('donor_id', merges)
+        for table in schema['references']:
+            cursor.execute(f"UPDATE {table} SET donor_id = {repoint_sql} WHERE donor_id IN ({in_duplicates})",
+                           repoint_params + duplicates)
+
+        if schema['rare_table']:
+            _merge_rare_flags(cursor, schema['rare_table'], merges)
+
+        # Survivors keep the latest donation date (the 90-day rule) and pooled goodwill
+        folded = {}
+        for duplicate, survivor in merges.items():
+            if duplicate not in profiles or survivor not in profiles:
+                continue
+            latest, total = folded.get(survivor, profiles[survivor])
+            last_donation, score = profiles[duplicate]
+            if last_donation is not None and (latest is None or last_donation > latest):
+                latest = last_donation
+            folded[survivor] = (latest, (total or 0) + (score or 0))
+        if goodwill:
+            cursor.executemany(f"UPDATE donors SET last_donation_date = %s, {goodwill} = %s WHERE donor_id = %s",
+                               [(latest, total, survivor) for survivor, (latest, total) in folded.items()])
+        else:
+            cursor.executemany("UPDATE donors SET last_donation_date = %s WHERE donor_id = %s",
+                               [(latest, survivor) for survivor, (latest, _) in folded.items()])
+
+        cursor.execute(f"DELETE FROM donors WHERE donor_id IN ({in_duplicates})", duplicates)
+        merged = cursor.rowcount
+        conn.commit()
+        return merged
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def backfill_batch(conn, keys):
+    """Write phone_key for one batch of survivors"""
+    key_sql, key_params = _case_map('donor_id', keys)
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        cursor.execute(f"UPDATE donors SET phone_key = {key_sql} WHERE donor_id IN ({', '.join(['%s'] * len(keys))})",
+                       key_params + list(keys))
+        conn.commit()
+        return len(keys)
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def _batches(mapping, size):
+    items = sorted(mapping.items())
+    for start in range(0, len(items), size):
+        yield dict(items[start:start + size])
+
+
+def dedup_donors(conn, database, scan_batch=SCAN_BATCH, merge_batch_size=MERGE_BATCH, dry_run=False):
+    """Merge donors sharing a canonical phone and backfill phone_key.
+
+    Duplicates are merged before any key is written, so a backfilled key
+    never collides with a duplicate still holding it. Batches already
+    committed stay committed if a later one fails; run it again to finish.
+    """
+    result = DedupResult()
+    started = time.perf_counter()
+    merges, backfill = find_duplicates(conn, scan_batch, result)
+    if not dry_run:
+        for batch in _batches(merges, merge_batch_size):
+            result.merged += merge_batch(conn, database, batch)
+        for batch in _batches(backfill, scan_batch):
+            result.backfilled += backfill_batch(conn, batch)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', choices=sorted(DEDUP_SCHEMAS), default='blood_bank_db')
+    parser.add_argument('--batch-size', type=int, default=MERGE_BATCH, help='duplicates merged per transaction')
+    parser.add_argument('--dry-run', action='store_true', help='count duplicates without changing anything')
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG, database=args.database)
+    try:
+        result = dedup_donors(conn, args.database, merge_batch_size=args.batch_size, dry_run=args.dry_run)
+    except mysql.connector.Error as e:
+        print(f"❌ Dedup stopped: {e}. Committed batches are kept; run it again to finish.")
+        return 1
+    finally:
+        conn.close()
+
+    print(f"✅ Scanned {result.scanned} donors in {result.seconds:.1f}s: {result.duplicates} duplicate(s)")
+    if args.dry_run:
+        print("   Dry run; nothing changed")
+    else:
+        print(f"   Merged {result.merged} duplicate(s), backfilled {result.backfilled} phone key(s)")
+    if result.unparseable:
+        print(f"⚠️  {result.unparseable} donor(s) have no usable phone number and were left as they are")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Batch fulfilment of emergency blood requests from blood_inventory bags
+Replaces the per-request emergency_approval_trigger: all selected Pending
+requests are served in one pass, Critical before High before Medium before
+Low and oldest first within an urgency, from an in-memory first-expiry-first-out
+view of the available bags. Writes are a handful of bulk statements.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+
+URGENCY_ORDER = ('Critical', 'High', 'Medium', 'Low')
+
+# Keeps IN (...) lists and multi-row INSERTs well under max_allowed_packet
+BULK_CHUNK_SIZE = 1000
+
+
+@dataclass
+class FulfilmentResult:
+    approved: dict = field(default_factory=dict)   # request_id -> [bag_id, ...]
+    unfilled: list = field(default_factory=list)   # request_ids left Pending
+
+    @property
+    def bags_used(self):
+        return sum(len(bags) for bags in self.approved.values())
+
+    def to_dict(self):
+        return {
+            'approved': {str(k): v for k, v in self.approved.items()},
+            'unfilled': self.unfilled,
+            'bags_used': self.bags_used
+        }
+
+
+def _chunks(items, size=BULK_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _rows(cursor):
+    return [tuple(row.values()) if isinstance(row, dict) else tuple(row) for row in cursor.fetchall()]
+
+
+def _lock_pending(cursor, request_ids, limit):
+    order = ', '.join(['%s'] * len(URGENCY_ORDER))
+    sql = f"""
+        SELECT request_id, blood_group, units_required
+        FROM emergency_requests
+        WHERE status = 'Pending'
+    """
+    params = []
+    if request_ids is not None:
+        sql += f" AND request_id IN ({', '.join(['%s'] * len(request_ids))})"
+        params.extend(request_ids)
+    sql += f" ORDER BY FIELD(urgency, {order}), requested_on, request_id"
+    params.extend(URGENCY_ORDER)
+    if limit:
+        sql += " LIMIT %s"
+        params.append(limit)
+    cursor.execute(sql + " FOR UPDATE", params)
+    return _rows(cursor)
+
+
+def _lock_stock(cursor, demand):
+    """Lock, per blood group, only the soonest-expiring bags the batch could use"""
+    stock = {}
+    for blood_group, units in demand.items():
+        cursor.execute("""
+            SELECT bag_id FROM blood_inventory
+            WHERE blood_group = %s AND status = 'Available' AND expires_on >= CURDATE()
+            ORDER BY expires_on, bag_id
+            LIMIT %s
+            FOR UPDATE
+        """, (blood_group, units))
+        stock[blood_group] = deque(row[0] for row in _rows(cursor))
+    return stock
+
+
+def plan_fulfilment(requests, stock):
+    """Assign bags to requests already in priority order.
+
+    requests: [(request_id, blood_group, units_required)]
+    stock: {blood_group: deque of bag_ids in FEFO order}, consumed in place.
+    Requests are all-or-nothing. Once a request for a blood group cannot be
+    filled, lower-priority requests for that group are left Pending too, so
+    they never take bags ahead of a more urgent request.
+    """
+    result = FulfilmentResult()
+    blocked = set()
+    for request_id, blood_group, units in requests:
+        bags = stock.get(blood_group, deque())
+        if blood_group in blocked or len(bags) < units:
+            blocked.add(blood_group)
+            result.unfilled.append(request_id)
+            continue
+        result.approved[request_id] = [bags.popleft() for _ in range(units)]
+    return result
+
+
+def _apply(cursor, requests, result):
+    groups = {request_id: blood_group for request_id, blood_group, _ in requests}
+
+    bag_ids = [bag for bags in result.approved.values() for bag in bags]
+    for chunk in _chunks(bag_ids):
+        cursor.execute(f"""
+            UPDATE blood_inventory SET status = 'Used'
+            WHERE bag_id IN ({', '.join(['%s'] * len(chunk))})
+        """, chunk)
+
+    request_ids = list(result.approved)
+    for chunk in _chunks(request_ids):
+        cursor.execute(f"""
+            UPDATE emergency_requests SET status = 'Approved', approved_on = NOW()
+            WHERE request_id IN ({', '.join(['%s'] * len(chunk))})
+        """, chunk)
+
+    logs = [(request_id, f"Emergency request approved - {len(bags)} units of {groups[request_id]} "
+                         f"deducted (bags {', '.join(map(str, bags))})")
+            for request_id, bags in result.approved.items()]
+    for chunk in _chunks(logs):
+        params = [value for row in chunk for value in row]
+        cursor.execute(f"""
+            INSERT INTO inventory_logs (related_id, action_type, details)
+            VALUES {', '.join(["(%s, 'EMERGENCY_APPROVAL', %s)"] * len(chunk))}
+        """, params)
+
+
+def fulfil_emergency_requests(cursor, request_ids=None, limit=None):
+    """Approve Pending emergency requests that current stock can cover.
+
+    Must run inside the caller's transaction. request_ids restricts the batch
+    (e.g. one request from the Approve button); limit caps its size.
+    """
+    if request_ids is not None and not request_ids:
+        return FulfilmentResult()
+    requests = _lock_pending(cursor, request_ids, limit)
+    if not requests:
+        return FulfilmentResult()
+
+    demand = {}
+    for _, blood_group, units in requests:
+        demand[blood_group] = demand.get(blood_group, 0) + units
+    stock = _lock_stock(cursor, demand)
+
+    result = plan_fulfilment(requests, stock)
+    if result.approved:
+        _apply(cursor, requests, result)
+    return result
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Application-level expiry scheduler for hospital_inventory lots
+Keeps a min-heap of lots expiring within the publish horizon, expires them in
+bounded batches as soon as their expiry date has passed, and publishes the
+"expiring within N days" totals into inventory_summary.expiring_soon_units,
+which the dashboards read directly. Replaces the daily_blood_expiry_check
+event and the per-row auto-expire triggers. No app starts it by default; run
+one per database, or set EXPIRY_SCHEDULER=embedded for a single-process app:
+    python expiry_scheduler.py --database blood_network_db          # run forever
+    python expiry_scheduler.py --database blood_bank_db --once      # one sweep (cron)
+"""
+
+import argparse
+import heapq
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import mysql.connector
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+# inventory_summary.expiring_soon_units covers this many days
+SUMMARY_WINDOW_DAYS = 7
+
+EXPIRY_SCHEMAS = {
+    'blood_bank_db': {
+        'expiry_column': 'expires_on',
+        'available': "units_available > 0",
+        'expire_set': "units_available = 0",
+        # Same record the auto_expire_inventory trigger wrote
+        'log_sql': """
+            INSERT INTO logs (hospital_id, action_type, description)
+            VALUES {values}
+        """,
+        'log_row': lambda lot_id, hospital_id, blood_group, units: (
+            hospital_id, 'EXPIRY', f"Auto-expired {units} units of {blood_group}")
+    },
+    'blood_network_db': {
+        'expiry_column': 'expiry_date',
+        'available': "status = 'Available' AND units_available > 0",
+        'expire_set': "status = 'Expired'",
+        'log_sql': """
+            INSERT INTO system_logs (action_type, description, related_id, hospital_id)
+            VALUES {values}
+        """,
+        'log_row': lambda lot_id, hospital_id, blood_group, units: (
+            'BLOOD_EXPIRED', f"Blood unit expired: {blood_group} ({units} units) at hospital ID {hospital_id}",
+            lot_id, hospital_id)
+    }
+}
+
+
+class ExpiryScheduler:
+    """Min-heap of upcoming lot expiries for one database"""
+
+    def __init__(self, database, batch_size=500, horizon_days=SUMMARY_WINDOW_DAYS,
+                 refresh_interval=300, db_config=None):
+        self.database = database
+        self.schema = EXPIRY_SCHEMAS[database]
+        self.batch_size = batch_size
+        self.horizon_days = max(horizon_days, SUMMARY_WINDOW_DAYS)
+        self.refresh_interval = refresh_interval
+        self.db_config = dict(db_config or DB_CONFIG, database=database)
+        self._heap = []      # (expiry_date, lot_id)
+        self._lots = {}      # lot_id -> (hospital_id, blood_group, units, expiry_date)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.loaded_on = None
+        self.expired_total = 0
+
+    def _connect(self):
+        return mysql.connector.connect(**self.db_config)
+
+    # Heap maintenance
+
+    def refresh(self, conn, today=None):
+        """Reload every available lot expiring before today + horizon.
+
+        Runs in the caller's transaction with FOR SHARE so a publish made from
+        this snapshot cannot race concurrent lot writes in the window.
+        """
+        today = today or date.today()
+        expiry = self.schema['expiry_column']
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT h_bag_id, hospital_id, blood_group, units_available, {expiry}
+            FROM hospital_inventory
+            WHERE {self.schema['available']} AND {expiry} < %s
+            FOR SHARE
+        """, (today + timedelta(days=self.horizon_days + 1),))
+        lots = {row[0]: row[1:] for row in cursor.fetchall()}
+        cursor.close()
+
+        heap = [(lot[3], lot_id) for lot_id, lot in lots.items()]
+        heapq.heapify(heap)
+        with self._lock:
+            self._heap, self._lots = heap, lots
+            self.loaded_on = today
+
+    def _pop_due(self, today):
+        """Pop every lot whose expiry date is before today"""
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] < today:
+                _, lot_id = heapq.heappop(self._heap)
+                lot = self._lots.pop(lot_id, None)
+                if lot is not None:
+                    due.append((lot_id, lot))
+        return due
+
+    @property
+    def tracked(self):
+        return len(self._lots)
+
+    def next_due(self):
+        """Datetime at which the earliest tracked lot becomes expired"""
+        with self._lock:
+            if not self._heap:
+                return None
+            expiry = self._heap[0][0]
+        return datetime.combine(expiry + timedelta(days=1), datetime.min.time())
+
+    # Published sets
+
+    def expiring_within(self, days, today=None):
+        """{(hospital_id, blood_group): units} for lots expiring within `days`"""
+        today = today or date.today()
+        cutoff = today + timedelta(days=min(days, self.horizon_days))
+        totals = {}
+        with self._lock:
+            for hospital_id, blood_group, units, expiry in self._lots.values():
+                if today <= expiry <= cutoff:
+                    key = (hospital_id, blood_group)
+                    totals[key] = totals.get(key, 0) + units
+        return totals
+
+    def publish(self, conn, today=None):
+        """Overwrite inventory_summary.expiring_soon_units with the current window.
+
+        The reset and the upserts commit together, so readers never see the
+        window zeroed; joins the caller's transaction if one is open.
+        """
+        totals = self.expiring_within(SUMMARY_WINDOW_DAYS, today)
+        rows = [(hospital_id, blood_group, units) for (hospital_id, blood_group), units in totals.items()]
+        own = not conn.in_transaction
+        cursor = conn.cursor()
+        try:
+            if own:
+                conn.start_transaction()
+            cursor.execute("UPDATE inventory_summary SET expiring_soon_units = 0 WHERE expiring_soon_units <> 0")
+            for start in range(0, len(rows), self.batch_size):
+                chunk = rows[start:start + self.batch_size]
+                cursor.execute(f"""
+                    INSERT INTO inventory_summary (hospital_id, blood_group, total_units, expiring_soon_units)
+                    VALUES {', '.join(['(%s, %s, 0, %s)'] * len(chunk))}
+                    ON DUPLICATE KEY UPDATE expiring_soon_units = VALUES(expiring_soon_units)
+                """, [value for row in chunk for value in row])
+            if own:
+                conn.commit()
+        except mysql.connector.Error:
+            if own:
+                conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    # Expiry
+
+    def _expire_batch(self, conn, batch, today):
+        expiry = self.schema['expiry_column']
+        ids = [lot_id for lot_id, _ in batch]
+        cursor = conn.cursor()
+        conn.start_transaction()
+        try:
+            # Re-check in SQL: lots used or transferred since the refresh are skipped
+            cursor.execute(f"""
+                SELECT h_bag_id, hospital_id, blood_group, units_available FROM hospital_inventory
+                WHERE h_bag_id IN ({', '.join(['%s'] * len(ids))})
+                  AND {self.schema['available']} AND {expiry} < %s
+                FOR UPDATE
+            """, ids + [today])
+            still_due = {row[0]: row for row in cursor.fetchall()}
+            if still_due:
+                cursor.execute(f"""
+                    UPDATE hospital_inventory SET {self.schema['expire_set']}
+                    WHERE h_bag_id IN ({', '.join(['%s'] * len(still_due))})
+                """, sorted(still_due))
+                # Units as locked here, not as loaded at the last refresh
+                logs = [self.schema['log_row'](*still_due[lot_id]) for lot_id in sorted(still_due)]
+                placeholders = '(' + ', '.join(['%s'] * len(logs[0])) + ')'
+                cursor.execute(self.schema['log_sql'].format(values=', '.join([placeholders] * len(logs))),
+                               [value for row in logs for value in row])
+            conn.commit()
+        except mysql.connector.Error:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return len(still_due)
+
+    def sweep(self, conn, today=None):
+        """Expire every due lot in batches of batch_size; returns the count"""
+        today = today or date.today()
+        due = self._pop_due(today)
+        expired = 0
+        for start in range(0, len(due), self.batch_size):
+            expired += self._expire_batch(conn, due[start:start + self.batch_size], today)
+        self.expired_total += expired
+        return expired
+
+    def run_once(self, conn=None, today=None):
+        """Refresh, expire everything due and publish; returns lots expired"""
+        today = today or date.today()
+        own = conn is None
+        conn = conn or self._connect()
+        try:
+            conn.start_transaction()
+            self.refresh(conn, today)
+            conn.commit()
+            expired = self.sweep(conn, today)
+            self._republish(conn, today)
+            return expired
+        finally:
+            if own:
+                conn.close()
+
+    def _republish(self, conn, today=None):
+        """Reload the window and publish it from that snapshot in one transaction"""
+        conn.start_transaction()
+        try:
+            self.refresh(conn, today)
+            self.publish(conn, today)
+            conn.commit()
+        except mysql.connector.Error:
+            conn.rollback()
+            raise
+
+    def run(self):
+        """Loop until stop(): sweep when lots fall due, refresh periodically"""
+        conn = self._connect()
+        try:
+            self.run_once(conn)
+            last_refresh = time.monotonic()
+            while not self._stop.is_set():
+                now = datetime.now()
+                next_due = self.next_due()
+                wake_in = self.refresh_interval - (time.monotonic() - last_refresh)
+                if next_due is not None:
+                    wake_in = min(wake_in, (next_due - now).total_seconds())
+                if self._stop.wait(max(wake_in, 0)):
+                    break
+                if not conn.is_connected():
+                    conn.reconnect(attempts=3, delay=1)
+                if date.today() != self.loaded_on or time.monotonic() - last_refresh >= self.refresh_interval:
+                    self.run_once(conn)
+                    last_refresh = time.monotonic()
+                elif self.sweep(conn):
+                    # Publish after every sweep that expired lots, not only
+                    # on the periodic refresh
+                    self._republish(conn)
+        finally:
+            conn.close()
+
+    def start(self):
+        """Run in a daemon thread (e.g. from a single-process app deployment)"""
+        thread = threading.Thread(target=self.run, name=f'expiry-{self.database}', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', choices=sorted(EXPIRY_SCHEMAS), default='blood_network_db')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--refresh-interval', type=int, default=300, help='seconds between heap reloads')
+    parser.add_argument('--once', action='store_true', help='sweep and publish once, then exit')
+    args = parser.parse_args()
+
+    scheduler = ExpiryScheduler(args.database, batch_size=args.batch_size,
+                                refresh_interval=args.refresh_interval)
+    if args.once:
+        expired = scheduler.run_once()
+        print(f"✅ Expired {expired} lot(s); tracking {scheduler.tracked} lot(s) "
+              f"expiring within {scheduler.horizon_days} days")
+        return 0
+
+    print(f"⏰ Expiry scheduler running for {args.database} (Ctrl+C to stop)")
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        scheduler.stop()
+    print(f"✅ Stopped after expiring {scheduler.expired_total} lot(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN regression check for the hot blood_bank_db queries
+Runs EXPLAIN on each query app.py and dashboard_service.py issue per request and
+fails when a filtered table is read with a full scan and no usable index.
+Run after `python migrate.py up`, ideally against a realistically sized database:
+    python explain_check.py
+    python explain_check.py --verbose
+On tiny tables MySQL may still prefer a scan even when an index exists; those
+rows are reported as warnings unless --strict is given.
+"""
+
+import argparse
+import sys
+
+import mysql.connector
+
+from dashboard_service import DASHBOARD_SQL
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '',
+    'database': 'blood_bank_db'
+}
+
+# Below this many estimated rows a scan is a legitimate optimizer choice
+SMALL_TABLE_ROWS = 1000
+
+# (name, sql, params, tables that must be read through an index)
+HOT_QUERIES = [
+    ("cities", "SELECT DISTINCT city FROM hospitals ORDER BY city", (), {'hospitals'}),
+    ("hospitals_in_city", "SELECT hospital_id, name FROM hospitals WHERE city = %s",
+     ('Bangalore',), {'hospitals'}),
+    ("donor_by_phone", "SELECT donor_id FROM donors WHERE phone_key = %s", ('+919876543210',), {'donors'}),
+    ("inventory_lot", """
+        SELECT h_bag_id FROM hospital_inventory
+        WHERE hospital_id = %s AND blood_group = %s AND expires_on = %s
+     """, (1, 'O+', '2024-03-15'), {'hospital_inventory'}),
+    ("hospital_inventory", """
+        SELECT * FROM hospital_inventory
+        WHERE hospital_id = %s AND units_available > 0
+        ORDER BY blood_group, expires_on
+     """, (1,), {'hospital_inventory'}),
+    ("appointments_page", """
+        SELECT da.*, d.name, d.blood_group, d.phone, d.city,
+               CASE WHEN rd.donor_id IS NOT NULL THEN 1 ELSE 0 END as is_rare_donor
+        FROM donation_appointments da
+        JOIN donors d ON da.donor_id = d.donor_id
+        LEFT JOIN rare_donors rd ON d.donor_id = rd.donor_id
+        WHERE (da.hospital_id = %s)
+        ORDER BY da.preferred_time DESC, da.appointment_id DESC LIMIT 51
+     """, (1,), {'da', 'd'}),
+    ("incoming_transfers_page", """
+        SELECT tr.*, h.name as from_hospital_name
+        FROM transfer_requests tr
+        JOIN hospitals h ON tr.from_hospital = h.hospital_id
+        WHERE (tr.to_hospital = %s)
+        ORDER BY tr.created_at DESC, tr.request_id DESC LIMIT 51
+     """, (1,), {'tr', 'h'}),
+    ("outgoing_transfers_page", """
+        SELECT tr.*, h.name as to_hospital_name
+        FROM transfer_requests tr
+        JOIN hospitals h ON tr.to_hospital = h.hospital_id
+        WHERE (tr.from_hospital = %s)
+        ORDER BY tr.created_at DESC, tr.request_id DESC LIMIT 51
+     """, (1,), {'tr', 'h'}),
+    ("inventory_logs_last_day", """
+        SELECT il.* FROM inventory_logs il
+        WHERE (il.created_at >= NOW() - INTERVAL 1 DAY AND il.action_type = %s)
+        ORDER BY il.created_at DESC, il.log_id DESC LIMIT 51
+     """, ('EMERGENCY_APPROVAL',), {'il'}),
+]
+
+# Subquery tables in the dashboard batch are reported by table name
+DASHBOARD_TABLES = {'inventory_summary', 'tr', 'donation_appointments', 'transfer_requests',
+                    'd', 'rd', 'hospitals'}
+
+
+def dashboard_queries(hospital_id=1):
+    statements = [s.strip() for s in DASHBOARD_SQL.split(';') if s.strip()]
+    return [(f"dashboard[{i}]", sql, {'hospital_id': hospital_id}, DASHBOARD_TABLES)
+            for i, sql in enumerate(statements, 1)]
+
+
+def check_query(cursor, name, sql, params, tables, strict=False):
+    """EXPLAIN one query; return (failures, warnings, plan rows)"""
+    cursor.execute("EXPLAIN " + sql, params)
+    plan = cursor.fetchall()
+    failures, warnings = [], []
+    for row in plan:
+        table = row.get('table')
+        if table not in tables:
+            continue
+        if row.get('key') or row.get('type') in ('const', 'eq_ref', 'ref', 'range', 'index_merge', 'system'):
+            continue
+        estimated = row.get('rows') or 0
+        message = (f"{name}: {table} read with type={row.get('type')} "
+                   f"(possible_keys={row.get('possible_keys')}, rows≈{estimated})")
+        if row.get('possible_keys') and estimated < SMALL_TABLE_ROWS and not strict:
+            warnings.append(message)
+        else:
+            failures.append(message)
+    return failures, warnings, plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--strict', action='store_true', help='treat small-table scans as failures')
+    parser.add_argument('--verbose', action='store_true', help='print every plan row')
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor(dictionary=True, buffered=True)
+    failures, warnings = [], []
+    try:
+        for name, sql, params, tables in HOT_QUERIES + dashboard_queries():
+            query_failures, query_warnings, plan = check_query(cursor, name, sql, params, tables, args.strict)
+            failures.extend(query_failures)
+            warnings.extend(query_warnings)
+            status = '❌' if query_failures else ('⚠️ ' if query_warnings else '✅')
+            print(f"{status} {name}")
+            if args.verbose:
+                for row in plan:
+                    print(f"     {row.get('table')}: type={row.get('type')} key={row.get('key')} "
+                          f"rows={row.get('rows')} extra={row.get('Extra')}")
+    finally:
+        cursor.close()
+        conn.close()
+
+    for message in warnings:
+        print(f"⚠️  {message}")
+    for message in failures:
+        print(f"❌ {message}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Streaming CSV / JSONL export of inventory, transfers and logs
+Rows are read from an unbuffered (server-side) cursor in fetchmany batches
+and encoded batch by batch, optionally gzip-compressed on the fly, so memory
+stays flat however many rows a table holds. The Flask export endpoints wrap
+the same generator in a streamed Response; the CLI writes it to a file:
+    python export_service.py --database blood_bank_db inventory -o inventory.csv
+    python export_service.py --database blood_network_db logs --format jsonl --gzip -o logs.jsonl.gz
+    python export_service.py --database blood_network_db transfers --hospital-id 3 -o transfers.csv
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import zlib
+from datetime import datetime
+
+import mysql.connector
+from flask import Response
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+# Rows per fetchmany(); also the unit of encoding and compression
+EXPORT_BATCH = 2000
+
+# The server aborts a result set it cannot send for this long; slow
+# downloads hold the cursor open, so allow well above the 60s default
+NET_WRITE_TIMEOUT = 3600
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson'
+}
+
+# Per database: export name -> SELECT (without WHERE/ORDER BY), stream order,
+# hospital scope and time column for --since/--until
+EXPORTS = {
+    'blood_bank_db': {
+        'inventory': {
+            'sql': """
+                SELECT bi.*, d.name AS donor_name
+                FROM blood_inventory bi
+                LEFT JOIN donors d ON bi.donor_id = d.donor_id
+            """,
+            'order_by': 'bi.bag_id',
+            'hospital_where': None,
+            'time_column': 'bi.collected_on'
+        },
+        'transfers': {
+            'sql': """
+                SELECT tr.*, fh.name AS from_hospital_name, th.name AS to_hospital_name
+                FROM transfer_requests tr
+                JOIN hospitals fh ON tr.from_hospital = fh.hospital_id
+                JOIN hospitals th ON tr.to_hospital = th.hospital_id
+            """,
+            'order_by': 'tr.request_id',
+            'hospital_where': '(tr.from_hospital = %s OR tr.to_hospital = %s)',
+            'time_column': 'tr.created_at'
+        },
+        'logs': {
+            'sql': "SELECT il.* FROM inventory_logs il",
+            'order_by': 'il.created_at, il.log_id',
+            'hospital_where': None,
+            'time_column': 'il.created_at'
+        }
+    },
+    'blood_network_db': {
+        'inventory': {
+            'sql': """
+                SELECT hi.*, h.hospital_name
+                FROM hospital_inventory hi
+                JOIN hospitals h ON hi.hospital_id = h.hospital_id
+            """,
+            'order_by': 'hi.h_bag_id',
+            'hospital_where': 'hi.hospital_id = %s',
+            'time_column': 'hi.last_updated'
+        },
+        'transfers': {
+            'sql': """
+                SELECT tr.*, fh.hospital_name AS from_hospital_name, th.hospital_name AS to_hospital_name
+                FROM transfer_requests tr
+                JOIN hospitals fh ON tr.from_hospital_id = fh.hospital_id
+                JOIN hospitals th ON tr.to_hospital_id = th.hospital_id
+            """,
+            'order_by': 'tr.request_id',
+            'hospital_where': '(tr.from_hospital_id = %s OR tr.to_hospital_id = %s)',
+            'time_column': 'tr.requested_on'
+        },
+        'logs': {
+            'sql': """
+                SELECT sl.*, h.hospital_name
+                FROM system_logs sl
+                LEFT JOIN hospitals h ON sl.hospital_id = h.hospital_id
+            """,
+            'order_by': 'sl.created_at, sl.log_id',
+            'hospital_where': 'sl.hospital_id = %s',
+            'time_column': 'sl.created_at'
+        }
+    }
+}
+
+
+def export_query(database, name, hospital_id=None, where=None, params=()):
+    """(sql, params) for one export, optionally scoped to a hospital and extra WHERE"""
+    export = EXPORTS[database][name]
+    clauses = [f"({where})"] if where else []
+    query_params = list(params)
+    if hospital_id is not None:
+        if not export['hospital_where']:
+            raise ValueError(f"{database} {name} export cannot be scoped to a hospital")
+        clauses.append(export['hospital_where'])
+        query_params.extend([hospital_id] * export['hospital_where'].count('%s'))
+    sql = export['sql'].strip()
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    return sql + f" ORDER BY {export['order_by']}", query_params
+
+
+def parse_extension(ext):
+    """'csv', 'jsonl', 'csv.gz' or 'jsonl.gz' -> (format, gzip); None if unsupported"""
+    fmt, _, suffix = ext.partition('.')
+    if fmt not in FORMATS or suffix not in ('', 'gz'):
+        return None
+    return fmt, suffix == 'gz'
+
+
+# Encoding
+
+def _batches(cursor, batch_size):
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def encode_csv(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def encode_jsonl(columns, batches):
+    for rows in batches:
+        yield ''.join(json.dumps(dict(zip(columns, row)), default=str, separators=(',', ':')) + '\n'
+                      for row in rows)
+
+
+ENCODERS = {
+    'csv': encode_csv,
+    'jsonl': encode_jsonl
+}
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a stream of byte chunks into one gzip member"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(conn, sql, params=(), fmt='csv', compress=False, batch_size=EXPORT_BATCH):
+    """Yield the encoded export as bytes chunks.
+
+    Uses an unbuffered cursor, so the connection stays busy until the
+    generator is exhausted; a caller that stops early must discard the
+    connection rather than reuse it. The raised net_write_timeout is put
+    back once the rows are read, so a pooled connection is returned with
+    the server default.
+    """
+    cursor = conn.cursor(buffered=False)
+    cursor.execute("SET SESSION net_write_timeout = %s", (NET_WRITE_TIMEOUT,))
+    cursor.execute(sql, params)
+    columns = cursor.column_names
+    chunks = (text.encode('utf-8') for text in ENCODERS[fmt](columns, _batches(cursor, batch_size)))
+    if compress:
+        chunks = gzip_chunks(chunks)
+    yield from chunks
+    cursor.execute("SET SESSION net_write_timeout = DEFAULT")
+    cursor.close()
+
+
+def export_response(pool, sql, params, filename, fmt='csv', compress=False):
+    """Streamed Flask Response; the pooled connection is borrowed only while streaming"""
+    def generate():
+        conn = pool.connection()
+        finished = False
+        try:
+            yield from stream_export(conn, sql, params, fmt, compress)
+            finished = True
+        finally:
+            # An abandoned download leaves unread rows on the connection
+            if finished:
+                conn.close()
+            else:
+                conn.invalidate()
+
+    if compress:
+        filename += '.gz'
+    headers = {
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Accel-Buffering': 'no'
+    }
+    mimetype = 'application/gzip' if compress else FORMATS[fmt]
+    return Response(generate(), mimetype=mimetype, headers=headers)
+
+
+def export_filename(name, fmt):
+    return f"{name}-{datetime.now():%Y%m%d-%H%M%S}.{fmt}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', choices=sorted(EXPORTS), default='blood_bank_db')
+    parser.add_argument('export', choices=('inventory', 'transfers', 'logs'))
+    parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+    parser.add_argument('--gzip', action='store_true')
+    parser.add_argument('--hospital-id', type=int)
+    parser.add_argument('--since', help='YYYY-MM-DD, inclusive')
+    parser.add_argument('--until', help='YYYY-MM-DD, exclusive')
+    parser.add_argument('-o', '--output', help='file to write (default: stdout)')
+    args = parser.parse_args()
+
+    time_column = EXPORTS[args.database][args.export]['time_column']
+    clauses, params = [], []
+    if args.since:
+        clauses.append(f"{time_column} >= %s")
+        params.append(args.since)
+    if args.until:
+        clauses.append(f"{time_column} < %s")
+        params.append(args.until)
+    try:
+        sql, params = export_query(args.database, args.export, args.hospital_id,
+                                   " AND ".join(clauses) or None, params)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    conn = mysql.connector.connect(**DB_CONFIG, database=args.database)
+    out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    written = 0
+    try:
+        for chunk in stream_export(conn, sql, params, args.format, args.gzip):
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            out.close()
+        conn.close()
+    if args.output:
+        print(f"✅ Wrote {written} bytes to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
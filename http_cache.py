@@ -0,0 +1,127 @@
+"""
+HTTP conditional caching for the JSON API
+ETags are derived from per-table versions. Versions for hospitals and
+inventory are the newest updated_at of the rows the writes already touch
+(hospitals and inventory_summary), read through an index on that column, so
+no write path has to bump a shared counter row and reading them does not
+grow with the table. Other tables use counters in table_versions, bumped
+once per run by the batch jobs that write them. All versions are read in one
+round trip and cached in-process. A 304 Not Modified never waits on the
+database: past the TTL the cached versions are still answered while one
+background read refreshes them, so they lag writes from other workers by at
+most the TTL plus that read. invalidate() makes the next request read them
+synchronously, so a worker always sees its own writes.
+"""
+
+import hashlib
+import threading
+import time
+
+from flask import jsonify, request, make_response, current_app
+from mysql.connector import Error
+
+from db import get_cursor
+
+# table -> query returning its version as one value. MAX(updated_at) comes
+# from the idx_*_updated index (TIMESTAMP(6), ON UPDATE) and MAX(hospital_id)
+# from the primary key; neither scans the table. Deleting a hospital other
+# than the newest does not move the version (no app path deletes hospitals).
+DERIVED_VERSIONS = {
+    'hospitals': """
+        SELECT 'hospitals', CONCAT_WS(':', MAX(hospital_id), MAX(updated_at)) FROM hospitals
+    """,
+    'hospital_inventory': """
+        SELECT 'hospital_inventory', CAST(MAX(updated_at) AS CHAR) FROM inventory_summary
+    """,
+    # Also moves when expiry_scheduler publishes new expiring_soon_units
+    'inventory_summary': """
+        SELECT 'inventory_summary', CAST(MAX(updated_at) AS CHAR) FROM inventory_summary
+    """
+}
+
+
+class TableVersions:
+    """Cached view of the derived versions and the table_versions counters"""
+
+    def __init__(self, database, ttl=2):
+        self.database = database
+        self.ttl = ttl
+        self._sql = ' UNION ALL '.join(
+            list(DERIVED_VERSIONS.values()) + ["SELECT table_name, CAST(version AS CHAR) FROM table_versions"]
+        )
+        self._lock = threading.Lock()
+        self._versions = None
+        self._loaded_at = 0.0
+        self._generation = 0      # bumped by invalidate(); stale background reads are dropped
+        self._refreshing = False
+        self.background_refreshes = 0
+
+    def _query(self, cursor):
+        cursor.execute(self._sql)
+        return dict(cursor.fetchall())
+
+    def _store(self, versions, generation):
+        with self._lock:
+            if generation == self._generation:
+                self._versions, self._loaded_at = versions, time.monotonic()
+
+    def _refresh(self, pool, generation):
+        """Background re-read on a connection of its own"""
+        versions = None
+        try:
+            conn = pool.connection(timeout=self.ttl)
+            try:
+                cursor = conn.cursor()
+                versions = self._query(cursor)
+                cursor.close()
+            finally:
+                conn.close()
+        except Error:
+            pass    # keep answering the cached versions; the next request retries
+        with self._lock:
+            self._refreshing = False
+            self.background_refreshes += 1
+        if versions is not None:
+            self._store(versions, generation)
+
+    def current(self, *tables):
+        with self._lock:
+            versions, generation = self._versions, self._generation
+            refresh = (versions is not None and not self._refreshing
+                       and time.monotonic() - self._loaded_at >= self.ttl)
+            if refresh:
+                self._refreshing = True
+        if versions is None:
+            versions = self._query(get_cursor())
+            self._store(versions, generation)
+        elif refresh:
+            pool = current_app.extensions['db_pool']
+            threading.Thread(target=self._refresh, args=(pool, generation),
+                             name=f'table-versions-{self.database}', daemon=True).start()
+        return tuple(versions.get(table, 0) for table in tables)
+
+    def invalidate(self):
+        """Re-read versions on next use; call after writes made by this worker"""
+        with self._lock:
+            self._versions = None
+            self._generation += 1
+
+
+def make_etag(key, versions):
+    digest = hashlib.sha1(f"{key}|{versions}".encode('utf-8')).hexdigest()
+    return digest[:20]
+
+
+def conditional_json(table_versions, tables, key, loader, cache_control):
+    """Return 304 when the client's ETag is current, else the JSON from loader(versions)"""
+    versions = table_versions.current(*tables)
+    etag = make_etag(key, versions)
+
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = jsonify(loader(versions))
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Bulk CSV import of hospital inventory lots and donor rosters
+The CSV is read one row at a time, each row is validated (blood group, age,
+units, expiry, known hospital, required fields) and valid rows are written
+as multi-row INSERTs, committing every chunk_size rows. Rejected rows never reach the
+database; they go to an error report with their line number and reason:
+    python import_service.py --database blood_network_db lots lots.csv --hospital-id 3
+    python import_service.py --database blood_bank_db donors donors.csv --errors rejects.csv
+
+Lot CSV columns:   blood_group, units, expiry_date (or expires_on) [, hospital_id]
+Donor CSV columns: name, age, gender, blood_group, phone, city
+"""
+
+import argparse
+import csv
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+import mysql.connector
+
+from donor_service import normalize_phone
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+BLOOD_GROUPS = ('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-')
+GENDERS = ('Male', 'Female', 'Other')
+DONOR_AGE_RANGE = (18, 65)
+MAX_LOT_UNITS = 1000
+
+# Rows per INSERT statement and per transaction
+IMPORT_CHUNK_SIZE = 2000
+
+# Rejects kept on the result for display; the error report gets all of them
+MAX_KEPT_ERRORS = 20
+
+IMPORT_SCHEMAS = {
+    'blood_bank_db': {
+        # Lots merge into the unique (hospital, group, expiry) lot from migration 0002
+        'lots': """
+            INSERT INTO hospital_inventory (hospital_id, blood_group, units_available, expires_on)
+            VALUES {values}
+            ON DUPLICATE KEY UPDATE units_available = units_available + VALUES(units_available)
+        """,
+        # Donors already on file (same phone_key, migration 0009) are kept as they are
+        'donors': """
+            INSERT INTO donors (name, age, gender, blood_group, phone, phone_key, city)
+            VALUES {values}
+            ON DUPLICATE KEY UPDATE donor_id = donor_id
+        """
+    },
+    'blood_network_db': {
+        # Lots merge into the unique Available (hospital, group, expiry) lot, uq_inventory_lot
+        'lots': """
+            INSERT INTO hospital_inventory (hospital_id, blood_group, units_available, expiry_date)
+            VALUES {values}
+            ON DUPLICATE KEY UPDATE units_available = units_available + VALUES(units_available)
+        """,
+        # Donors already on file (same phone_key, migration 0009) are kept as they are
+        'donors': """
+            INSERT INTO donors (name, age, gender, blood_group, phone, phone_key, city)
+            VALUES {values}
+            ON DUPLICATE KEY UPDATE donor_id = donor_id
+        """
+    }
+}
+
+
+class RowError(ValueError):
+    """A CSV row that fails validation"""
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    rejected: int = 0
+    errors: list = field(default_factory=list)   # first MAX_KEPT_ERRORS (line, message)
+    seconds: float = 0.0
+    failed: int = 0        # valid rows in the chunk the database rejected
+    error: str = None      # why that chunk failed; the import stops there
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'errors': [{'line': line, 'error': message} for line, message in self.errors],
+            'seconds': round(self.seconds, 2),
+            'failed': self.failed,
+            'error': self.error
+        }
+
+
+# Validation
+
+def _field(row, *names, required=True):
+    for name in names:
+        value = (row.get(name) or '').strip()
+        if value:
+            return value
+    if required:
+        raise RowError(f"missing {names[0]}")
+    return None
+
+
+def _blood_group(row):
+    value = _field(row, 'blood_group').upper().replace(' ', '')
+    if value not in BLOOD_GROUPS:
+        raise RowError(f"unknown blood group {value!r}")
+    return value
+
+
+def _int(row, name, low, high):
+    value = _field(row, name)
+    try:
+        number = int(value)
+    except ValueError:
+        raise RowError(f"{name} is not a whole number: {value!r}")
+    if not low <= number <= high:
+        raise RowError(f"{name} {number} outside {low}-{high}")
+    return number
+
+
+def validate_lot(row, hospital_id=None, today=None, hospitals=None):
+    """(hospital_id, blood_group, units, expiry) for one lot row; hospitals is the set of known ids"""
+    if hospital_id is None:
+        hospital_id = _int(row, 'hospital_id', 1, 2 ** 31 - 1)
+    if hospitals is not None and hospital_id not in hospitals:
+        raise RowError(f"unknown hospital_id {hospital_id}")
+    blood_group = _blood_group(row)
+    units = _int(row, 'units', 1, MAX_LOT_UNITS)
+    value = _field(row, 'expiry_date', 'expires_on')
+    try:
+        expiry = datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise RowError(f"expiry date is not YYYY-MM-DD: {value!r}")
+    if expiry < (today or date.today()):
+        raise RowError(f"lot already expired on {expiry}")
+    return hospital_id, blood_group, units, expiry
+
+
+def validate_donor(row, hospital_id=None, today=None, hospitals=None):
+    """(name, age, gender, blood_group, phone, phone_key, city) for one donor row"""
+    name = _field(row, 'name')
+    if len(name) > 100:
+        raise RowError("name longer than 100 characters")
+    age = _int(row, 'age', *DONOR_AGE_RANGE)
+    gender = _field(row, 'gender').capitalize()
+    if gender not in GENDERS:
+        raise RowError(f"unknown gender {gender!r}")
+    blood_group = _blood_group(row)
+    phone = _field(row, 'phone')
+    if len(phone) > 15:
+        raise RowError("phone longer than 15 characters")
+    phone_key = normalize_phone(phone)
+    if phone_key is None:
+        raise RowError(f"not a phone number: {phone!r}")
+    city = _field(row, 'city')
+    if len(city) > 50:
+        raise RowError("city longer than 50 characters")
+    return name, age, gender, blood_group, phone, phone_key, city
+
+
+VALIDATORS = {
+    'lots': validate_lot,
+    'donors': validate_donor
+}
+
+
+# Import
+
+def _hospital_ids(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT hospital_id FROM hospitals")
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def _insert_chunk(conn, sql, rows):
+    placeholders = '(' + ', '.join(['%s'] * len(rows[0])) + ')'
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        cursor.execute(sql.format(values=', '.join([placeholders] * len(rows))),
+                       [value for row in rows for value in row])
+        conn.commit()
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def _commit_chunk(conn, sql, rows, result, line, on_chunk):
+    """Insert one chunk and count it on result; False if the database rejected it"""
+    try:
+        _insert_chunk(conn, sql, rows)
+    except mysql.connector.Error as e:
+        result.failed = len(rows)
+        result.error = f"chunk ending at line {line} rolled back: {e}"
+        return False
+    result.imported += len(rows)
+    if on_chunk is not None:
+        on_chunk(rows)
+    return True
+
+
+def import_csv(conn, database, kind, stream, hospital_id=None, chunk_size=IMPORT_CHUNK_SIZE,
+               error_writer=None, on_chunk=None):
+    """Validate and insert every row of a CSV text stream.
+
+    hospital_id pins every lot to one hospital (the uploading hospital);
+    otherwise lot rows need a hospital_id column. Lots for a hospital that
+    is not on file are rejected. error_writer, a csv.writer, receives one
+    [line, error, raw values...] row per reject. on_chunk(rows) is called
+    with the validated rows after each chunk commits. If the database
+    rejects a chunk, it is rolled back and the import stops: result.imported
+    counts the rows committed before it, result.failed the rows in it and
+    result.error says why.
+    """
+    sql = IMPORT_SCHEMAS[database][kind]
+    validate = VALIDATORS[kind]
+    result = ImportResult()
+    started = time.perf_counter()
+    today = date.today()
+    # Read once, so rows for an unknown hospital are rejected here instead of
+    # failing their whole chunk on the foreign key
+    hospitals = _hospital_ids(conn) if kind == 'lots' else None
+
+    reader = csv.DictReader(stream)
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    if error_writer is not None:
+        error_writer.writerow(['line', 'error'] + list(reader.fieldnames or []))
+
+    pending = []
+    for row in reader:
+        try:
+            pending.append(validate(row, hospital_id, today, hospitals))
+        except RowError as e:
+            result.rejected += 1
+            if len(result.errors) < MAX_KEPT_ERRORS:
+                result.errors.append((reader.line_num, str(e)))
+            if error_writer is not None:
+                error_writer.writerow([reader.line_num, str(e)] + [row.get(name) for name in reader.fieldnames])
+            continue
+        if len(pending) >= chunk_size:
+            if not _commit_chunk(conn, sql, pending, result, reader.line_num, on_chunk):
+                break
+            pending = []
+    if pending and result.error is None:
+        _commit_chunk(conn, sql, pending, result, reader.line_num, on_chunk)
+
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', choices=sorted(IMPORT_SCHEMAS), default='blood_network_db')
+    parser.add_argument('kind', choices=sorted(VALIDATORS))
+    parser.add_argument('csv_file')
+    parser.add_argument('--hospital-id', type=int, help='assign every lot to this hospital')
+    parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument('--errors', help='write rejected rows to this CSV')
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG, database=args.database)
+    errors_file = open(args.errors, 'w', newline='', encoding='utf-8') if args.errors else None
+    try:
+        with open(args.csv_file, newline='', encoding='utf-8-sig') as source:
+            result = import_csv(conn, args.database, args.kind, source, args.hospital_id, args.chunk_size,
+                                csv.writer(errors_file) if errors_file else None)
+    finally:
+        if errors_file:
+            errors_file.close()
+        conn.close()
+
+    rate = result.imported / result.seconds if result.seconds else 0
+    print(f"✅ Imported {result.imported} {args.kind} in {result.seconds:.1f}s ({rate:,.0f} rows/s)")
+    if result.rejected:
+        print(f"⚠️  Rejected {result.rejected} row(s)" + (f"; see {args.errors}" if args.errors else ""))
+        for line, message in result.errors:
+            print(f"   line {line}: {message}")
+    if result.error:
+        print(f"❌ Stopped after {result.imported} {args.kind}: {result.error}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+"""
+Hospital inventory lot writes
+A lot is one (hospital_id, blood_group, expires_on) row, enforced by the
+uq_inventory_lot key (database/migrations/0002_unique_inventory_lot).
+"""
+
+# Single-statement lot write: creates the lot or adds to it atomically.
+# The unique key makes concurrent additions serialize on the lot's index
+# record instead of racing between a SELECT and an INSERT.
+LOT_UPSERT_SQL = """
+    INSERT INTO hospital_inventory (hospital_id, blood_group, units_available, expires_on)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE units_available = units_available + VALUES(units_available)
+"""
+
+
+def add_lot_units(cursor, hospital_id, blood_group, units, expires_on):
+    """Add units to a hospital's lot, creating it if needed; one round trip"""
+    cursor.execute(LOT_UPSERT_SQL, (hospital_id, blood_group, units, expires_on))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Reconcile the materialized inventory_summary table against hospital_inventory
+Checks total_units, the column the triggers maintain; expiring_soon_units
+belongs to expiry_scheduler.py, which republishes it after every sweep.
+Run with --fix to repair any drift in the totals:
+    python inventory_summary.py --database blood_bank_db --fix
+    python inventory_summary.py --database blood_network_db --fix
+"""
+
+import argparse
+import sys
+
+import mysql.connector
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+# Base-table aggregate that inventory_summary must equal, per schema
+SUMMARY_SOURCE_SQL = {
+    'blood_bank_db': """
+        SELECT hospital_id, blood_group, SUM(units_available) as total_units
+        FROM hospital_inventory
+        WHERE units_available > 0
+        GROUP BY hospital_id, blood_group
+    """,
+    'blood_network_db': """
+        SELECT hospital_id, blood_group, SUM(units_available) as total_units
+        FROM hospital_inventory
+        WHERE status = 'Available'
+        GROUP BY hospital_id, blood_group
+    """
+}
+
+
+def find_drift(cursor, database):
+    """Compare inventory_summary with the base table; return mismatched keys"""
+    cursor.execute(SUMMARY_SOURCE_SQL[database])
+    expected = {(r['hospital_id'], r['blood_group']): int(r['total_units']) for r in cursor.fetchall()}
+
+    cursor.execute("SELECT hospital_id, blood_group, total_units FROM inventory_summary")
+    actual = {(r['hospital_id'], r['blood_group']): r['total_units'] for r in cursor.fetchall()}
+
+    drift = []
+    for key in expected.keys() | actual.keys():
+        want = expected.get(key, 0)
+        have = actual.get(key, 0)
+        if want != have:
+            drift.append({
+                'hospital_id': key[0],
+                'blood_group': key[1],
+                'expected': want,
+                'actual': have
+            })
+    return sorted(drift, key=lambda d: (d['hospital_id'], d['blood_group']))
+
+
+def repair(cursor, drift):
+    """Overwrite drifted summary totals with the base-table values"""
+    upserts = [(d['hospital_id'], d['blood_group'], d['expected']) for d in drift if d['expected']]
+    deletes = [(d['hospital_id'], d['blood_group']) for d in drift if not d['expected']]
+
+    if upserts:
+        cursor.executemany("""
+            INSERT INTO inventory_summary (hospital_id, blood_group, total_units)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE total_units = VALUES(total_units)
+        """, upserts)
+    if deletes:
+        cursor.executemany("DELETE FROM inventory_summary WHERE hospital_id = %s AND blood_group = %s", deletes)
+
+
+def reconcile(database, fix=False):
+    conn = mysql.connector.connect(database=database, **DB_CONFIG)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        # Lock the base table so the comparison sees one consistent state
+        conn.start_transaction(isolation_level='REPEATABLE READ')
+        cursor.execute("SELECT COUNT(*) as n FROM hospital_inventory FOR SHARE")
+        cursor.fetchone()
+        drift = find_drift(cursor, database)
+        if fix and drift:
+            repair(cursor, drift)
+        conn.commit()
+        return drift
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', choices=sorted(SUMMARY_SOURCE_SQL), default='blood_bank_db')
+    parser.add_argument('--fix', action='store_true', help='rewrite drifted rows from the base table')
+    args = parser.parse_args()
+
+    drift = reconcile(args.database, fix=args.fix)
+    if not drift:
+        print("✅ inventory_summary matches hospital_inventory")
+        return 0
+
+    print(f"{'🔧 Repaired' if args.fix else '❌ Found'} {len(drift)} drifted summary row(s):")
+    for d in drift:
+        print(f"  Hospital {d['hospital_id']} {d['blood_group']}: "
+              f"summary={d['actual']} expected={d['expected']}")
+    return 0 if args.fix else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
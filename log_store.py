@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Monthly-partitioned log tables: filtered reads, partition upkeep and archival
+system_logs (blood_network_db) and inventory_logs (blood_bank_db) are
+partitioned by RANGE on created_at, one partition per month (pYYYYMM) plus
+p_history for everything older and p_future as the MAXVALUE catch-all.
+Queries that bound created_at only touch the partitions in range. Old months
+are exported to gzip JSONL and dropped, which is a metadata operation rather
+than a multi-million-row DELETE:
+    python log_store.py --database blood_network_db status
+    python log_store.py --database blood_network_db extend --months 3       # monthly cron
+    python log_store.py --database blood_bank_db archive --keep-months 12 --dir archive
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+import mysql.connector
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+LOG_SCHEMAS = {
+    'blood_bank_db': {
+        'table': 'inventory_logs',
+        'action_types': ('INSERT', 'EXPIRY', 'EMERGENCY_APPROVAL', 'STOCK_REDUCTION', 'LOGIN', 'LOGOUT'),
+        'hospital_column': None
+    },
+    'blood_network_db': {
+        'table': 'system_logs',
+        'action_types': ('DONATION_REQUEST', 'APPOINTMENT_APPROVED', 'BLOOD_ADDED', 'BLOOD_EXPIRED',
+                         'TRANSFER_REQUEST', 'TRANSFER_APPROVED', 'BLOOD_USED', 'HOSPITAL_REGISTERED'),
+        'hospital_column': 'hospital_id'
+    }
+}
+
+# Default window for the log pages when no start date is given
+DEFAULT_LOG_DAYS = 7
+
+# Rows per fetchmany() while exporting a partition
+EXPORT_BATCH = 5000
+
+
+class PartitionError(Exception):
+    """The log table is not partitioned the way log_store expects"""
+
+
+# Filtered reads
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class LogFilters:
+    date_from: date
+    date_to: date = None          # inclusive
+    action_type: str = None
+    hospital_id: int = None
+
+    @classmethod
+    def from_args(cls, args, database, default_days=DEFAULT_LOG_DAYS):
+        """Build filters from request.args, dropping values that do not validate"""
+        schema = LOG_SCHEMAS[database]
+        date_to = _parse_date(args.get('date_to'))
+        date_from = _parse_date(args.get('date_from'))
+        if date_from is None:
+            date_from = (date_to or date.today()) - timedelta(days=default_days - 1)
+        action_type = args.get('action_type')
+        if action_type not in schema['action_types']:
+            action_type = None
+        hospital_id = args.get('hospital_id', type=int) if schema['hospital_column'] else None
+        return cls(date_from, date_to, action_type, hospital_id)
+
+    def where(self, alias):
+        """(sql, params) for fetch_page; always bounds created_at so MySQL prunes partitions"""
+        clauses = [f"{alias}.created_at >= %s"]
+        params = [datetime.combine(self.date_from, datetime.min.time())]
+        if self.date_to is not None:
+            clauses.append(f"{alias}.created_at < %s")
+            params.append(datetime.combine(self.date_to + timedelta(days=1), datetime.min.time()))
+        if self.action_type:
+            clauses.append(f"{alias}.action_type = %s")
+            params.append(self.action_type)
+        if self.hospital_id is not None:
+            clauses.append(f"{alias}.hospital_id = %s")
+            params.append(self.hospital_id)
+        return " AND ".join(clauses), params
+
+    def to_dict(self):
+        return {
+            'date_from': self.date_from.isoformat(),
+            'date_to': self.date_to.isoformat() if self.date_to else '',
+            'action_type': self.action_type or '',
+            'hospital_id': self.hospital_id
+        }
+
+
+# Partition upkeep
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"p{month:%Y%m}"
+
+
+def _bound_sql(day):
+    return f"UNIX_TIMESTAMP('{day:%Y-%m-%d} 00:00:00')"
+
+
+def list_partitions(cursor, database):
+    """[(name, upper bound as date or None for MAXVALUE, estimated rows)] in order"""
+    table = LOG_SCHEMAS[database]['table']
+    # Bounds are UNIX_TIMESTAMP values of server-local midnights
+    cursor.execute("""
+        SELECT PARTITION_NAME,
+               IF(PARTITION_DESCRIPTION = 'MAXVALUE', NULL, DATE(FROM_UNIXTIME(PARTITION_DESCRIPTION))),
+               TABLE_ROWS
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (database, table))
+    partitions = [(name, bound, rows or 0) for name, bound, rows in cursor.fetchall()]
+    if not partitions or partitions[-1][1] is not None:
+        raise PartitionError(f"{database}.{table} has no p_future MAXVALUE partition; "
+                             f"apply its partitioning script first")
+    return partitions
+
+
+def extend(conn, database, months_ahead=3, today=None):
+    """Split p_future so every month up to today + months_ahead has its own partition.
+
+    p_future should be empty, so the reorganise copies no rows. Returns the
+    names of the partitions added.
+    """
+    table = LOG_SCHEMAS[database]['table']
+    cursor = conn.cursor()
+    partitions = list_partitions(cursor, database)
+    last_bound = partitions[-2][1] if len(partitions) > 1 else None
+    target = add_months(month_start(today or date.today()), months_ahead + 1)
+
+    month = last_bound or month_start(today or date.today())
+    added = []
+    while month < target:
+        added.append((partition_name(month), add_months(month, 1)))
+        month = add_months(month, 1)
+    if added:
+        definitions = ', '.join(f"PARTITION {name} VALUES LESS THAN ({_bound_sql(bound)})"
+                                for name, bound in added)
+        cursor.execute(f"""
+            ALTER TABLE {table} REORGANIZE PARTITION p_future INTO (
+                {definitions}, PARTITION p_future VALUES LESS THAN MAXVALUE
+            )
+        """)
+    cursor.close()
+    return [name for name, _ in added]
+
+
+# Archival
+
+def export_partition(conn, database, partition, path):
+    """Stream one partition to gzip JSONL (one row per line); returns the row count"""
+    table = LOG_SCHEMAS[database]['table']
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f"SELECT * FROM {table} PARTITION ({partition}) ORDER BY created_at, log_id")
+    written = 0
+    tmp_path = path + '.part'
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as out:
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH)
+            if not rows:
+                break
+            for row in rows:
+                out.write(json.dumps(row, default=str, separators=(',', ':')) + '\n')
+            written += len(rows)
+    cursor.close()
+    os.replace(tmp_path, path)
+    return written
+
+
+def archive(conn, database, keep_months=12, directory='archive', today=None, dry_run=False):
+    """Export and drop every partition that ends before the retention window.
+
+    A partition is dropped only after its export holds exactly as many rows
+    as the partition. Returns [(partition, rows, path)].
+    """
+    table = LOG_SCHEMAS[database]['table']
+    cutoff = add_months(month_start(today or date.today()), -keep_months)
+    cursor = conn.cursor()
+    candidates = [(name, bound) for name, bound, _ in list_partitions(cursor, database)
+                  if bound is not None and bound <= cutoff]
+
+    os.makedirs(directory, exist_ok=True)
+    archived = []
+    for name, _ in candidates:
+        cursor.execute(f"SELECT COUNT(*) FROM {table} PARTITION ({name})")
+        expected = cursor.fetchone()[0]
+        path = os.path.join(directory, f"{database}.{table}.{name}.jsonl.gz")
+        if dry_run:
+            archived.append((name, expected, path))
+            continue
+        written = export_partition(conn, database, name, path)
+        if written != expected:
+            raise PartitionError(f"{name}: exported {written} rows but the partition holds {expected}; not dropped")
+        cursor.execute(f"ALTER TABLE {table} DROP PARTITION {name}")
+        archived.append((name, written, path))
+    cursor.close()
+    return archived
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', choices=sorted(LOG_SCHEMAS), default='blood_network_db')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('status', help='list partitions and estimated row counts')
+    extend_parser = commands.add_parser('extend', help='pre-create monthly partitions')
+    extend_parser.add_argument('--months', type=int, default=3, help='months ahead of the current one')
+    archive_parser = commands.add_parser('archive', help='export and drop partitions past retention')
+    archive_parser.add_argument('--keep-months', type=int, default=12)
+    archive_parser.add_argument('--dir', default='archive')
+    archive_parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG, database=args.database)
+    try:
+        if args.command == 'status':
+            cursor = conn.cursor()
+            for name, bound, rows in list_partitions(cursor, args.database):
+                print(f"{name:<12} < {bound.isoformat() if bound else 'MAXVALUE':<10}  ~{rows} rows")
+            cursor.close()
+        elif args.command == 'extend':
+            added = extend(conn, args.database, args.months)
+            print(f"✅ Added {len(added)} partition(s): {', '.join(added) or '-'}")
+        else:
+            archived = archive(conn, args.database, args.keep_months, args.dir, dry_run=args.dry_run)
+            verb = 'Would archive' if args.dry_run else 'Archived'
+            for name, rows, path in archived:
+                print(f"{verb} {name}: {rows} rows -> {path}")
+            print(f"✅ {verb} {len(archived)} partition(s)")
+    except PartitionError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
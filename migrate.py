@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for blood_bank_db
+Migrations live in database/migrations as NNNN_name.up.sql / NNNN_name.down.sql
+and are recorded in schema_migrations once applied:
+    python migrate.py status
+    python migrate.py up                 # apply everything pending
+    python migrate.py up --target 3      # apply up to and including 0003
+    python migrate.py down               # revert the latest migration
+    python migrate.py down --target 0    # revert everything
+MySQL commits DDL implicitly, so a migration is recorded only after all of its
+statements succeed; a failed migration must be fixed by hand before re-running.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+
+import mysql.connector
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'migrations')
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.(up|down)\.sql$')
+
+
+class Migration:
+    def __init__(self, version, name):
+        self.version = version
+        self.name = name
+        self.up_path = None
+        self.down_path = None
+
+    @property
+    def label(self):
+        return f"{self.version:04d}_{self.name}"
+
+    def checksum(self):
+        with open(self.up_path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """Return migrations sorted by version; every version needs both scripts"""
+    migrations = {}
+    for filename in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        version, name, direction = int(match.group(1)), match.group(2), match.group(3)
+        migration = migrations.setdefault(version, Migration(version, name))
+        if migration.name != name:
+            raise ValueError(f"Conflicting names for migration {version:04d}: {migration.name}, {name}")
+        setattr(migration, f'{direction}_path', os.path.join(directory, filename))
+
+    for migration in migrations.values():
+        if not migration.up_path or not migration.down_path:
+            raise ValueError(f"Migration {migration.label} needs both .up.sql and .down.sql")
+    return [migrations[v] for v in sorted(migrations)]
+
+
+def split_statements(path):
+    """Split a migration script into statements, honouring DELIMITER lines
+    (needed for trigger and procedure bodies) and dropping -- comment lines"""
+    statements, current, delimiter = [], [], ';'
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith('--'):
+                continue
+            if stripped.upper().startswith('DELIMITER '):
+                delimiter = stripped.split(None, 1)[1]
+                continue
+            current.append(line)
+            if stripped.endswith(delimiter):
+                statement = ''.join(current).strip()[:-len(delimiter)].strip()
+                if statement:
+                    statements.append(statement)
+                current = []
+    tail = ''.join(current).strip()
+    if tail:
+        statements.append(tail)
+    return statements
+
+
+def ensure_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum CHAR(40) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    cursor.execute("SELECT version, checksum FROM schema_migrations ORDER BY version")
+    return {version: checksum for version, checksum in cursor.fetchall()}
+
+
+def run_script(cursor, path):
+    for statement in split_statements(path):
+        cursor.execute(statement)
+
+
+def migrate_up(conn, migrations, target=None):
+    cursor = conn.cursor()
+    applied = applied_versions(cursor)
+    done = []
+    for migration in migrations:
+        if migration.version in applied or (target is not None and migration.version > target):
+            continue
+        print(f"⬆️  Applying {migration.label}")
+        run_script(cursor, migration.up_path)
+        cursor.execute("INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                       (migration.version, migration.name, migration.checksum()))
+        conn.commit()
+        done.append(migration)
+    cursor.close()
+    return done
+
+
+def migrate_down(conn, migrations, target=None):
+    cursor = conn.cursor()
+    applied = applied_versions(cursor)
+    by_version = {m.version: m for m in migrations}
+    if target is None:
+        # Default: revert only the latest applied migration
+        target = sorted(applied)[-2] if len(applied) > 1 else 0
+
+    done = []
+    for version in sorted(applied, reverse=True):
+        if version <= target:
+            break
+        migration = by_version.get(version)
+        if migration is None:
+            raise ValueError(f"Migration {version:04d} is applied but its scripts are missing")
+        print(f"⬇️  Reverting {migration.label}")
+        run_script(cursor, migration.down_path)
+        cursor.execute("DELETE FROM schema_migrations WHERE version = %s", (version,))
+        conn.commit()
+        done.append(migration)
+    cursor.close()
+    return done
+
+
+def print_status(conn, migrations):
+    cursor = conn.cursor()
+    applied = applied_versions(cursor)
+    cursor.close()
+    for migration in migrations:
+        checksum = applied.get(migration.version)
+        if checksum is None:
+            state = 'pending'
+        elif checksum != migration.checksum():
+            state = 'applied (⚠️ script changed since)'
+        else:
+            state = 'applied'
+        print(f"  {migration.label:40} {state}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['status', 'up', 'down'])
+    parser.add_argument('--target', type=int, help='version to migrate up to / down to')
+    parser.add_argument('--database', default='blood_bank_db')
+    args = parser.parse_args()
+
+    migrations = discover()
+    conn = mysql.connector.connect(database=args.database, **DB_CONFIG)
+    try:
+        cursor = conn.cursor()
+        ensure_table(cursor)
+        cursor.close()
+
+        if args.command == 'status':
+            print_status(conn, migrations)
+        elif args.command == 'up':
+            done = migrate_up(conn, migrations, args.target)
+            print(f"✅ Applied {len(done)} migration(s)")
+        else:
+            done = migrate_down(conn, migrations, args.target)
+            print(f"✅ Reverted {len(done)} migration(s)")
+    except mysql.connector.Error as err:
+        print(f"❌ Migration failed: {err}")
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
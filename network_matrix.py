@@ -0,0 +1,201 @@
+"""
+In-memory hospitals x blood-groups inventory matrix
+Holds available and expiring-soon units from inventory_summary as two NumPy
+arrays (one row per hospital, one column per blood group), so network-wide
+questions are array operations instead of aggregate queries: totals per
+group, top-k hospitals holding a group, cities below a threshold. refresh()
+is cheap to call per request: it does nothing while the hospitals and
+inventory_summary versions (http_cache.TableVersions, covering both unit
+columns) are unchanged, re-reads only summary rows updated since the last
+refresh otherwise, and reloads everything when hospitals change or every
+full_refresh_interval seconds.
+
+NumPy is optional; without it HAVE_NUMPY is False and the apps fall back to
+their SQL queries.
+"""
+
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from compatibility_service import BLOOD_GROUPS, GROUP_INDEX, HOSPITAL_NAME_COLUMNS
+
+HAVE_NUMPY = np is not None
+
+# Reload everything this often, whatever the version counters say
+FULL_REFRESH_INTERVAL = 300
+
+# Incremental refreshes re-read this many seconds behind the newest
+# updated_at seen, so rows from transactions that committed late are not missed
+REFRESH_OVERLAP = 60
+
+
+class NetworkMatrix:
+    """Hospitals x 8 blood groups of available / expiring units for one database"""
+
+    def __init__(self, database, full_refresh_interval=FULL_REFRESH_INTERVAL, overlap=REFRESH_OVERLAP):
+        if np is None:
+            raise RuntimeError("NetworkMatrix needs numpy")
+        self.database = database
+        self.full_refresh_interval = full_refresh_interval
+        self.overlap = overlap
+        self._lock = threading.RLock()
+        self._set_hospitals([], [], [])
+        self.versions = None
+        self._watermark = None
+        self._loaded_at = 0.0
+        self._stale = True
+        self.full_refreshes = 0
+        self.incremental_refreshes = 0
+        self.rows_applied = 0
+
+    def _set_hospitals(self, ids, names, cities):
+        self.hospital_ids = np.asarray(ids, dtype=np.int64)
+        self.names = list(names)
+        self.cities = list(cities)
+        self._index = {hospital_id: i for i, hospital_id in enumerate(ids)}
+        self.city_names, self.city_codes = np.unique(np.asarray(self.cities, dtype=object).astype(str),
+                                                     return_inverse=True)
+        self.available = np.zeros((len(ids), len(BLOOD_GROUPS)), dtype=np.int64)
+        self.expiring = np.zeros((len(ids), len(BLOOD_GROUPS)), dtype=np.int64)
+        # Display order for the network page: city, then hospital name
+        self.display_order = sorted(range(len(ids)), key=lambda i: (self.cities[i], self.names[i]))
+
+    # Loading
+
+    def refresh(self, cursor, versions=None):
+        """Bring the matrix up to date; versions are the (hospitals, inventory_summary) versions"""
+        with self._lock:
+            if versions is not None and versions == self.versions and not self._stale:
+                return
+            full = (self._stale or self._watermark is None
+                    or time.monotonic() - self._loaded_at > self.full_refresh_interval
+                    or (versions is not None and self.versions is not None and versions[0] != self.versions[0]))
+            if full:
+                self._load_full(cursor)
+            else:
+                self._load_changes(cursor)
+            self.versions = versions
+
+    def _load_full(self, cursor):
+        cursor.execute(f"""
+            SELECT hospital_id, {HOSPITAL_NAME_COLUMNS[self.database]}, city
+            FROM hospitals
+            ORDER BY hospital_id
+        """)
+        hospitals = cursor.fetchall()
+        self._set_hospitals([row[0] for row in hospitals], [row[1] for row in hospitals],
+                            [row[2] for row in hospitals])
+        cursor.execute("""
+            SELECT hospital_id, blood_group, total_units, expiring_soon_units, updated_at
+            FROM inventory_summary
+        """)
+        self._watermark = None
+        self._apply(cursor.fetchall())
+        self._loaded_at = time.monotonic()
+        self._stale = False
+        self.full_refreshes += 1
+
+    def _load_changes(self, cursor):
+        cursor.execute("""
+            SELECT hospital_id, blood_group, total_units, expiring_soon_units, updated_at
+            FROM inventory_summary
+            WHERE updated_at >= %s - INTERVAL %s SECOND
+        """, (self._watermark, self.overlap))
+        self._apply(cursor.fetchall())
+        self.incremental_refreshes += 1
+
+    def _apply(self, rows):
+        """Set summary rows (absolute values, so re-reading a row is harmless)"""
+        if not rows:
+            return
+        index = self._index
+        known = [row for row in rows if row[0] in index]
+        if len(known) < len(rows):
+            # A hospital registered after the last full load
+            self._stale = True
+        if known:
+            hospitals = np.fromiter((index[row[0]] for row in known), dtype=np.int64, count=len(known))
+            groups = np.fromiter((GROUP_INDEX[row[1]] for row in known), dtype=np.int64, count=len(known))
+            self.available[hospitals, groups] = [row[2] for row in known]
+            self.expiring[hospitals, groups] = [row[3] for row in known]
+        newest = max(row[4] for row in rows)
+        if self._watermark is None or newest > self._watermark:
+            self._watermark = newest
+        self.rows_applied += len(rows)
+
+    # Queries
+
+    def _column(self, blood_group):
+        return self.available[:, GROUP_INDEX[blood_group]] if blood_group else self.available.sum(axis=1)
+
+    def totals(self):
+        """{blood_group: {'available': n, 'expiring_soon': n}} across the network"""
+        with self._lock:
+            available = self.available.sum(axis=0)
+            expiring = self.expiring.sum(axis=0)
+        return {group: {'available': int(available[g]), 'expiring_soon': int(expiring[g])}
+                for g, group in enumerate(BLOOD_GROUPS)}
+
+    def top_hospitals(self, blood_group=None, k=10, exclude=None):
+        """The k hospitals holding the most units of blood_group (all groups if None)"""
+        with self._lock:
+            units = self._column(blood_group).copy()
+            if exclude is not None and exclude in self._index:
+                units[self._index[exclude]] = 0
+            if k < len(units):
+                candidates = np.argpartition(-units, k)[:k]
+            else:
+                candidates = np.arange(len(units))
+            candidates = candidates[np.argsort(-units[candidates], kind='stable')]
+            return [{'hospital_id': int(self.hospital_ids[i]), 'hospital_name': self.names[i],
+                     'city': self.cities[i], 'units': int(units[i])}
+                    for i in candidates if units[i] > 0]
+
+    def cities_below(self, threshold, blood_group=None):
+        """Cities whose combined units of blood_group (all groups if None) are under threshold"""
+        with self._lock:
+            per_city = np.bincount(self.city_codes, weights=self._column(blood_group),
+                                   minlength=len(self.city_names))
+            low = np.flatnonzero(per_city < threshold)
+            low = low[np.argsort(per_city[low], kind='stable')]
+            return [{'city': str(self.city_names[c]), 'units': int(per_city[c])} for c in low]
+
+    def inventory_by_hospital(self):
+        """hospital_id -> [(blood_group, units)] for groups in stock"""
+        with self._lock:
+            hospitals, groups = np.nonzero(self.available > 0)
+            units = self.available[hospitals, groups].tolist()
+            ids = self.hospital_ids[hospitals].tolist()
+        inventory = {}
+        for hospital_id, g, n in zip(ids, groups.tolist(), units):
+            inventory.setdefault(hospital_id, []).append((BLOOD_GROUPS[g], n))
+        return inventory
+
+    def network_rows(self):
+        """(hospital_name, city, blood_group, total_units) dicts in city / hospital / group order"""
+        with self._lock:
+            order = np.asarray(self.display_order, dtype=np.int64)
+            positions, groups = np.nonzero(self.available[order] > 0)
+            hospitals = order[positions]
+            units = self.available[hospitals, groups].tolist()
+            ids = self.hospital_ids[hospitals].tolist()
+            names, cities = self.names, self.cities
+            return [{'hospital_id': hospital_id, 'hospital_name': names[i], 'city': cities[i],
+                     'blood_group': BLOOD_GROUPS[g], 'total_units': n}
+                    for hospital_id, i, g, n in zip(ids, hospitals.tolist(), groups.tolist(), units)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hospitals': len(self.names),
+                'cities': len(self.city_names),
+                'versions': list(self.versions) if self.versions else None,
+                'full_refreshes': self.full_refreshes,
+                'incremental_refreshes': self.incremental_refreshes,
+                'rows_applied': self.rows_applied
+            }
@@ -0,0 +1,141 @@
+"""
+Keyset (cursor) pagination for list pages and their JSON variants
+Pages are fetched with WHERE (key columns) < (last seen values) ... LIMIT n,
+so the cost of a page stays flat no matter how deep into history it is.
+Tokens are opaque base64 strings passed as ?after= / ?before=.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import request, url_for
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _to_json(value):
+    if isinstance(value, (datetime, date, Decimal)):
+        return str(value)
+    return value
+
+
+def encode_token(values):
+    raw = json.dumps([_to_json(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_token(token):
+    """Decode a page token; returns None for missing or tampered tokens"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+class Page:
+    """One page of rows plus the tokens needed to move either way"""
+
+    def __init__(self, items, next_token, prev_token, page_size, prefix=''):
+        self.items = items
+        self.next_token = next_token
+        self.prev_token = prev_token
+        self.page_size = page_size
+        self.prefix = prefix
+
+    def _url(self, name, token):
+        args = request.args.to_dict()
+        args.pop(self.prefix + 'after', None)
+        args.pop(self.prefix + 'before', None)
+        args[self.prefix + name] = token
+        return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+    @property
+    def next_url(self):
+        return self._url('after', self.next_token) if self.next_token else None
+
+    @property
+    def prev_url(self):
+        return self._url('before', self.prev_token) if self.prev_token else None
+
+    def to_dict(self):
+        return {
+            'items': self.items,
+            'page_size': self.page_size,
+            'next': self.next_token,
+            'prev': self.prev_token
+        }
+
+
+def page_size_arg(prefix='', default=DEFAULT_PAGE_SIZE):
+    size = request.args.get(prefix + 'limit', type=int) or default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def fetch_page(cursor, select_sql, keys, where=None, params=(), descending=True,
+               prefix='', page_size=None):
+    """Fetch one keyset page.
+
+    select_sql is the SELECT ... FROM ... JOIN ... part without WHERE/ORDER BY.
+    keys is a list of (sql_expression, row_field) pairs whose combined values
+    are unique, e.g. [('da.created_at', 'created_at'), ('da.appointment_id', 'appointment_id')].
+    Rows must come from a dictionary cursor.
+    """
+    page_size = page_size or page_size_arg(prefix)
+    after = decode_token(request.args.get(prefix + 'after'))
+    before = None if after else decode_token(request.args.get(prefix + 'before'))
+    token = after or before
+    if token is not None and len(token) != len(keys):
+        token = after = before = None
+
+    clauses = [f"({where})"] if where else []
+    query_params = list(params)
+    backwards = before is not None
+
+    if token is not None:
+        # Moving forward continues in display order; moving back flips it
+        op = '<' if descending != backwards else '>'
+        columns = ', '.join(expr for expr, _ in keys)
+        placeholders = ', '.join(['%s'] * len(keys))
+        clauses.append(f"({columns}) {op} ({placeholders})")
+        query_params.extend(token)
+
+    direction = 'DESC' if descending != backwards else 'ASC'
+    sql = select_sql
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY " + ", ".join(f"{expr} {direction}" for expr, _ in keys)
+    sql += " LIMIT %s"
+    query_params.append(page_size + 1)
+
+    cursor.execute(sql, query_params)
+    rows = cursor.fetchall()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    def key_of(row):
+        return [row[field] for _, field in keys]
+
+    if not rows:
+        return Page([], None, None, page_size, prefix)
+
+    if backwards:
+        next_token = encode_token(key_of(rows[-1]))
+        prev_token = encode_token(key_of(rows[0])) if has_more else None
+    else:
+        next_token = encode_token(key_of(rows[-1])) if has_more else None
+        prev_token = encode_token(key_of(rows[0])) if after is not None else None
+
+    return Page(rows, next_token, prev_token, page_size, prefix)
+
+
+def wants_json():
+    return request.args.get('format') == 'json'
@@ -0,0 +1,296 @@
+"""
+Per-request query instrumentation and slow-query log
+QueryMonitor.init_app() hooks the shared ConnectionPool so every cursor handed
+out by PooledConnection.cursor() is timed: statement fingerprint (literals
+and placeholders folded to ?), duration, rows and the calling route. Totals
+per fingerprint feed the /admin/perf page; each response carries a
+Server-Timing header with the request's query count and database time.
+Statements returning rows are recorded once their result has been read.
+Statements slower than slow_ms are logged with their EXPLAIN plan.
+"""
+
+import logging
+import re
+import threading
+import time
+from functools import lru_cache
+
+from flask import g, has_request_context, request
+from mysql.connector import Error
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this are logged with EXPLAIN
+DEFAULT_SLOW_MS = 200
+
+# Distinct fingerprints kept; anything beyond is counted under OTHER
+MAX_STATEMENTS = 500
+OTHER = '(other statements)'
+
+# Sort keys accepted by QueryMonitor.top()
+ORDER_KEYS = ('total_ms', 'calls', 'avg_ms', 'max_ms')
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_ROWS = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """Normalised statement text shared by every call with different values"""
+    text = _STRING.sub('?', sql)
+    text = _PLACEHOLDER.sub('?', text)
+    text = _IN_LIST.sub('IN (...)', text)
+    text = _VALUES_ROWS.sub(r'\1, ...', text)
+    return _SPACE.sub(' ', text).strip()
+
+
+def _current_route():
+    if has_request_context():
+        return request.endpoint or request.path
+    return threading.current_thread().name
+
+
+class StatementStats:
+    __slots__ = ('calls', 'total_ms', 'max_ms', 'rows', 'slow', 'routes')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.slow = 0
+        self.routes = {}
+
+
+class InstrumentedCursor:
+    """Cursor proxy that reports every statement to a QueryMonitor.
+
+    A statement returning rows is recorded once its result is consumed (the
+    last fetch, the next execute or close), so on unbuffered cursors the
+    duration includes reading the rows and the row count is the number
+    actually read. Time the caller spends between fetches is not counted.
+    """
+
+    def __init__(self, cursor, monitor):
+        self._cursor = cursor
+        self._monitor = monitor
+        self._pending = None    # [operation, params, elapsed_ms, rows fetched]
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        row = self.fetchone()
+        while row is not None:
+            yield row
+            row = self.fetchone()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _finish(self):
+        """Record the statement whose result is being read, if any"""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            operation, params, elapsed_ms, fetched = pending
+            self._monitor.record(operation, params, elapsed_ms, max(self._cursor.rowcount, fetched))
+
+    def execute(self, operation, params=None, multi=False):
+        self._finish()
+        start = time.perf_counter()
+        if multi:
+            return self._timed_results(self._cursor.execute(operation, params, multi=True), operation, start)
+        result = self._cursor.execute(operation, params)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if self._cursor.description is None:
+            self._monitor.record(operation, params, elapsed_ms, max(self._cursor.rowcount, 0))
+        else:
+            self._pending = [operation, params, elapsed_ms, 0]
+        return result
+
+    def _timed_results(self, results, operation, start):
+        rows = 0
+        for result in results:
+            yield result
+            rows += max(result.rowcount, 0)
+        self._monitor.record(operation, None, (time.perf_counter() - start) * 1000, rows)
+
+    def executemany(self, operation, seq_params):
+        self._finish()
+        start = time.perf_counter()
+        result = self._cursor.executemany(operation, seq_params)
+        self._monitor.record(operation, None, (time.perf_counter() - start) * 1000,
+                             max(self._cursor.rowcount, 0))
+        return result
+
+    def _fetched(self, start, rows, done):
+        if self._pending is not None:
+            self._pending[2] += (time.perf_counter() - start) * 1000
+            self._pending[3] += rows
+            if done:
+                self._finish()
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(start, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        size = size or self._cursor.arraysize
+        rows = self._cursor.fetchmany(size)
+        self._fetched(start, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(start, len(rows), True)
+        return rows
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+
+class QueryMonitor:
+    """Aggregates statement timings per fingerprint and per request"""
+
+    def __init__(self, slow_ms=DEFAULT_SLOW_MS, explain=True, max_statements=MAX_STATEMENTS):
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._statements = {}
+        self._pool = None
+        self.started = time.time()
+
+    def init_app(self, app, pool):
+        """Instrument pool cursors and add Server-Timing to every response"""
+        pool.monitor = self
+        self._pool = pool
+        app.extensions['query_monitor'] = self
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def wrap(self, cursor):
+        return InstrumentedCursor(cursor, self)
+
+    # Recording
+
+    def record(self, sql, params, duration_ms, rows):
+        if isinstance(sql, bytes):
+            sql = sql.decode('utf-8', 'replace')
+        key = fingerprint(sql)
+        route = _current_route()
+        slow = duration_ms >= self.slow_ms
+
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                if len(self._statements) >= self.max_statements:
+                    key = OTHER
+                stats = self._statements.setdefault(key, StatementStats())
+            stats.calls += 1
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+            stats.rows += rows
+            stats.routes[route] = stats.routes.get(route, 0) + 1
+            if slow:
+                stats.slow += 1
+
+        if has_request_context() and 'query_totals' in g:
+            g.query_totals[0] += 1
+            g.query_totals[1] += duration_ms
+
+        if slow:
+            self._log_slow(sql, params, duration_ms, rows, route)
+
+    def _log_slow(self, sql, params, duration_ms, rows, route):
+        plan = self._explain(sql, params) if self.explain else None
+        logger.warning("Slow query %.1f ms, %d row(s), route %s: %s%s", duration_ms, rows, route,
+                       fingerprint(sql), f"\n{plan}" if plan else "")
+
+    def _explain(self, sql, params):
+        # EXPLAIN only plain SELECTs, on a connection of its own: the caller's
+        # may be mid-transaction or still streaming rows. Skipped rather than
+        # waited for when the pool has nothing free.
+        if self._pool is None or not sql.lstrip().upper().startswith('SELECT'):
+            return None
+        try:
+            conn = self._pool.connection(timeout=0)
+        except Error as e:
+            return f"  (EXPLAIN skipped: {e})"
+        try:
+            cursor = conn.cursor(dictionary=True, buffered=True, instrument=False)
+            try:
+                cursor.execute("EXPLAIN " + sql, params)
+                plan = cursor.fetchall()
+            finally:
+                cursor.close()
+        except Error as e:
+            return f"  (EXPLAIN failed: {e})"
+        finally:
+            conn.close()
+        return "\n".join(
+            f"  {row.get('table')}: type={row.get('type')} key={row.get('key')} "
+            f"rows={row.get('rows')} extra={row.get('Extra')}"
+            for row in plan
+        )
+
+    # Per request
+
+    def _start_request(self):
+        g.query_totals = [0, 0.0]
+        g.request_started = time.perf_counter()
+
+    def _finish_request(self, response):
+        totals = g.pop('query_totals', None)
+        started = g.pop('request_started', None)
+        if totals is not None and started is not None:
+            total_ms = (time.perf_counter() - started) * 1000
+            count, db_ms = totals
+            response.headers.add('Server-Timing', f'db;dur={db_ms:.1f};desc="{count} queries"')
+            response.headers.add('Server-Timing', f'app;dur={total_ms:.1f}')
+        return response
+
+    # Reporting
+
+    def top(self, limit=25, order_by='total_ms'):
+        """Statements sorted by total_ms, calls, max_ms or avg_ms, largest first"""
+        with self._lock:
+            rows = [{
+                'statement': key,
+                'calls': stats.calls,
+                'total_ms': round(stats.total_ms, 1),
+                'avg_ms': round(stats.total_ms / stats.calls, 2),
+                'max_ms': round(stats.max_ms, 1),
+                'rows': stats.rows,
+                'slow': stats.slow,
+                'routes': dict(sorted(stats.routes.items(), key=lambda item: -item[1])[:5])
+            } for key, stats in self._statements.items()]
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return rows[:limit]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'statements': len(self._statements),
+                'calls': sum(stats.calls for stats in self._statements.values()),
+                'total_ms': round(sum(stats.total_ms for stats in self._statements.values()), 1),
+                'slow': sum(stats.slow for stats in self._statements.values()),
+                'slow_ms': self.slow_ms,
+                'since': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started))
+            }
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self.started = time.time()
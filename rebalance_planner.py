@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Network rebalancing planner
+Looks across every hospital for units that will expire where they sit and
+for hospitals that are short, and suggests transfers between them. Per blood
+group the network is a min-cost flow problem: each hospital's units above
+SAFETY_STOCK (after its own pending requests) are supply, with units
+expiring within 7 days marked at risk. Pending transfer_requests (by
+urgency) and top-ups to SAFETY_STOCK are demand. Moving a unit costs the
+distance between the two cities, an at-risk unit left where it is costs
+EXPIRY_COST, and unmet demand costs DEMAND_COSTS[kind]. Hospitals are pooled
+per city, since every hospital in a city is the same distance away, so the
+solver works on cities x cities rather than hospitals x hospitals. The plan
+only suggests transfers and writes nothing:
+    python rebalance_planner.py --database blood_network_db
+    python rebalance_planner.py --database blood_bank_db --blood-group O- --distances city_distances.csv --json
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+
+import mysql.connector
+
+from allocation_service import LOT_SCHEMAS
+from compatibility_service import BLOOD_GROUPS, HOSPITAL_NAME_COLUMNS
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': ''
+}
+
+# Units of each group a hospital should keep; the inventory pages flag lots under 5 units as low
+SAFETY_STOCK = 5
+
+# Cost per unit of demand left unmet: pending requests by urgency, then top-ups to the safety stock.
+# Most urgent first; the order is also the order demand is served within a city.
+DEMAND_COSTS = {
+    'Critical': 20000,
+    'High': 15000,
+    'Medium': 10000,
+    'Low': 7000,
+    'safety_stock': 3000
+}
+
+# Cost per at-risk unit (expiring within 7 days) left at a hospital that does not need it
+EXPIRY_COST = 5000
+
+# km assumed between two different cities missing from the distance table
+DEFAULT_CITY_DISTANCE = 500
+
+# Each short city gets direct routes from this many of the nearest cities with spare units;
+# the rest reach it through a hub priced at the farthest of them, which keeps the flow
+# graph sparse when there are hundreds of cities
+ROUTE_CANDIDATES = 12
+
+# transfer_requests has no urgency column in blood_bank_db
+URGENCY_COLUMNS = {
+    'blood_bank_db': None,
+    'blood_network_db': 'urgency'
+}
+
+
+class CityDistances:
+    """Road distance in km between cities: 0 within a city, DEFAULT_CITY_DISTANCE when unknown"""
+
+    def __init__(self, distances=None, default=DEFAULT_CITY_DISTANCE):
+        self.default = int(round(default))
+        self._km = {}
+        for (a, b), km in (distances or {}).items():
+            self._km[(a, b)] = self._km[(b, a)] = int(round(km))
+
+    @classmethod
+    def from_csv(cls, path, default=DEFAULT_CITY_DISTANCE):
+        """city_a,city_b,km rows; each pair is needed in one direction only"""
+        with open(path, newline='', encoding='utf-8') as f:
+            return cls({(row['city_a'].strip(), row['city_b'].strip()): float(row['km'])
+                        for row in csv.DictReader(f)}, default)
+
+    def __call__(self, a, b):
+        if a == b:
+            return 0
+        return self._km.get((a, b), self.default)
+
+    def __len__(self):
+        return len(self._km) // 2
+
+
+@dataclass
+class SuggestedTransfer:
+    blood_group: str
+    from_hospital_id: int
+    from_hospital: str
+    from_city: str
+    to_hospital_id: int
+    to_hospital: str
+    to_city: str
+    units: int = 0
+    expiring_units: int = 0
+    priority: str = 'safety_stock'       # most urgent demand the transfer serves
+    distance_km: int = 0
+    request_ids: list = field(default_factory=list)   # requester's pending requests it covers
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class RebalancePlan:
+    transfers: list = field(default_factory=list)
+    groups: dict = field(default_factory=dict)
+    hospitals: int = 0
+    cities: int = 0
+    solve_ms: float = 0.0
+
+    def to_dict(self):
+        return {
+            'hospitals': self.hospitals,
+            'cities': self.cities,
+            'solve_ms': round(self.solve_ms, 1),
+            'groups': self.groups,
+            'transfers': [transfer.to_dict() for transfer in self.transfers]
+        }
+
+
+class _FlowNetwork:
+    """Min-cost flow by successive shortest paths, Dijkstra on reduced costs"""
+
+    def __init__(self, nodes):
+        self.graph = [[] for _ in range(nodes)]
+
+    def add_edge(self, u, v, capacity, cost):
+        """Returns the edge; its residual capacity after solve() gives the flow"""
+        edge = [v, capacity, cost, len(self.graph[v])]
+        self.graph[u].append(edge)
+        self.graph[v].append([u, 0, -cost, len(self.graph[u]) - 1])
+        return edge
+
+    def _initial_potential(self, source):
+        # Bellman-Ford; the network is a few layers deep, so this stops after a few passes
+        potential = [float('inf')] * len(self.graph)
+        potential[source] = 0
+        for _ in range(len(self.graph)):
+            changed = False
+            for u, edges in enumerate(self.graph):
+                if potential[u] == float('inf'):
+                    continue
+                for v, capacity, cost, _ in edges:
+                    if capacity > 0 and potential[u] + cost < potential[v]:
+                        potential[v] = potential[u] + cost
+                        changed = True
+            if not changed:
+                break
+        return [0 if p == float('inf') else p for p in potential]
+
+    def solve(self, source, sink):
+        """Push flow along cheapest paths while they still lower the total cost.
+
+        Each Dijkstra pass is followed by augmentations along every zero
+        reduced-cost path, so one pass serves all equally cheap paths.
+        """
+        graph = self.graph
+        potential = self._initial_potential(source)
+        inf = float('inf')
+        while True:
+            dist = [inf] * len(graph)
+            dist[source] = 0
+            heap = [(0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                if u == sink:
+                    break
+                pu = potential[u]
+                for v, capacity, cost, _ in graph[u]:
+                    if capacity > 0:
+                        nd = d + cost + pu - potential[v]
+                        if nd < dist[v]:
+                            dist[v] = nd
+                            heapq.heappush(heap, (nd, v))
+            if dist[sink] == inf:
+                return
+            # Capping at dist[sink] keeps reduced costs non-negative for nodes not finalised
+            limit = dist[sink]
+            for v, d in enumerate(dist):
+                potential[v] += d if d < limit else limit
+            if potential[sink] - potential[source] >= 0:
+                return
+            self._augment(source, sink, potential)
+
+    def _augment(self, source, sink, potential):
+        """Push flow along every zero reduced-cost path, Dinic style with a next-edge pointer per node"""
+        graph = self.graph
+        pointer = [0] * len(graph)
+        on_path = [False] * len(graph)
+        on_path[source] = True
+        path, u = [], source
+        while True:
+            edges = graph[u]
+            while pointer[u] < len(edges):
+                v, capacity, cost, _ = edges[pointer[u]]
+                if capacity > 0 and not on_path[v] and cost + potential[u] - potential[v] == 0:
+                    break
+                pointer[u] += 1
+            if pointer[u] == len(edges):
+                # Dead end for the rest of this pass
+                if u == source:
+                    return
+                on_path[u] = False
+                u, _ = path.pop()
+                pointer[u] += 1
+                continue
+            path.append((u, pointer[u]))
+            u = edges[pointer[u]][0]
+            on_path[u] = True
+            if u == sink:
+                units = min(graph[w][i][1] for w, i in path)
+                for w, i in path:
+                    edge = graph[w][i]
+                    edge[1] -= units
+                    graph[edge[0]][edge[3]][1] += units
+                for w, _ in path:
+                    on_path[w] = False
+                on_path[source] = True
+                on_path[sink] = False
+                path, u = [], source
+
+
+def _positions(hospitals, stock, requests, blood_group, safety_stock):
+    """Per-hospital supply (expiring, other) and demand by kind for one group, after local cover"""
+    pending = {}
+    for request_id, hospital_id, group, units, urgency in requests:
+        if group == blood_group and hospital_id in hospitals:
+            by_kind = pending.setdefault(hospital_id, {})
+            ids_units = by_kind.setdefault(urgency if urgency in DEMAND_COSTS else 'Medium', [0, []])
+            ids_units[0] += units
+            ids_units[1].append(request_id)
+
+    supply, demand = {}, {}
+    for hospital_id in hospitals:
+        total, expiring = stock.get((hospital_id, blood_group), (0, 0))
+        spare = total - safety_stock
+        needs = pending.get(hospital_id, {})
+        wanted = {}
+        for kind in DEMAND_COSTS:
+            if kind in needs:
+                units, request_ids = needs[kind]
+                covered = min(max(spare, 0), units)
+                spare -= covered
+                if units > covered:
+                    wanted[kind] = (units - covered, request_ids)
+        if total < safety_stock:
+            wanted['safety_stock'] = (safety_stock - total, [])
+        if wanted:
+            demand[hospital_id] = wanted
+        elif spare > 0:
+            at_risk = min(expiring, spare)
+            supply[hospital_id] = (at_risk, spare - at_risk)
+    return supply, demand
+
+
+def _plan_group(hospitals, blood_group, supply, demand, distances):
+    """Solve one group's city-level flow and split it back into hospital transfers"""
+    supply_cities, demand_cities = {}, {}
+    for hospital_id, units in supply.items():
+        supply_cities.setdefault(hospitals[hospital_id][1], []).append((hospital_id, units))
+    for hospital_id, wanted in demand.items():
+        demand_cities.setdefault(hospitals[hospital_id][1], []).append((hospital_id, wanted))
+
+    supply_names, demand_names = list(supply_cities), list(demand_cities)
+    source, hub, sink = 0, 1 + len(supply_names) + len(demand_names), 2 + len(supply_names) + len(demand_names)
+    network = _FlowNetwork(sink + 1)
+    max_gain = EXPIRY_COST + max(DEMAND_COSTS.values())
+
+    at_risk_edges, supply_totals = {}, {}
+    for a, city in enumerate(supply_names, start=1):
+        at_risk = sum(units[0] for _, units in supply_cities[city])
+        other = sum(units[1] for _, units in supply_cities[city])
+        if at_risk:
+            at_risk_edges[city] = (network.add_edge(source, a, at_risk, -EXPIRY_COST), at_risk)
+        if other:
+            network.add_edge(source, a, other, 0)
+        supply_totals[city] = at_risk + other
+
+    demand_edges, route_edges, hub_in_edges = {}, [], {}
+    for b, city in enumerate(demand_names, start=1 + len(supply_names)):
+        city_total = 0
+        for kind in DEMAND_COSTS:
+            units = sum(wanted[kind][0] for _, wanted in demand_cities[city] if kind in wanted)
+            if units:
+                demand_edges[city, kind] = (network.add_edge(b, sink, units, -DEMAND_COSTS[kind]), units)
+                city_total += units
+        routes = sorted((distances(from_city, city), a, from_city) for a, from_city in enumerate(supply_names, start=1))
+        routes = [route for route in routes if route[0] < max_gain]
+        for km, a, from_city in routes[:ROUTE_CANDIDATES]:
+            capacity = min(supply_totals[from_city], city_total)
+            route_edges.append((from_city, city, network.add_edge(a, b, capacity, km), capacity))
+        if len(routes) > ROUTE_CANDIDATES:
+            hub_in_edges[city] = (network.add_edge(hub, b, city_total, routes[-1][0]), city_total)
+    hub_out_edges = {}
+    if hub_in_edges:
+        for a, city in enumerate(supply_names, start=1):
+            hub_out_edges[city] = (network.add_edge(a, hub, supply_totals[city], 0), supply_totals[city])
+
+    network.solve(source, sink)
+
+    route_flows = {}
+    for from_city, to_city, edge, capacity in route_edges:
+        if capacity > edge[1]:
+            route_flows[from_city, to_city] = capacity - edge[1]
+    # Flow through the hub is paired up nearest first; it only ever stands in for longer routes
+    hub_out = {city: capacity - edge[1] for city, (edge, capacity) in hub_out_edges.items() if capacity > edge[1]}
+    for to_city, (edge, capacity) in hub_in_edges.items():
+        flow = capacity - edge[1]
+        for _, from_city in sorted((distances(from_city, to_city), from_city) for from_city in hub_out):
+            units = min(flow, hub_out[from_city])
+            if units:
+                route_flows[from_city, to_city] = route_flows.get((from_city, to_city), 0) + units
+                hub_out[from_city] -= units
+                flow -= units
+        hub_out = {city: units for city, units in hub_out.items() if units}
+
+    # Hospitals draw at-risk units first, then other spare units, as the flow used them
+    outbound = {}
+    for city, hospital_units in supply_cities.items():
+        edge, at_risk = at_risk_edges.get(city, (None, 0))
+        at_risk_left = at_risk - edge[1] if edge else 0
+        chunks = []
+        for hospital_id, (expiring, _) in sorted(hospital_units, key=lambda item: -item[1][0]):
+            take = min(expiring, at_risk_left)
+            if take:
+                chunks.append([hospital_id, take, True])
+                at_risk_left -= take
+        chunks.extend([hospital_id, other, False] for hospital_id, (_, other) in hospital_units if other)
+        outbound[city] = chunks
+    inbound = {}
+    for city, hospital_wants in demand_cities.items():
+        chunks = []
+        for kind in DEMAND_COSTS:
+            edge, units = demand_edges.get((city, kind), (None, 0))
+            served = units - edge[1] if edge else 0
+            for hospital_id, wanted in hospital_wants:
+                if served and kind in wanted:
+                    take = min(wanted[kind][0], served)
+                    chunks.append([hospital_id, take, kind, wanted[kind][1]])
+                    served -= take
+        inbound[city] = chunks
+
+    transfers = {}
+    for (from_city, to_city), flow in route_flows.items():
+        km = distances(from_city, to_city)
+        senders, receivers = outbound[from_city], inbound[to_city]
+        while flow:
+            sender, receiver = senders[0], receivers[0]
+            units = min(flow, sender[1], receiver[1])
+            key = (sender[0], receiver[0])
+            transfer = transfers.get(key)
+            if transfer is None:
+                transfer = transfers[key] = SuggestedTransfer(
+                    blood_group, sender[0], hospitals[sender[0]][0], from_city,
+                    receiver[0], hospitals[receiver[0]][0], to_city, priority=receiver[2], distance_km=km)
+            transfer.units += units
+            if sender[2]:
+                transfer.expiring_units += units
+            for request_id in receiver[3]:
+                if request_id not in transfer.request_ids:
+                    transfer.request_ids.append(request_id)
+            flow -= units
+            sender[1] -= units
+            receiver[1] -= units
+            if not sender[1]:
+                senders.pop(0)
+            if not receiver[1]:
+                receivers.pop(0)
+
+    transfers = list(transfers.values())
+    demand_total = sum(units for _, units in demand_edges.values())
+    requested = sum(units for (_, kind), (_, units) in demand_edges.items() if kind != 'safety_stock')
+    moved = sum(transfer.units for transfer in transfers)
+    requests_served = sum(units - edge[1] for (_, kind), (edge, units) in demand_edges.items()
+                          if kind != 'safety_stock')
+    at_risk_total = sum(units for _, units in at_risk_edges.values())
+    at_risk_moved = sum(transfer.expiring_units for transfer in transfers)
+    summary = {
+        'supply': sum(supply_totals.values()),
+        'demand': demand_total,
+        'requested': requested,
+        'moved': moved,
+        'unmet': demand_total - moved,
+        'unmet_requests': requested - requests_served,
+        'at_risk': at_risk_total,
+        'at_risk_moved': at_risk_moved,
+        'at_risk_left': at_risk_total - at_risk_moved
+    }
+    return transfers, summary
+
+
+def plan_rebalance(hospitals, stock, requests, distances=None, safety_stock=SAFETY_STOCK, blood_groups=BLOOD_GROUPS):
+    """Suggested transfers for the whole network.
+
+    hospitals maps hospital_id -> (name, city); stock maps (hospital_id,
+    blood_group) -> (total_units, expiring_soon_units); requests are pending
+    (request_id, requesting hospital_id, blood_group, units, urgency).
+    """
+    distances = distances or CityDistances()
+    start = time.perf_counter()
+    plan = RebalancePlan(hospitals=len(hospitals), cities=len({city for _, city in hospitals.values()}))
+    for blood_group in blood_groups:
+        supply, demand = _positions(hospitals, stock, requests, blood_group, safety_stock)
+        transfers, summary = _plan_group(hospitals, blood_group, supply, demand, distances)
+        plan.transfers.extend(transfers)
+        plan.groups[blood_group] = summary
+    plan.transfers.sort(key=lambda t: (list(DEMAND_COSTS).index(t.priority), -t.expiring_units,
+                                       -t.units, t.distance_km))
+    plan.solve_ms = (time.perf_counter() - start) * 1000
+    return plan
+
+
+def load_network(cursor, database):
+    """(hospitals, stock, requests) for plan_rebalance from a plain (tuple) cursor"""
+    cursor.execute(f"SELECT hospital_id, {HOSPITAL_NAME_COLUMNS[database]}, city FROM hospitals")
+    hospitals = {hospital_id: (name, city) for hospital_id, name, city in cursor.fetchall()}
+    cursor.execute("""
+        SELECT hospital_id, blood_group, total_units, expiring_soon_units
+        FROM inventory_summary
+        WHERE total_units > 0
+    """)
+    stock = {(hospital_id, group): (total, expiring) for hospital_id, group, total, expiring in cursor.fetchall()}
+    urgency = URGENCY_COLUMNS[database] or "'Medium'"
+    cursor.execute(f"""
+        SELECT request_id, {LOT_SCHEMAS[database]['from_column']}, blood_group, units_needed, {urgency}
+        FROM transfer_requests
+        WHERE status = 'Pending'
+    """)
+    return hospitals, stock, cursor.fetchall()
+
+
+def plan_for_database(cursor, database, distances=None, safety_stock=SAFETY_STOCK, blood_groups=BLOOD_GROUPS):
+    hospitals, stock, requests = load_network(cursor, database)
+    return plan_rebalance(hospitals, stock, requests, distances, safety_stock, blood_groups)
+
+
+def load_city_distances(path=None):
+    """CityDistances from a city_a,city_b,km CSV, or the flat default when path is empty"""
+    return CityDistances.from_csv(path) if path else CityDistances()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', choices=sorted(LOT_SCHEMAS), default='blood_network_db')
+    parser.add_argument('--blood-group', choices=BLOOD_GROUPS, help='plan one group only')
+    parser.add_argument('--safety-stock', type=int, default=SAFETY_STOCK)
+    parser.add_argument('--distances', help='CSV of city_a,city_b,km')
+    parser.add_argument('--limit', type=int, default=50, help='transfers to print')
+    parser.add_argument('--json', action='store_true', help='print the whole plan as JSON')
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG, database=args.database)
+    cursor = conn.cursor(buffered=True)
+    try:
+        plan = plan_for_database(cursor, args.database, load_city_distances(args.distances), args.safety_stock,
+                                 (args.blood_group,) if args.blood_group else BLOOD_GROUPS)
+    finally:
+        cursor.close()
+        conn.close()
+
+    if args.json:
+        print(json.dumps(plan.to_dict(), indent=2))
+        return 0
+
+    print(f"✅ Planned {len(plan.transfers)} transfer(s) across {plan.hospitals} hospitals "
+          f"in {plan.cities} cities ({plan.solve_ms:.0f} ms)")
+    for group, summary in plan.groups.items():
+        flag = '⚠️ ' if summary['unmet_requests'] or summary['at_risk_left'] else '  '
+        print(f"{flag}{group:>4}: move {summary['moved']} of {summary['demand']} units wanted, "
+              f"{summary['unmet_requests']} requested units unmet, "
+              f"{summary['at_risk_moved']}/{summary['at_risk']} at-risk units saved")
+    for t in plan.transfers[:args.limit]:
+        print(f"  {t.units:>4} x {t.blood_group:<3} {t.from_hospital} ({t.from_city}) -> "
+              f"{t.to_hospital} ({t.to_city}), {t.expiring_units} expiring, {t.priority}, {t.distance_km} km")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
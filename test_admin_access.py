@@ -0,0 +1,34 @@
+"""
+Tests that app.py's /admin/rebalance is limited to the hospital logins
+listed in ADMIN_EMAILS.
+Run with: python -m pytest -q test_admin_access.py
+"""
+
+import pytest
+
+import app as bank_app
+
+
+@pytest.fixture
+def client():
+    return bank_app.app.test_client()
+
+
+def log_in(client, is_admin):
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+        session['user_type'] = 'hospital'
+        session['is_admin'] = is_admin
+
+
+def test_anonymous_is_sent_to_login(client):
+    response = client.get('/admin/rebalance')
+
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/login')
+
+
+def test_hospital_without_admin_is_forbidden(client):
+    log_in(client, is_admin=False)
+
+    assert client.get('/admin/rebalance').status_code == 403
@@ -0,0 +1,154 @@
+"""
+Tests for db.borrow_connection: connections a handler borrows and never
+closes, on an early return or an exception, go back to the pool on teardown.
+Run with: python -m pytest -q test_db_pool.py
+"""
+
+import pytest
+from mysql.connector import Error
+
+from db import PoolTimeout
+
+
+class FakeCursor:
+    """Answers every query with one row, or raises if the server is 'down'"""
+
+    description = (('column',),)
+    rowcount = 1
+
+    def __init__(self, row, fail):
+        self.row = row
+        self.fail = fail
+
+    def execute(self, sql, params=None):
+        if self.fail:
+            raise Error(msg='Lost connection to MySQL server during query')
+
+    def fetchone(self):
+        return self.row
+
+    def fetchall(self):
+        return [self.row]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Stands in for a raw mysql.connector connection"""
+
+    in_transaction = False
+    autocommit = True
+
+    def __init__(self, row, fail=False):
+        self.row = row
+        self.fail = fail
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self.row, self.fail)
+
+    def is_connected(self):
+        return True
+
+    def ping(self, reconnect=False):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def logins(pool):
+    """More logins than the pool can ever have borrowed at once"""
+    return pool.pool_size + pool.max_overflow + 5
+
+
+def use_fake_connections(monkeypatch, pool, row, fail=False):
+    pool.dispose()   # drop fakes left idle by an earlier test
+    monkeypatch.setattr(pool, '_connect', lambda: FakeConnection(row, fail))
+    monkeypatch.setattr(pool, 'timeout', 0.1)
+
+
+ADMIN_LOGIN = {'email': 'admin@bloodbank.com', 'password': 'admin123', 'user_type': 'admin'}
+
+
+@pytest.mark.parametrize('module, path, form', [
+    ('app_complete', '/login', ADMIN_LOGIN),
+    ('app_professional', '/login', ADMIN_LOGIN),
+    ('app_fixed', '/donors', None),   # no login in this variant
+])
+def test_failed_queries_do_not_leak_connections(monkeypatch, module, path, form):
+    app_module = pytest.importorskip(module)
+    pool = app_module.db_pool
+    use_fake_connections(monkeypatch, pool, {'hospital_id': 1}, fail=True)
+    client = app_module.app.test_client()
+
+    for _ in range(logins(pool)):
+        response = client.post(path, data=form) if form else client.get(path)
+        assert response.status_code == 500
+
+    assert pool.stats()['in_use'] == 0
+    assert pool.stats()['timeouts'] == 0
+
+
+@pytest.mark.parametrize('module', ['app_complete', 'app_professional'])
+def test_legacy_logins_report_query_timings(monkeypatch, module):
+    app_module = pytest.importorskip(module)
+    pool = app_module.db_pool
+    use_fake_connections(monkeypatch, pool, {'hospital_id': 1})
+    client = app_module.app.test_client()
+
+    response = client.post('/login', data=ADMIN_LOGIN)
+
+    assert response.status_code == 302
+    assert 'desc="1 queries"' in response.headers.getlist('Server-Timing')[0]
+    assert pool.stats()['in_use'] == 0
+
+
+def test_network_logins_return_connections(monkeypatch):
+    bcrypt = pytest.importorskip('bcrypt')
+    app_module = pytest.importorskip('app_blood_network')
+    pool = app_module.db_pool
+    hashed = bcrypt.hashpw(b'secret', bcrypt.gensalt(4)).decode('utf-8')
+    use_fake_connections(monkeypatch, pool, {'hospital_id': 1, 'hospital_name': 'City General',
+                                             'admin_id': 1, 'username': 'admin', 'password': hashed})
+    client = app_module.app.test_client()
+
+    for _ in range(logins(pool)):
+        response = client.post('/hospital/login', data={'email': 'a@b.c', 'password': 'secret'})
+        assert response.status_code == 302
+        response = client.post('/admin/login', data={'username': 'admin', 'password': 'secret'})
+        assert response.status_code == 302
+
+    assert pool.stats()['in_use'] == 0
+
+
+def test_teardown_skips_connection_already_closed_and_reborrowed(monkeypatch):
+    app_module = pytest.importorskip('app_complete')
+    pool = app_module.db_pool
+    use_fake_connections(monkeypatch, pool, None)
+
+    with app_module.app.app_context():
+        conn = app_module.get_db_connection()
+        conn.close()
+        # The same proxy goes to another borrower; this request's teardown
+        # must not hand it back from under them
+        other = pool.connection()
+        assert other is conn
+    assert pool.stats()['in_use'] == 1
+    other.close()
+    assert pool.stats()['in_use'] == 0
+
+
+def test_pool_timeout_without_release(monkeypatch):
+    app_module = pytest.importorskip('app_complete')
+    pool = app_module.db_pool
+    use_fake_connections(monkeypatch, pool, None)
+    borrowed = [pool.connection() for _ in range(pool.pool_size + pool.max_overflow)]
+
+    with pytest.raises(PoolTimeout):
+        pool.connection()
+    for conn in borrowed:
+        conn.close()
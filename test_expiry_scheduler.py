@@ -0,0 +1,100 @@
+"""
+Tests for expiry_scheduler.ExpiryScheduler against a scripted connection:
+expired lots are logged in both databases and the expiring window is
+republished after a sweep that changed rows.
+Run with: python -m pytest -q test_expiry_scheduler.py
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from expiry_scheduler import ExpiryScheduler
+
+TODAY = date(2024, 3, 10)
+
+
+class ScriptedCursor:
+    """Answers the scheduler's SELECTs from a lot table; records every statement"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((' '.join(sql.split()), params))
+        if 'FOR UPDATE' in sql:
+            ids = set(params[:-1])
+            self.rows = [(lot_id, *lot[:3]) for lot_id, lot in self.conn.lots.items() if lot_id in ids]
+        elif 'FOR SHARE' in sql:
+            self.rows = [(lot_id, *lot) for lot_id, lot in self.conn.lots.items() if lot[3] < params[0]]
+        else:
+            self.rows = []
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class ScriptedConnection:
+    def __init__(self, lots):
+        self.lots = lots          # lot_id -> (hospital_id, blood_group, units, expiry)
+        self.executed = []
+        self.in_transaction = False
+        self.commits = 0
+
+    def cursor(self):
+        return ScriptedCursor(self)
+
+    def start_transaction(self):
+        self.in_transaction = True
+
+    def commit(self):
+        self.in_transaction = False
+        self.commits += 1
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def statements(self, prefix):
+        return [(sql, params) for sql, params in self.executed if sql.startswith(prefix)]
+
+
+@pytest.fixture
+def conn():
+    return ScriptedConnection({
+        1: (7, 'O-', 4, TODAY - timedelta(days=1)),
+        2: (7, 'A+', 3, TODAY + timedelta(days=2)),
+    })
+
+
+def test_bank_expiry_is_logged(conn):
+    scheduler = ExpiryScheduler('blood_bank_db')
+    scheduler.refresh(conn, TODAY)
+
+    assert scheduler.sweep(conn, TODAY) == 1
+
+    (sql, params), = conn.statements('INSERT INTO logs')
+    assert params == [7, 'EXPIRY', 'Auto-expired 4 units of O-']
+
+
+def test_network_expiry_is_logged(conn):
+    scheduler = ExpiryScheduler('blood_network_db')
+    scheduler.refresh(conn, TODAY)
+
+    scheduler.sweep(conn, TODAY)
+
+    (sql, params), = conn.statements('INSERT INTO system_logs')
+    assert params == ['BLOOD_EXPIRED', 'Blood unit expired: O- (4 units) at hospital ID 7', 1, 7]
+
+
+def test_run_once_publishes_window(conn):
+    scheduler = ExpiryScheduler('blood_bank_db')
+
+    assert scheduler.run_once(conn, TODAY) == 1
+
+    (sql, params), = conn.statements('INSERT INTO inventory_summary')
+    assert params == [7, 'A+', 3]
+    assert not conn.in_transaction
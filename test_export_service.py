@@ -0,0 +1,127 @@
+"""
+Tests for export_service.stream_export / export_response against a fake
+unbuffered cursor: rows are only read with fetchmany, the session timeout is
+put back after a complete export, and an abandoned download discards its
+pooled connection instead of returning it with unread rows.
+Run with: python -m pytest -q test_export_service.py
+"""
+
+import gzip
+
+import pytest
+
+from export_service import NET_WRITE_TIMEOUT, export_response, stream_export
+
+ROWS = [(i, 'O+', i * 2) for i in range(1, 8)]
+
+
+class UnbufferedCursor:
+    """Serves ROWS like a server-side cursor; fails on whole-result reads"""
+
+    column_names = ('h_bag_id', 'blood_group', 'units_available')
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.executed = []
+        self.fetch_sizes = []
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchmany(self, size=None):
+        self.fetch_sizes.append(size)
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def fetchall(self):
+        raise AssertionError('fetchall() loads the whole export into memory')
+
+    def fetchone(self):
+        raise AssertionError('exports are read in fetchmany batches')
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, rows=ROWS):
+        self.cursors = []
+        self.rows = rows
+        self.closed = False
+        self.invalidated = False
+
+    def cursor(self, buffered=True, **kwargs):
+        assert buffered is False, 'exports need an unbuffered cursor'
+        cursor = UnbufferedCursor(self.rows)
+        self.cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        self.closed = True
+
+    def invalidate(self):
+        self.invalidated = True
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    def connection(self, timeout=None):
+        return self.conn
+
+
+def test_rows_are_streamed_in_fetchmany_batches():
+    conn = FakeConnection()
+
+    body = b''.join(stream_export(conn, 'SELECT * FROM hospital_inventory', batch_size=3))
+
+    cursor, = conn.cursors
+    assert cursor.fetch_sizes == [3, 3, 3, 3]
+    lines = body.decode('utf-8').splitlines()
+    assert lines[0] == 'h_bag_id,blood_group,units_available'
+    assert lines[1:] == [f'{i},O+,{i * 2}' for i in range(1, 8)]
+
+
+def test_session_timeout_is_restored():
+    conn = FakeConnection()
+
+    b''.join(stream_export(conn, 'SELECT 1', fmt='jsonl', compress=True, batch_size=3))
+
+    statements = [sql for sql, _ in conn.cursors[0].executed]
+    assert conn.cursors[0].executed[0] == ("SET SESSION net_write_timeout = %s", (NET_WRITE_TIMEOUT,))
+    assert statements[-1] == "SET SESSION net_write_timeout = DEFAULT"
+    assert conn.cursors[0].closed
+
+
+def test_gzip_output_round_trips():
+    body = b''.join(stream_export(FakeConnection(), 'SELECT 1', compress=True, batch_size=2))
+
+    assert gzip.decompress(body).decode('utf-8').count('\n') == len(ROWS) + 1
+
+
+@pytest.fixture
+def response():
+    pool = FakePool()
+    return pool.conn, export_response(pool, 'SELECT 1', (), 'inventory.csv')
+
+
+def test_finished_download_returns_connection(response):
+    conn, resp = response
+
+    b''.join(resp.response)
+
+    assert conn.closed and not conn.invalidated
+
+
+def test_abandoned_download_invalidates_connection(response):
+    conn, resp = response
+    chunks = iter(resp.response)
+
+    next(chunks)
+    chunks.close()     # client went away after the first chunk
+
+    assert conn.invalidated and not conn.closed
+    statements = [sql for sql, _ in conn.cursors[0].executed]
+    assert "SET SESSION net_write_timeout = DEFAULT" not in statements
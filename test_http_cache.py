@@ -0,0 +1,143 @@
+"""
+Tests for http_cache.conditional_json: a 304 never waits on the database.
+Inside the version cache's TTL nothing is read; past it the cached versions
+answer while a background read on a pool connection refreshes them; after
+invalidate() only the versions are re-read.
+Run with: python -m pytest -q test_http_cache.py
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+import http_cache
+from http_cache import TableVersions, conditional_json
+
+
+class CountingCursor:
+    """Stands in for the pooled cursor; records every statement"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def close(self):
+        pass
+
+
+class FakePool:
+    """Hands out connections whose cursor is `cursor`, counting borrows"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.borrowed = 0
+
+    def connection(self, timeout=None):
+        self.borrowed += 1
+        return SimpleNamespace(cursor=lambda: self.cursor, close=lambda: None)
+
+
+def wait_for_background_refresh():
+    for thread in threading.enumerate():
+        if thread.name.startswith('table-versions-'):
+            thread.join(5)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    cursor = CountingCursor([('hospitals', '2:2024-03-01 09:00:00.000000'),
+                             ('hospital_inventory', '2024-03-01 10:00:00.123456')])
+    monkeypatch.setattr(http_cache, 'get_cursor', lambda dictionary=False: cursor)
+    versions = TableVersions('blood_bank_db', ttl=60)
+    loads = []
+
+    app = Flask(__name__)
+    pool = FakePool(CountingCursor([('hospitals', '2:2024-03-01 09:00:00.000000')]))
+    app.extensions['db_pool'] = pool
+
+    @app.route('/get_hospitals/<city>')
+    def get_hospitals(city):
+        def load(current):
+            loads.append(current)
+            return [{'hospital_id': 1, 'name': 'City General'}]
+        return conditional_json(versions, ('hospitals',), f'hospitals:{city}', load,
+                                cache_control='public, max-age=60')
+
+    client = app.test_client()
+    first = client.get('/get_hospitals/Pune')
+    assert first.status_code == 200
+    assert len(loads) == 1 and len(cursor.executed) == 1
+    cursor.executed.clear()
+    loads.clear()
+    return SimpleNamespace(client=client, cursor=cursor, pool=pool, versions=versions, loads=loads,
+                           etag=first.headers['ETag'])
+
+
+def test_matching_etag_skips_database(api):
+    response = api.client.get('/get_hospitals/Pune', headers={'If-None-Match': api.etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == api.etag
+    assert response.headers['Cache-Control'] == 'public, max-age=60'
+    assert api.loads == []
+    assert api.cursor.executed == []
+
+
+def test_expired_versions_answer_while_refreshing(api):
+    api.versions._loaded_at -= api.versions.ttl
+    response = api.client.get('/get_hospitals/Pune', headers={'If-None-Match': api.etag})
+
+    assert response.status_code == 304
+    assert api.cursor.executed == []
+    wait_for_background_refresh()
+    assert api.pool.borrowed == 1
+    assert api.versions.background_refreshes == 1
+    assert 'FROM table_versions' in api.pool.cursor.executed[0]
+
+    # The refreshed versions are used from the next request on
+    api.pool.cursor.rows = [('hospitals', '3:2024-03-01 11:00:00.000000')]
+    api.versions._loaded_at -= api.versions.ttl
+    api.client.get('/get_hospitals/Pune', headers={'If-None-Match': api.etag})
+    wait_for_background_refresh()
+    response = api.client.get('/get_hospitals/Pune', headers={'If-None-Match': api.etag})
+    assert response.status_code == 200
+    assert api.cursor.executed == []
+
+
+def test_invalidated_versions_read_versions_only(api):
+    # After this worker's own write the versions are re-read before
+    # answering, once; the response's own query still never runs
+    api.versions.invalidate()
+    response = api.client.get('/get_hospitals/Pune', headers={'If-None-Match': api.etag})
+
+    assert response.status_code == 304
+    assert api.loads == []
+    assert len(api.cursor.executed) == 1
+    assert 'FROM table_versions' in api.cursor.executed[0]
+
+
+def test_changed_version_returns_fresh_body(api):
+    api.cursor.rows = [('hospitals', '3:2024-03-01 11:00:00.000000')]
+    api.versions.invalidate()
+    response = api.client.get('/get_hospitals/Pune', headers={'If-None-Match': api.etag})
+
+    assert response.status_code == 200
+    assert response.get_json() == [{'hospital_id': 1, 'name': 'City General'}]
+    assert response.headers['ETag'] != api.etag
+    assert api.loads == [('3:2024-03-01 11:00:00.000000',)]
+
+
+def test_etag_is_per_key(api):
+    response = api.client.get('/get_hospitals/Delhi', headers={'If-None-Match': api.etag})
+
+    assert response.status_code == 200
+    assert len(api.loads) == 1
@@ -0,0 +1,85 @@
+"""
+Tests for import_service.import_csv against a fake connection: valid rows go
+in chunk_size INSERTs, and a chunk the database rejects stops the import with
+the rows committed before it counted on the result.
+Run with: python -m pytest -q test_import_service.py
+"""
+
+import io
+
+import mysql.connector
+
+from import_service import IMPORT_SCHEMAS, import_csv
+
+LOTS_CSV = 'blood_group,units,expiry_date\n' + ''.join(f'O+,{i},2099-12-{i:02d}\n' for i in range(1, 8))
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def execute(self, sql, params=None):
+        if sql.lstrip().startswith('SELECT hospital_id'):
+            self.rows = [(3,)]
+            return
+        self.conn.statements += 1
+        if self.conn.statements == self.conn.fail_on:
+            raise mysql.connector.Error('Lock wait timeout exceeded')
+        self.conn.pending.append(len(params) // 4)
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.statements = 0
+        self.pending = []
+        self.committed = []
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def start_transaction(self):
+        self.pending = []
+
+    def commit(self):
+        self.committed.extend(self.pending)
+
+    def rollback(self):
+        self.pending = []
+        self.rollbacks += 1
+
+
+def test_rows_are_inserted_in_chunks():
+    conn = FakeConnection()
+
+    result = import_csv(conn, 'blood_network_db', 'lots', io.StringIO(LOTS_CSV), hospital_id=3, chunk_size=3)
+
+    assert conn.committed == [3, 3, 1]
+    assert (result.imported, result.failed, result.error) == (7, 0, None)
+
+
+def test_failed_chunk_stops_import():
+    conn = FakeConnection(fail_on=2)
+    chunks = []
+
+    result = import_csv(conn, 'blood_network_db', 'lots', io.StringIO(LOTS_CSV), hospital_id=3, chunk_size=3,
+                        on_chunk=chunks.append)
+
+    assert conn.committed == [3] and conn.rollbacks == 1
+    assert (result.imported, result.failed) == (3, 3)
+    assert 'line 7' in result.error and 'Lock wait timeout' in result.error
+    assert len(chunks) == 1
+    assert result.to_dict()['error'] == result.error
+
+
+def test_network_lots_merge_on_reimport():
+    assert 'ON DUPLICATE KEY UPDATE units_available = units_available + VALUES(units_available)' \
+        in IMPORT_SCHEMAS['blood_network_db']['lots']
@@ -0,0 +1,115 @@
+"""
+Tests for inventory_service.add_lot_units: one INSERT ... ON DUPLICATE KEY
+UPDATE per addition, which merges into the (hospital, group, expiry) lot.
+The merge tests need a MySQL server (see conftest.py) and are skipped
+without one; benchmarks/concurrency_inventory_upsert.py is the load version.
+Run with: python -m pytest -q test_inventory_service.py
+"""
+
+import os
+import threading
+
+import mysql.connector
+import pytest
+
+from conftest import load_script
+from inventory_service import LOT_UPSERT_SQL, add_lot_units
+
+DATABASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database')
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+
+def test_single_upsert_statement():
+    cursor = RecordingCursor()
+
+    add_lot_units(cursor, 3, 'O+', 5, '2099-12-31')
+
+    assert cursor.executed == [(LOT_UPSERT_SQL, (3, 'O+', 5, '2099-12-31'))]
+    assert 'ON DUPLICATE KEY UPDATE units_available = units_available + VALUES(units_available)' in LOT_UPSERT_SQL
+
+
+@pytest.fixture
+def bank_db(mysql_config, mysql_database):
+    """Scratch blood_bank_db with the unique lot key and one hospital"""
+    conn = mysql.connector.connect(**mysql_config)
+    try:
+        load_script(conn, os.path.join(DATABASE_DIR, 'schema.sql'), mysql_database)
+        load_script(conn, os.path.join(DATABASE_DIR, 'migrations', '0002_unique_inventory_lot.up.sql'),
+                    mysql_database)
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO hospitals (name, email, password, city)
+            VALUES ('Upsert Test', 'upsert@test.invalid', 'x', 'Testville')
+        """)
+        hospital_id = cursor.lastrowid
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    return dict(mysql_config, database=mysql_database), hospital_id
+
+
+def lots(config, hospital_id):
+    conn = mysql.connector.connect(**config)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT blood_group, CAST(expires_on AS CHAR), units_available FROM hospital_inventory
+            WHERE hospital_id = %s ORDER BY blood_group, expires_on
+        """, (hospital_id,))
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def test_additions_merge_into_one_lot(bank_db):
+    config, hospital_id = bank_db
+    conn = mysql.connector.connect(**config)
+    try:
+        cursor = conn.cursor()
+        add_lot_units(cursor, hospital_id, 'O+', 5, '2099-12-31')
+        add_lot_units(cursor, hospital_id, 'O+', 7, '2099-12-31')
+        add_lot_units(cursor, hospital_id, 'O+', 2, '2099-11-30')
+        add_lot_units(cursor, hospital_id, 'A-', 1, '2099-12-31')
+        conn.commit()
+    finally:
+        conn.close()
+
+    # ORDER BY an ENUM follows its declaration order: A- before O+
+    assert lots(config, hospital_id) == [
+        ('A-', '2099-12-31', 1),
+        ('O+', '2099-11-30', 2),
+        ('O+', '2099-12-31', 12),
+    ]
+
+
+def test_parallel_additions_leave_one_row(bank_db):
+    config, hospital_id = bank_db
+    workers, barrier, errors = 16, threading.Barrier(16), []
+
+    def add():
+        conn = mysql.connector.connect(**config)
+        try:
+            barrier.wait()
+            add_lot_units(conn.cursor(), hospital_id, 'B+', 3, '2099-12-31')
+            conn.commit()
+        except mysql.connector.Error as e:
+            errors.append(e)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=add) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert lots(config, hospital_id) == [('B+', '2099-12-31', 3 * workers)]
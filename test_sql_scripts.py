@@ -0,0 +1,92 @@
+"""
+Tests that the blood_network_db scripts in database/ can be re-run: every
+trigger, procedure and event is dropped before it is created, and running
+blood_network_triggers.sql twice against a real server succeeds.
+Run with: python -m pytest -q test_sql_scripts.py
+"""
+
+import os
+import re
+
+import mysql.connector
+import pytest
+
+import migrate
+from conftest import load_script
+
+DATABASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database')
+
+RERUNNABLE_SCRIPTS = [
+    'blood_network_triggers.sql',
+    'inventory_summary_triggers.sql',
+    'table_versions.sql',
+    'audit_buffered_logging.sql',
+]
+
+CREATE_OBJECT = re.compile(r'^CREATE\s+(TRIGGER|PROCEDURE|EVENT|FUNCTION)\s+`?(\w+)', re.I)
+DROP_OBJECT = re.compile(r'^DROP\s+(TRIGGER|PROCEDURE|EVENT|FUNCTION)\s+IF\s+EXISTS\s+`?(\w+)', re.I)
+CREATE_TABLE = re.compile(r'^CREATE\s+TABLE\s+(?!IF\s+NOT\s+EXISTS)', re.I)
+
+NETWORK_TRIGGERS = {
+    'log_new_blood_entry', 'handle_transfer_approval', 'update_donor_last_donation',
+    'log_donation_request', 'log_transfer_request', 'log_hospital_registration',
+    'summary_inventory_insert', 'summary_inventory_update', 'summary_inventory_delete',
+}
+
+# Logging triggers audit_buffered_logging.sql removes; update_donor_last_donation stays
+BUFFERED_LOGGING_DROPS = {
+    'log_new_blood_entry', 'handle_transfer_approval', 'log_donation_request',
+    'log_transfer_request', 'log_hospital_registration',
+}
+
+
+def script(name):
+    return os.path.join(DATABASE_DIR, name)
+
+
+@pytest.mark.parametrize('name', RERUNNABLE_SCRIPTS)
+def test_objects_are_dropped_before_create(name):
+    dropped = set()
+    for statement in migrate.split_statements(script(name)):
+        drop = DROP_OBJECT.match(statement)
+        if drop:
+            dropped.add((drop.group(1).upper(), drop.group(2)))
+        create = CREATE_OBJECT.match(statement)
+        if create:
+            assert (create.group(1).upper(), create.group(2)) in dropped, \
+                f'{name}: {create.group(1)} {create.group(2)} is created without a preceding DROP ... IF EXISTS'
+        assert not CREATE_TABLE.match(statement), f'{name}: CREATE TABLE without IF NOT EXISTS'
+
+
+def installed_triggers(conn, database):
+    cursor = conn.cursor()
+    cursor.execute("SELECT trigger_name FROM information_schema.triggers WHERE trigger_schema = %s", (database,))
+    names = {row[0] for row in cursor.fetchall()}
+    cursor.close()
+    return names
+
+
+def test_network_triggers_run_twice(mysql_config, mysql_database):
+    conn = mysql.connector.connect(**mysql_config)
+    try:
+        load_script(conn, script('blood_network_schema.sql'), mysql_database)
+        load_script(conn, script('blood_network_triggers.sql'), mysql_database)
+        load_script(conn, script('blood_network_triggers.sql'), mysql_database)
+
+        assert installed_triggers(conn, mysql_database) == NETWORK_TRIGGERS
+    finally:
+        conn.close()
+
+
+def test_switch_back_from_buffered_logging(mysql_config, mysql_database):
+    conn = mysql.connector.connect(**mysql_config)
+    try:
+        load_script(conn, script('blood_network_schema.sql'), mysql_database)
+        load_script(conn, script('blood_network_triggers.sql'), mysql_database)
+        load_script(conn, script('audit_buffered_logging.sql'), mysql_database)
+        assert installed_triggers(conn, mysql_database) == NETWORK_TRIGGERS - BUFFERED_LOGGING_DROPS
+
+        load_script(conn, script('blood_network_triggers.sql'), mysql_database)
+        assert installed_triggers(conn, mysql_database) == NETWORK_TRIGGERS
+    finally:
+        conn.close()
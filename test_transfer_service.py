@@ -0,0 +1,68 @@
+"""
+Tests for transfer_service.broadcast_transfer_request against a fake cursor
+that hands out auto-increment ids with gaps, as auto_increment_increment > 1
+or interleaved lock mode do: the returned ids are the ones actually stored.
+Run with: python -m pytest -q test_transfer_service.py
+"""
+
+import pytest
+
+import transfer_service
+from transfer_service import broadcast_transfer_request
+
+
+class GappedIdCursor:
+    """transfer_requests with ids stepping by `increment`; a concurrent
+    writer takes one id between every two rows when `interleave` is set"""
+
+    def __init__(self, hospitals, increment=1, interleave=False):
+        self.hospitals = hospitals
+        self.increment = increment
+        self.interleave = interleave
+        self.next_id = 1
+        self.requests = {}        # request_id -> (from, to, group, units, status)
+        self.lastrowid = None
+        self.rows = []
+
+    def take_id(self):
+        request_id = self.next_id
+        self.next_id += self.increment
+        return request_id
+
+    def execute(self, sql, params=None):
+        sql = ' '.join(sql.split())
+        if sql.startswith('SELECT hospital_id'):
+            self.rows = [(h,) for h in self.hospitals if h != params[0]]
+        elif sql.startswith('INSERT INTO transfer_requests'):
+            self.lastrowid = None
+            for i in range(0, len(params), 4):
+                request_id = self.take_id()
+                self.lastrowid = self.lastrowid or request_id
+                self.requests[request_id] = (*params[i:i + 4], 'Pending')
+                if self.interleave:
+                    self.take_id()
+        elif sql.startswith('SELECT request_id, to_hospital'):
+            from_hospital, first_id, blood_group, units = params
+            self.rows = [(request_id, row[1]) for request_id, row in sorted(self.requests.items())
+                         if request_id >= first_id and row == (from_hospital, row[1], blood_group, units, 'Pending')]
+        else:
+            raise AssertionError(f'unexpected statement: {sql}')
+
+    def fetchall(self):
+        return self.rows
+
+
+@pytest.mark.parametrize('increment, interleave', [(1, False), (2, False), (1, True)])
+def test_returned_ids_match_stored_rows(monkeypatch, increment, interleave):
+    monkeypatch.setattr(transfer_service, 'BROADCAST_CHUNK_SIZE', 3)
+    cursor = GappedIdCursor(list(range(1, 9)), increment, interleave)
+
+    created = broadcast_transfer_request(cursor, 1, 'O-', 4)
+
+    assert [to_hospital for _, to_hospital in created] == list(range(2, 9))
+    for request_id, to_hospital in created:
+        assert cursor.requests[request_id] == (1, to_hospital, 'O-', 4, 'Pending')
+
+
+def test_no_other_hospitals():
+    assert broadcast_transfer_request(GappedIdCursor([1]), 1, 'O-', 4) == []
@@ -0,0 +1,51 @@
+"""
+Hospital-to-hospital transfer request service
+"""
+
+# Rows per multi-row INSERT; keeps each statement well under max_allowed_packet
+BROADCAST_CHUNK_SIZE = 1000
+
+
+def broadcast_transfer_request(cursor, from_hospital, blood_group, units_needed):
+    """Send one transfer request to every other hospital.
+
+    Uses a single multi-row INSERT per chunk instead of one INSERT per
+    hospital. Run it inside a transaction: the new request ids are read back
+    with one SELECT on (from_hospital, status, request_id >= the first
+    inserted id), which sees this transaction's own rows. The ids are not
+    assumed to be consecutive, since auto_increment_increment > 1 or
+    innodb_autoinc_lock_mode = 2 leave gaps between them. Returns a list of
+    (request_id, to_hospital) pairs.
+    """
+    cursor.execute("SELECT hospital_id FROM hospitals WHERE hospital_id != %s ORDER BY hospital_id",
+                   (from_hospital,))
+    targets = [row[0] if isinstance(row, tuple) else row['hospital_id'] for row in cursor.fetchall()]
+    if not targets:
+        return []
+
+    first_id = None
+    for start in range(0, len(targets), BROADCAST_CHUNK_SIZE):
+        chunk = targets[start:start + BROADCAST_CHUNK_SIZE]
+        placeholders = ', '.join(['(%s, %s, %s, %s)'] * len(chunk))
+        params = []
+        for to_hospital in chunk:
+            params.extend((from_hospital, to_hospital, blood_group, units_needed))
+        cursor.execute(f"""
+            INSERT INTO transfer_requests (from_hospital, to_hospital, blood_group, units_needed)
+            VALUES {placeholders}
+        """, params)
+        if first_id is None:
+            # LAST_INSERT_ID() is the first id of the statement in every lock mode
+            first_id = cursor.lastrowid
+
+    # Later statements always get higher ids, so every row is >= first_id;
+    # idx_transfers_from_status (from_hospital, status) plus the primary key
+    # makes this a range read of just those rows
+    cursor.execute("""
+        SELECT request_id, to_hospital FROM transfer_requests
+        WHERE from_hospital = %s AND status = 'Pending' AND request_id >= %s
+          AND blood_group = %s AND units_needed = %s
+        ORDER BY request_id
+    """, (from_hospital, first_id, blood_group, units_needed))
+    return [row if isinstance(row, tuple) else (row['request_id'], row['to_hospital'])
+            for row in cursor.fetchall()]